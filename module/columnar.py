@@ -0,0 +1,84 @@
+# module/columnar.py
+
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# カラムの種別
+STRING = "string"  # 文字列 (object dtype。欠損は None のまま保持する)
+DATE = "date"  # 日付 (ISO 8601文字列を受け取り、datetime64 に一括変換する。欠損は NaT)
+CATEGORY = "category"  # 低カーディナリティの文字列 (categorical)
+
+
+class ColumnarBuilder:
+    """
+    整形済みの行データをカラムごとのバッファに追記し、最後に1回だけDataFrameを構築するビルダー。
+
+    pd.json_normalize のように辞書のリストを走査し直して dtype を推論する代わりに、
+    カラム定義に従った型でDataFrameを構築する。
+
+    Args:
+        columns (Dict[str, str]): カラム名をキー、種別 (STRING / DATE / CATEGORY) を値とする辞書。
+            DataFrameのカラム順はこの辞書の順序になる。
+    """
+
+    def __init__(self, columns: Dict[str, str]) -> None:
+        self.columns = columns
+        self._buffers: Dict[str, List[Any]] = {name: [] for name in columns}
+
+    def __len__(self) -> int:
+        """追記済みの行数を返す。"""
+        return len(next(iter(self._buffers.values()), []))
+
+    def append(self, item: Dict[str, Any]) -> None:
+        """
+        1行分のデータを各カラムのバッファに追記する。
+
+        Args:
+            item (Dict[str, Any]): カラム名をキーとする1行分のデータ。定義にないキーは無視する。
+        """
+        for name, buffer in self._buffers.items():
+            buffer.append(item.get(name))
+
+    def update(self, position: int, item: Dict[str, Any]) -> None:
+        """
+        追記済みの行の値を上書きする。
+
+        Args:
+            position (int): 上書きする行番号 (追記した順、0始まり)。
+            item (Dict[str, Any]): カラム名をキーとする上書き後の値。定義にないキーは無視する。
+        """
+        for name, buffer in self._buffers.items():
+            if name in item:
+                buffer[position] = item[name]
+
+    def build(self, categories: Optional[Dict[str, Iterable[str]]] = None) -> "pd.DataFrame":
+        """
+        バッファからDataFrameを構築する。
+
+        Args:
+            categories (Optional[Dict[str, Iterable[str]]]): CATEGORY カラムのカテゴリ候補 (カラム名 -> 値の一覧)。
+                実際のデータに含まれる値と合わせて辞書順に並べたものをカテゴリとする。
+                辞書順に揃えることで、カテゴリコードでのソート結果が文字列でのソート結果と一致する。
+
+        Returns:
+            pd.DataFrame: カラム定義に従った dtype のDataFrame。行がない場合もカラムは保持する。
+        """
+        import pandas as pd
+
+        data = {}
+        for name, kind in self.columns.items():
+            buffer = self._buffers[name]
+            if kind == DATE:
+                # 日付のみ ("2025-12-31") と時刻付き ("2025-12-31T09:00:00.000+09:00") の両方に対応するため、
+                # 先頭10文字 (日付部分) を取り出してから固定フォーマットで一括パースする
+                dates = pd.Series(buffer, dtype=object).str.slice(0, 10)
+                data[name] = pd.to_datetime(dates, format="%Y-%m-%d")
+            elif kind == CATEGORY:
+                values = set(value for value in buffer if value is not None)
+                values.update((categories or {}).get(name, []))
+                data[name] = pd.Categorical(buffer, categories=sorted(values))
+            else:
+                data[name] = pd.Series(buffer, dtype=object)
+        return pd.DataFrame(data)
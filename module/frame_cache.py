@@ -0,0 +1,194 @@
+# module/frame_cache.py
+
+import os
+import json
+import hashlib
+import logging
+import datetime
+import tempfile
+import importlib.util
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class FrameCache:
+    """
+    整形済みの pd_items をDBごとにParquetファイルとして保存し、複数のエントリーポイント間で共有するキャッシュ。
+
+    各DBのキャッシュは `{cache_dir}/{db_id}.parquet` (DataFrame) と `{cache_dir}/{db_id}.meta.json`
+    (バージョン・キャッシュキー・ウォーターマーク・保存日時) に保存される。保存から max_age 以内で、
+    キャッシュキー (取得条件) とウォーターマーク (ローカルのスナップショットの版) が一致する場合は、
+    Notion APIにアクセスせずにDataFrameを読み込める。
+    Parquetは datetime64 / categorical の dtype をそのまま保持し、読み込み時はメモリマップを使用する。
+
+    Note:
+        pyarrow が必要。インストールされていない場合は警告を出してキャッシュを無効にする。
+        有効性の判定はローカルのファイルのみで行うため、max_age 以内のNotion上の更新は反映されない。
+
+    Args:
+        cache_dir (str): キャッシュの保存先ディレクトリ。
+        max_age (datetime.timedelta, optional): キャッシュを有効とみなす期間。デフォルトは15分。
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: str, max_age: datetime.timedelta = datetime.timedelta(minutes=15)) -> None:
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.enabled = importlib.util.find_spec("pyarrow") is not None
+        if not self.enabled:
+            logging.warning("pyarrow is not installed. Frame cache is disabled.")
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(**conditions: Any) -> str:
+        """
+        取得条件 (フィルター、プロパティ、カラム定義など) からキャッシュキーを作成する。
+
+        Args:
+            **conditions: キャッシュの内容を左右する条件。JSONに変換できる値であること。
+
+        Returns:
+            str: 条件のハッシュ値。
+        """
+        payload = json.dumps(conditions, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, db_id: str) -> Tuple[str, str]:
+        """DB IDに対応する (Parquetファイル, メタデータファイル) のパスを返す。"""
+        return os.path.join(self.cache_dir, f"{db_id}.parquet"), os.path.join(self.cache_dir, f"{db_id}.meta.json")
+
+    def _load_meta(self, db_id: str, key: str, watermark: str) -> Optional[Dict[str, Any]]:
+        """
+        キャッシュのメタデータを読み込み、キャッシュが有効な場合のみ返す。
+
+        Args:
+            db_id (str): NotionデータベースID。
+            key (str): make_key() で作成したキャッシュキー。
+            watermark (str): 現在のウォーターマーク。保存時のウォーターマークと異なる場合は無効とする。
+
+        Returns:
+            Optional[Dict[str, Any]]: メタデータ。存在しない、期限切れ、キー・バージョン・ウォーターマークが
+            異なる、または読み込めない場合はNone。
+        """
+        if not self.enabled:
+            return None
+        data_path, meta_path = self._paths(db_id)
+        if not os.path.exists(data_path) or not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Failed to read frame cache metadata {meta_path}: {e}")
+            return None
+        if meta.get("version") != self.VERSION or meta.get("key") != key:
+            return None
+        written_at = datetime.datetime.fromisoformat(meta["written_at"])
+        if datetime.datetime.now(datetime.timezone.utc) - written_at > self.max_age:
+            return None
+        if meta.get("watermark") != watermark:
+            logging.info(f"Frame cache of DB {db_id} is outdated (watermark: {meta.get('watermark') or 'N/A'})")
+            return None
+        return meta
+
+    def stamp(self, db_id: str, key: str, watermark: str = "") -> Optional[str]:
+        """
+        有効なキャッシュの保存日時を返す。DataFrameは読み込まない。
+
+        他のDBのキャッシュに依存するキャッシュ (関連DBのタイトルを含むタスクDBなど) のキーに含め、
+        依存先のキャッシュが作り直された場合に無効にするために使用する。
+
+        Args:
+            db_id (str): NotionデータベースID。
+            key (str): make_key() で作成したキャッシュキー。
+            watermark (str, optional): 現在のウォーターマーク。
+
+        Returns:
+            Optional[str]: キャッシュの保存日時 (ISO 8601形式)。キャッシュが有効でない場合はNone。
+        """
+        meta = self._load_meta(db_id, key, watermark)
+        return meta["written_at"] if meta is not None else None
+
+    def load(self, db_id: str, key: str, watermark: str = "") -> Optional["pd.DataFrame"]:
+        """
+        キャッシュからDataFrameを読み込む。
+
+        Args:
+            db_id (str): NotionデータベースID。
+            key (str): make_key() で作成したキャッシュキー。
+            watermark (str, optional): 現在のウォーターマーク。保存時のウォーターマークと異なる場合は読み込まない。
+
+        Returns:
+            Optional[pd.DataFrame]: キャッシュしたDataFrame。存在しない、期限切れ、キー・バージョン・
+            ウォーターマークが異なる、または読み込めない場合はNone。
+        """
+        meta = self._load_meta(db_id, key, watermark)
+        if meta is None:
+            return None
+
+        import pandas as pd
+
+        data_path, _ = self._paths(db_id)
+        try:
+            frame = pd.read_parquet(data_path, engine="pyarrow", memory_map=True)
+        except Exception as e:
+            logging.warning(f"Failed to read frame cache {data_path}: {e}")
+            return None
+        written_at = datetime.datetime.fromisoformat(meta["written_at"])
+        age = datetime.datetime.now(datetime.timezone.utc) - written_at
+        logging.info(
+            f"Loaded {len(frame)} items of DB {db_id} from frame cache "
+            f"(watermark: {meta.get('watermark') or 'N/A'}, age: {age.total_seconds():.0f}s)"
+        )
+        return frame
+
+    def save(self, db_id: str, key: str, frame: "pd.DataFrame", watermark: str = "") -> None:
+        """
+        DataFrameをキャッシュに保存する。保存に失敗しても例外は送出しない。
+
+        Args:
+            db_id (str): NotionデータベースID。
+            key (str): make_key() で作成したキャッシュキー。
+            frame (pd.DataFrame): 保存するDataFrame。
+            watermark (str, optional): 保存時点のウォーターマーク。
+        """
+        if not self.enabled:
+            return
+        data_path, meta_path = self._paths(db_id)
+        meta = {
+            "version": self.VERSION,
+            "key": key,
+            "watermark": watermark,
+            "written_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "rows": len(frame),
+        }
+        # 読み込み中の他プロセスが壊れたファイルを読まないよう、一時ファイル経由で置き換える
+        # (同じディレクトリを使う他のエントリーポイントと衝突しないよう、一時ファイル名は毎回異なるものにする)
+        data_tmp = self._temp_path(db_id, ".parquet.tmp")
+        meta_tmp = self._temp_path(db_id, ".meta.json.tmp")
+        try:
+            frame.to_parquet(data_tmp, engine="pyarrow", index=False)
+            # 置き換え中に古いメタデータで新しいデータを読まないよう、先にメタデータを削除する
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            os.replace(data_tmp, data_path)
+            with open(meta_tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(meta_tmp, meta_path)
+        except Exception as e:
+            logging.warning(f"Failed to write frame cache {data_path}: {e}")
+        finally:
+            for path in (data_tmp, meta_tmp):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _temp_path(self, db_id: str, suffix: str) -> str:
+        """キャッシュディレクトリ内に、他のプロセスと重複しない一時ファイルを作成してそのパスを返す。"""
+        fd, path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{db_id}.", suffix=suffix)
+        os.close(fd)
+        return path
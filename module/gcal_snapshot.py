@@ -0,0 +1,70 @@
+# module/gcal_snapshot.py
+
+import os
+import json
+import logging
+from typing import Dict, Any, Optional
+
+
+class EventSnapshotStore:
+    """
+    Googleカレンダーのイベント一覧と syncToken をローカルに保存するスナップショットストア。
+
+    スナップショットは1つのJSONファイルに保存され、カレンダーID・syncToken・イベントIDをキーとする
+    イベント情報を保持する。次回以降は syncToken を使って前回以降に変更・削除されたイベントだけを取得し、
+    スナップショットに反映すればよい (GoogleCalendarAPI.sync_events)。
+
+    Args:
+        path (str): スナップショットファイルのパス。
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def load(self, calendar_id: str) -> Optional[Dict[str, Any]]:
+        """
+        スナップショットを読み込む。
+
+        Args:
+            calendar_id (str): カレンダーID。
+
+        Returns:
+            Optional[Dict[str, Any]]: {"sync_token", "events"} を持つ辞書。存在しない、壊れている、
+            バージョンが異なる、または別のカレンダーのスナップショットの場合はNone。
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Failed to read GCal snapshot {self.path}: {e}")
+            return None
+        if snapshot.get("version") != self.VERSION or snapshot.get("calendar_id") != calendar_id:
+            return None
+        return snapshot
+
+    def save(self, calendar_id: str, sync_token: str, events: Dict[str, Dict[str, Any]]) -> None:
+        """
+        スナップショットを保存する。
+
+        Args:
+            calendar_id (str): カレンダーID。
+            sync_token (str): 次回の差分取得に使用する syncToken (events.list の nextSyncToken)。
+            events (Dict[str, Dict[str, Any]]): イベントIDをキーとするイベント情報の辞書。
+        """
+        snapshot = {
+            "version": self.VERSION,
+            "calendar_id": calendar_id,
+            "sync_token": sync_token,
+            "events": events,
+        }
+        tmp_path = f"{self.path}.tmp"
+        # 書き込み途中で落ちても既存のスナップショットを壊さないよう、一時ファイル経由で置き換える
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -2,9 +2,18 @@
 
 import logging
 import datetime
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .gcal_snapshot import EventSnapshotStore
+
+
+class SyncTokenExpiredError(Exception):
+    """syncToken が無効になった (APIが 410 Gone を返した) ことを示す例外。全件取得からやり直す必要がある。"""
+
+
+# バッチ書き込みの結果を受け取るコールバック (作成・更新後のイベント情報, 失敗時の例外)
+BatchCallback = Callable[[Optional[Dict[str, Any]], Optional[Exception]], None]
 
 
 class GoogleCalendarAPI:
@@ -18,6 +27,8 @@ class GoogleCalendarAPI:
     """
 
     SCOPES = ["https://www.googleapis.com/auth/calendar"]
+    # events.list の1ページあたりの最大件数 (APIの上限値)
+    MAX_RESULTS = 2500
 
     def __init__(self, key_file_path: str, calendar_id: str) -> None:
         """
@@ -27,6 +38,10 @@ class GoogleCalendarAPI:
             key_file_path (str): サービスアカウントのJSONキーファイルのパス。
             calendar_id (str): 操作対象のカレンダーID (メールアドレス形式)。
         """
+        # Googleのクライアントライブラリは読み込みが重いため、実際に使用する時点でインポートする
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+
         self.calendar_id = calendar_id
         creds = service_account.Credentials.from_service_account_file(key_file_path, scopes=self.SCOPES)
         self.service = build("calendar", "v3", credentials=creds)
@@ -45,14 +60,128 @@ class GoogleCalendarAPI:
         time_min = start_date.isoformat() + "T00:00:00Z"
         time_max = end_date.isoformat() + "T23:59:59Z"
 
-        events_result = (
-            self.service.events()
-            .list(
-                calendarId=self.calendar_id, timeMin=time_min, timeMax=time_max, singleEvents=True, orderBy="startTime"
-            )
-            .execute()
+        return self._list_all(
+            calendarId=self.calendar_id, timeMin=time_min, timeMax=time_max, singleEvents=True, orderBy="startTime"
         )
-        return events_result.get("items", [])
+
+    def get_events_by_id(self, start_date: datetime.date, end_date: datetime.date) -> Dict[str, Dict[str, Any]]:
+        """
+        指定された期間内のイベントをまとめて取得し、イベントIDをキーとする辞書にする。
+
+        get_event() をイベントごとに呼び出す代わりに、1回の (ページングされた) 一覧取得で済ませるために使用する。
+
+        Args:
+            start_date (datetime.date): 取得開始日。
+            end_date (datetime.date): 取得終了日。
+
+        Returns:
+            Dict[str, Dict[str, Any]]: イベントIDをキー、イベント情報を値とする辞書。
+        """
+        events = self.list_events(start_date, end_date)
+        logging.info(f"Prefetched {len(events)} GCal events ({start_date} - {end_date})")
+        return {event["id"]: event for event in events}
+
+    def list_changes(self, sync_token: Optional[str] = None) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        syncToken を使って、前回の取得以降に変更・削除されたイベントを取得する。
+
+        削除されたイベントは status が "cancelled" のイベントとして返される。
+        繰り返しイベントはインスタンスに展開せず、親イベント1件として返す
+        (このジョブが管理するのは単発の終日イベントのみで、展開すると件数が際限なく増えるため)。
+
+        Args:
+            sync_token (Optional[str]): 前回の取得で得た syncToken。Noneの場合は全件を取得する。
+
+        Returns:
+            Tuple[List[Dict[str, Any]], str]: (イベント情報の辞書リスト, 次回の取得に使用する syncToken)。
+
+        Raises:
+            SyncTokenExpiredError: syncToken が無効になった場合 (410 Gone)。全件取得からやり直すこと。
+        """
+        from googleapiclient.errors import HttpError
+
+        # syncToken を使う場合、timeMin / orderBy などは指定できないため、全件取得時も指定しない
+        params = {"calendarId": self.calendar_id}
+        if sync_token:
+            params["syncToken"] = sync_token
+
+        items = []
+        next_sync_token = ""
+        try:
+            for events_result in self._iter_pages(**params):
+                items.extend(events_result.get("items", []))
+                next_sync_token = events_result.get("nextSyncToken", next_sync_token)
+        except HttpError as e:
+            if e.resp.status == 410:
+                raise SyncTokenExpiredError(f"Sync token of calendar {self.calendar_id} expired") from e
+            raise
+        return items, next_sync_token
+
+    def sync_events(self, store: "EventSnapshotStore") -> Dict[str, Dict[str, Any]]:
+        """
+        スナップショットのイベント一覧を syncToken による差分取得で最新にする。
+
+        スナップショットがない、または syncToken が無効になった場合は全件を取得し直す。
+
+        Args:
+            store (EventSnapshotStore): イベント一覧と syncToken を保存するスナップショットストア。
+
+        Returns:
+            Dict[str, Dict[str, Any]]: イベントIDをキーとする全イベント (削除されたイベントを除く)。
+        """
+        snapshot = store.load(self.calendar_id)
+        if snapshot and snapshot.get("sync_token"):
+            try:
+                changes, sync_token = self.list_changes(snapshot["sync_token"])
+                events = snapshot.get("events", {})
+            except SyncTokenExpiredError as e:
+                logging.warning(f"{e}. Falling back to full sync.")
+                snapshot = None
+        if not snapshot or not snapshot.get("sync_token"):
+            changes, sync_token = self.list_changes()
+            events = {}
+
+        for event in changes:
+            if event.get("status") == "cancelled":
+                events.pop(event["id"], None)
+            else:
+                events[event["id"]] = event
+
+        store.save(self.calendar_id, sync_token, events)
+        logging.info(f"Synced GCal events: {len(changes)} changed, {len(events)} total")
+        return events
+
+    def _iter_pages(self, **params: Any) -> Iterator[Dict[str, Any]]:
+        """
+        events.list を nextPageToken がなくなるまで繰り返し、各ページのレスポンスを返す。
+
+        Args:
+            **params: events.list に渡すパラメータ。
+
+        Yields:
+            Dict[str, Any]: events.list のレスポンス。最終ページには nextSyncToken が含まれる。
+        """
+        page_token = None
+        while True:
+            events_result = (
+                self.service.events().list(maxResults=self.MAX_RESULTS, pageToken=page_token, **params).execute()
+            )
+            yield events_result
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                return
+
+    def _list_all(self, **params: Any) -> List[Dict[str, Any]]:
+        """
+        events.list を nextPageToken がなくなるまで繰り返し、全ページのイベントを返す。
+
+        Args:
+            **params: events.list に渡すパラメータ。
+
+        Returns:
+            List[Dict[str, Any]]: 全ページのイベント情報の辞書リスト。
+        """
+        return [event for events_result in self._iter_pages(**params) for event in events_result.get("items", [])]
 
     def create_event(self, title: str, start_date: datetime.date, description: str = "") -> str:
         """
@@ -66,13 +195,7 @@ class GoogleCalendarAPI:
         Returns:
             str: 作成されたイベントのID。
         """
-        event = {
-            "summary": title,
-            "description": description,
-            "start": {"date": start_date.isoformat()},
-            "end": {"date": (start_date + datetime.timedelta(days=1)).isoformat()},  # 終日は+1日必要
-        }
-        result = self.service.events().insert(calendarId=self.calendar_id, body=event).execute()
+        result = self._insert_request(title, start_date, description).execute()
         logging.info(f"Created GCal Event: {title} ({result['id']})")
         return result["id"]
 
@@ -88,14 +211,39 @@ class GoogleCalendarAPI:
             start_date (Optional[datetime.date]): 新しい日付。Noneの場合は日付を更新しない。
             description (str, optional): 新しい説明。デフォルトは空文字。
         """
+        self._patch_request(event_id, title, start_date, description).execute()
+        logging.info(f"Updated GCal Event: {title} ({event_id})")
+
+    def _insert_request(self, title: str, start_date: datetime.date, description: str = "") -> Any:
+        """終日イベントを作成する events.insert のリクエストを作成する (実行はしない)。"""
+        event = {
+            "summary": title,
+            "description": description,
+            "start": {"date": start_date.isoformat()},
+            "end": {"date": (start_date + datetime.timedelta(days=1)).isoformat()},  # 終日は+1日必要
+        }
+        return self.service.events().insert(calendarId=self.calendar_id, body=event)
+
+    def _patch_request(
+        self, event_id: str, title: str, start_date: Optional[datetime.date], description: str = ""
+    ) -> Any:
+        """既存のイベントを更新する events.patch のリクエストを作成する (実行はしない)。"""
         body = {"summary": title, "description": description}
 
         if start_date:
             body["start"] = {"date": start_date.isoformat()}
             body["end"] = {"date": (start_date + datetime.timedelta(days=1)).isoformat()}
 
-        self.service.events().patch(calendarId=self.calendar_id, eventId=event_id, body=body).execute()
-        logging.info(f"Updated GCal Event: {title} ({event_id})")
+        return self.service.events().patch(calendarId=self.calendar_id, eventId=event_id, body=body)
+
+    def batch(self) -> "EventWriteBatch":
+        """
+        イベントの作成・更新をまとめて送信するバッチを作成する。
+
+        Returns:
+            EventWriteBatch: このカレンダーに書き込むバッチ。
+        """
+        return EventWriteBatch(self)
 
     def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -138,16 +286,117 @@ class GoogleCalendarAPI:
         time_min_str = start_time.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
         time_max_str = end_time.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-        events_result = (
-            self.service.events()
-            .list(
-                calendarId=calendar_id,
-                timeMin=time_min_str,
-                timeMax=time_max_str,
-                singleEvents=True,
-                orderBy="startTime",
-            )
-            .execute()
+        return self._list_all(
+            calendarId=calendar_id,
+            timeMin=time_min_str,
+            timeMax=time_max_str,
+            singleEvents=True,
+            orderBy="startTime",
         )
 
-        return events_result.get("items", [])
+
+class EventWriteBatch:
+    """
+    Googleカレンダーへのイベントの作成・更新をキューに溜め、HTTPバッチリクエストでまとめて送信するクラス。
+
+    キューが MAX_BATCH_SIZE 件に達するたびに自動で送信し、残りは flush() で送信する。
+    各リクエストの結果 (イベント情報または例外) は、追加時に指定したコールバックと flush() の戻り値で受け取れる。
+    1件の失敗は他のリクエストに影響しない。
+
+    Args:
+        api (GoogleCalendarAPI): 書き込み先のカレンダーを操作するインスタンス。
+    """
+
+    # 1回のバッチリクエストに含められるリクエスト数の上限 (Google Calendar APIの上限値)
+    MAX_BATCH_SIZE = 50
+
+    def __init__(self, api: GoogleCalendarAPI) -> None:
+        self.api = api
+        self._queue: List[Tuple[Any, str, Optional[BatchCallback]]] = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def create_event(
+        self,
+        title: str,
+        start_date: datetime.date,
+        description: str = "",
+        callback: Optional[BatchCallback] = None,
+    ) -> None:
+        """
+        終日イベントの作成をキューに追加する。
+
+        Args:
+            title (str): イベントのタイトル。
+            start_date (datetime.date): イベントの日付。
+            description (str, optional): イベントの説明。デフォルトは空文字。
+            callback (Optional[BatchCallback], optional): 送信後に (作成されたイベント, 例外) を受け取る関数。
+        """
+        self._add(self.api._insert_request(title, start_date, description), f"Created GCal Event: {title}", callback)
+
+    def update_event(
+        self,
+        event_id: str,
+        title: str,
+        start_date: Optional[datetime.date],
+        description: str = "",
+        callback: Optional[BatchCallback] = None,
+    ) -> None:
+        """
+        既存のイベントの更新をキューに追加する。
+
+        Args:
+            event_id (str): 更新対象のイベントID。
+            title (str): 新しいタイトル。
+            start_date (Optional[datetime.date]): 新しい日付。Noneの場合は日付を更新しない。
+            description (str, optional): 新しい説明。デフォルトは空文字。
+            callback (Optional[BatchCallback], optional): 送信後に (更新後のイベント, 例外) を受け取る関数。
+        """
+        request = self.api._patch_request(event_id, title, start_date, description)
+        self._add(request, f"Updated GCal Event: {title}", callback)
+
+    def _add(self, request: Any, label: str, callback: Optional[BatchCallback]) -> None:
+        """リクエストをキューに追加し、上限に達したら送信する。"""
+        self._queue.append((request, label, callback))
+        if len(self._queue) >= self.MAX_BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        キューに溜まったリクエストをバッチリクエストで送信する。
+
+        Returns:
+            List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]: 追加順の (イベント情報, 例外) のリスト。
+            成功したリクエストは例外がNone、失敗したリクエストはイベント情報がNoneになる。
+        """
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+
+        results: List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]] = [(None, None)] * len(queue)
+
+        def _on_response(request_id: str, response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+            results[int(request_id)] = (response, exception)
+
+        batch = self.api.service.new_batch_http_request(callback=_on_response)
+        for i, (request, _, _) in enumerate(queue):
+            batch.add(request, request_id=str(i))
+        try:
+            batch.execute()
+        except Exception as e:
+            # バッチ全体の送信に失敗した場合は、結果を受け取れなかったリクエストをすべて失敗とする
+            logging.error(f"GCal batch request failed: {e}")
+            results = [(event, error or (None if event else e)) for event, error in results]
+
+        failed = 0
+        for (event, error), (_, label, callback) in zip(results, queue):
+            if error is None:
+                logging.info(f"{label} ({(event or {}).get('id')})")
+            else:
+                failed += 1
+                logging.error(f"{label} failed: {error}")
+            if callback is not None:
+                callback(event, error)
+        logging.info(f"Sent GCal batch request: {len(queue)} requests, {failed} failed")
+        return results
@@ -3,98 +3,701 @@
 import requests
 import logging
 import datetime
-import pandas as pd
-from typing import List, Dict, Any, Optional, Union, Tuple
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from .columnar import CATEGORY, DATE, STRING, ColumnarBuilder
+from .frame_cache import FrameCache
+from .notion_client import NotionAPIError, NotionClient, get_default_client, prefetch_iter
+from .records import Task
+from .snapshot import RawSnapshotStore
+
+# pandas は読み込みが重いため、DataFrameを構築する時点でインポートする (backend="records" では読み込まない)
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 整形済みデータの保持形式
+PANDAS_BACKEND = "pandas"  # pd_items (DataFrame) に格納する
+RECORDS_BACKEND = "records"  # records (軽量なレコードのリスト) に格納し、DataFrameを構築しない
+
+# 整形時に解決できなかった項目 ([(カラム名, 関連DB名, ページID), ...]) を一時的に保持するキー
+PENDING_KEY = "_pending"
 
 
 class BaseNotionDB:
     """
     Notion APIとの通信、生データの取得、共通ヘッダーを扱う基底クラス。
 
+    子クラスは REQUIRED_PROPERTIES に整形で使用するプロパティ名を宣言できる。
+    宣言されている場合、データ取得時は filter_properties によってそれらのプロパティのみを取得する。
+
     Args:
         db_id (str): NotionデータベースID。
         token (str): Notionインテグレーションの認証トークン。
         version (str, optional): Notion APIのバージョン。デフォルトは "2022-06-28"。
+        client (NotionClient, optional): HTTP通信に使用するクライアント。
+            Noneの場合はプロセス共有のデフォルトクライアント (接続プール) を使用する。
+        autoload (bool, optional): Falseの場合、初期化時にはデータを取得せず、pd_items への最初のアクセス時
+            (または load() の呼び出し時) に取得する。検索APIのみを使う場合は全件取得が発生しない。デフォルトは True。
+        snapshot_store (RawSnapshotStore, optional): 指定した場合、生データをローカルに保存し、
+            次回以降は前回以降に更新されたページのみを取得する。
+        filter_payload (Dict[str, Any], optional): 指定した場合、データ取得時にNotion APIのフィルターとして送信し、
+            条件に合致するページのみを取得する。フィルター指定時はスナップショットを使用しない。
+        backend (str, optional): 整形済みデータの保持形式。"pandas" の場合は pd_items (DataFrame) に、
+            "records" の場合は records (レコードのリスト) に格納する。件数が少ない用途では
+            "records" にすることでDataFrameの構築を省略できる。デフォルトは "pandas"。
+        frame_cache (FrameCache, optional): 指定した場合、整形済みの pd_items をParquetファイルに保存し、
+            有効期間内で、かつローカルのスナップショットが保存後に更新されていなければ、Notion APIにアクセスせずに
+            読み込む (backend="pandas" の場合のみ)。
     """
 
-    def __init__(self, db_id: str, token: str, version: str = "2022-06-28") -> None:
+    # データ取得時に要求するプロパティ名 (空の場合は全プロパティを取得する)
+    REQUIRED_PROPERTIES: Tuple[str, ...] = ()
+    # ページネーションで先読みするページ数 (0の場合は先読みしない)
+    PREFETCH_PAGES = 1
+    # pd_items のカラム定義 (カラム名 -> 種別)。空の場合は pd.json_normalize で構築する
+    COLUMNS: Dict[str, str] = {}
+
+    def __init__(
+        self,
+        db_id: str,
+        token: str,
+        version: str = "2022-06-28",
+        client: Optional[NotionClient] = None,
+        autoload: bool = True,
+        snapshot_store: Optional[RawSnapshotStore] = None,
+        filter_payload: Optional[Dict[str, Any]] = None,
+        backend: str = PANDAS_BACKEND,
+        frame_cache: Optional[FrameCache] = None,
+    ) -> None:
+        if backend not in (PANDAS_BACKEND, RECORDS_BACKEND):
+            raise ValueError(f"Unknown backend: {backend}")
         self.db_id = db_id
         self.token = token
-        self.pd_items: pd.DataFrame = pd.DataFrame()  # 最終的に格納されるDataFrame
+        self.client = client if client is not None else get_default_client()
+        self.snapshot_store = snapshot_store
+        self.filter_payload = filter_payload
+        self.backend = backend
+        self.frame_cache = frame_cache
+        self._schema: Optional[Dict[str, Any]] = None  # データベースのスキーマ (プロパティ定義)
+        self._property_ids: Optional[List[str]] = None  # REQUIRED_PROPERTIES に対応するプロパティID
+        self._loaded = False  # pd_items のデータ取得を開始済みかどうか
+        self.pd_items: Optional["pd.DataFrame"] = None  # 最終的に格納されるDataFrame (検索用インデックスも初期化される)
+        self._records: List[Any] = []  # backend="records" の場合に格納されるレコードのリスト
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
             "Notion-Version": version,
         }
+        if autoload:
+            self.load()
+
+    def load(self) -> None:
+        """データを取得・整形して pd_items (backend="records" の場合は records) に格納する。autoload=False の場合に明示的に取得したいときに使用する。"""
+        self._loaded = True
         self._load_and_process_data()
 
     def _get_raw_data(self) -> list:
         """
         Notionデータベースから生データを取得する。
-        ページネーションに対応し、100件を超えるデータも全件取得する。
 
         Returns:
             list: APIレスポンスの 'results' に含まれる生のデータリスト（全件）。
 
         Raises:
-            Exception: APIリクエストが失敗した場合。
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
+        """
+        return list(self.iter_raw_items())
+
+    def iter_raw_items(self) -> Iterator[Dict[str, Any]]:
+        """
+        Notionデータベースの生データを1件ずつ返すジェネレーター。
+
+        filter_payload が設定されている場合は条件に合致するページのみを取得する。
+        それ以外で snapshot_store が設定されている場合は差分取得 (_get_raw_data_incremental) を行い、
+        そうでなければ全件を取得する。スナップショットを使用しない場合はAPIの1ページ (100件) ずつ
+        取得しながら返すため、全件の生データを同時にメモリに保持しない。
+
+        Yields:
+            Dict[str, Any]: APIレスポンスの 'results' に含まれる生のページデータ。
+
+        Raises:
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
+        """
+        if self.filter_payload:
+            # 条件付きの取得結果は日によって変わるため、スナップショットには保存しない
+            batches = self._iter_query_batches({"filter": self.filter_payload})
+        elif self.snapshot_store is not None:
+            batches = iter([self._get_raw_data_incremental()])
+        else:
+            batches = self._iter_query_batches()
+
+        for batch in batches:
+            yield from batch
+
+    def iter_items(self) -> Iterator[Dict[str, Any]]:
+        """
+        生データを取得しながら1件ずつ整形して返すジェネレーター。
+
+        pd_items を構築せずにタスクを逐次処理したい場合に使用する。
+
+        整形時に解決できなかった項目を持つ行は最後にまとめて解決してから返すため、
+        取得順とは異なる順序で返ることがある。
+
+        Yields:
+            Dict[str, Any]: _process_raw_item で整形された辞書。
+        """
+        pending_items = []
+        for raw_item in self.iter_raw_items():
+            item = self._process_raw_item(raw_item)
+            if item is None:
+                continue
+            if PENDING_KEY in item:
+                pending_items.append(item)
+            else:
+                yield item
+
+        if pending_items:
+            self._resolve_pending(pending_items)
+            yield from pending_items
+
+    def _get_schema(self) -> Dict[str, Any]:
+        """
+        データベースのスキーマ (プロパティ名をキーとするプロパティ定義の辞書) を取得する。
+
+        結果はインスタンスにキャッシュされる。
+
+        Returns:
+            Dict[str, Any]: APIレスポンスの 'properties'。
+
+        Raises:
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
+        """
+        if self._schema is not None:
+            return self._schema
+        url = f"https://api.notion.com/v1/databases/{self.db_id}"
+        res = self.client.get(url, headers=self.headers)
+        if res.status_code != 200:
+            logging.error(f"Error getting schema of DB {self.db_id}: {res.status_code}, message: {res.reason}")
+            raise NotionAPIError(f"Notion API Error: {res.status_code}", res.status_code)
+        self._schema = res.json().get("properties", {})
+        return self._schema
+
+    def _get_property_ids(self) -> List[str]:
+        """
+        REQUIRED_PROPERTIES のプロパティ名をスキーマからプロパティIDに変換する。
+
+        結果はインスタンスにキャッシュされる。スキーマの取得に失敗した場合は
+        空リストを返し、全プロパティを取得する従来の動作にフォールバックする。
+
+        Returns:
+            List[str]: filter_properties に指定するプロパティIDのリスト。
+        """
+        if self._property_ids is None:
+            self._property_ids = self._resolve_property_ids(self.REQUIRED_PROPERTIES)
+        return self._property_ids
+
+    def _resolve_property_ids(self, names: Iterable[str]) -> List[str]:
+        """
+        プロパティ名のリストをスキーマからプロパティIDのリストに変換する。
+
+        スキーマに存在しない名前は無視する。スキーマの取得に失敗した場合は空リスト
+        (= 全プロパティを取得する) を返す。
+
+        Args:
+            names: プロパティ名のリスト。
+
+        Returns:
+            List[str]: filter_properties に指定するプロパティIDのリスト。
+        """
+        names = list(names)
+        if not names:
+            return []
+
+        try:
+            schema = self._get_schema()
+        except Exception as e:
+            logging.warning(f"Failed to resolve property IDs for DB {self.db_id}. Fetching all properties: {e}")
+            return []
+
+        property_ids = []
+        for name in names:
+            if name in schema:
+                # スキーマのIDはURLエンコード済みのため、クエリパラメータ化の前にデコードしておく
+                property_ids.append(urllib.parse.unquote(schema[name]["id"]))
+            else:
+                logging.debug(f"Property '{name}' not found in DB {self.db_id}")
+        return property_ids
+
+    def _query_all_pages(self, extra_payload: Optional[Dict[str, Any]] = None) -> list:
+        """
+        データベースを検索し、ページネーションに対応して100件を超えるデータも全件取得する。
+
+        Args:
+            extra_payload: リクエストボディに追加する項目 (filter など)。
+
+        Returns:
+            list: APIレスポンスの 'results' に含まれる生のデータリスト（全件）。
+
+        Raises:
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
         """
-        task_url = f"https://api.notion.com/v1/databases/{self.db_id}/query"
         all_results = []
+        for results in self._iter_query_batches(extra_payload):
+            all_results.extend(results)
+        return all_results
+
+    def _iter_query_batches(
+        self,
+        extra_payload: Optional[Dict[str, Any]] = None,
+        property_ids: Optional[List[str]] = None,
+        page_size: int = 100,
+    ) -> Iterator[list]:
+        """
+        データベースを検索し、ページネーションの1ページ (最大100件) ごとに結果を返すジェネレーター。
+
+        PREFETCH_PAGES が1以上の場合、次ページのリクエストはバックグラウンドスレッドで
+        next_cursor が判明した時点で送信されるため、呼び出し側の整形処理と通信が並行して進む。
+
+        Args:
+            extra_payload: リクエストボディに追加する項目 (filter, sorts など)。
+            property_ids: filter_properties に指定するプロパティID。Noneの場合は REQUIRED_PROPERTIES に従う。
+            page_size: 1リクエストあたりの取得件数 (最大100)。
+
+        Yields:
+            list: 各レスポンスの 'results' に含まれる生のデータリスト。
+
+        Raises:
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
+        """
+        batches = self._iter_query_batches_sequential(extra_payload, property_ids, page_size)
+        if self.PREFETCH_PAGES > 0:
+            batches = prefetch_iter(batches, depth=self.PREFETCH_PAGES)
+        return batches
+
+    def _iter_query_batches_sequential(
+        self,
+        extra_payload: Optional[Dict[str, Any]] = None,
+        property_ids: Optional[List[str]] = None,
+        page_size: int = 100,
+    ) -> Iterator[list]:
+        """
+        データベースを検索し、ページネーションの1ページ (最大100件) ごとに結果を順次取得して返すジェネレーター。
+
+        Args:
+            extra_payload: リクエストボディに追加する項目 (filter, sorts など)。
+            property_ids: filter_properties に指定するプロパティID。Noneの場合は REQUIRED_PROPERTIES に従う。
+            page_size: 1リクエストあたりの取得件数 (最大100)。
+
+        Yields:
+            list: 各レスポンスの 'results' に含まれる生のデータリスト。
+
+        Raises:
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
+        """
+        task_url = f"https://api.notion.com/v1/databases/{self.db_id}/query"
+        # 必要なプロパティのみをレスポンスに含める (未宣言の場合は全プロパティ)
+        if property_ids is None:
+            property_ids = self._get_property_ids()
+        params = {"filter_properties": property_ids}
+        fetched_count = 0
         has_more = True
         start_cursor = None
 
         while has_more:
             # ペイロード（リクエストボディ）の作成
-            payload = {"page_size": 100}  # 最大値の100を指定
+            payload = {"page_size": min(page_size, 100)}  # APIの最大値は100
+            if extra_payload:
+                payload.update(extra_payload)
             if start_cursor:
                 payload["start_cursor"] = start_cursor
 
             # リクエスト送信
-            res = requests.post(task_url, headers=self.headers, json=payload)
+            res = self.client.post(task_url, headers=self.headers, params=params, json=payload)
             if res.status_code != 200:
                 logging.error(f"Error getting DB {self.db_id}: {res.status_code}, message: {res.reason}")
-                raise Exception(f"Notion API Error: {res.status_code}")
+                raise NotionAPIError(f"Notion API Error: {res.status_code}", res.status_code)
 
             data = res.json()
             results = data.get("results", [])
-            all_results.extend(results)
+            fetched_count += len(results)
 
             # 次のページがあるか確認
             has_more = data.get("has_more", False)
             start_cursor = data.get("next_cursor")
 
-        logging.info(f"Fetched {len(all_results)} items from DB {self.db_id}")
-        return all_results
+            yield results
+
+        logging.info(f"Fetched {fetched_count} items from DB {self.db_id}")
 
-    def _process_raw_to_dict(self, raw_items: list) -> List[Dict[str, Any]]:
+    def _get_raw_data_incremental(self) -> list:
         """
-        生データをシンプルな辞書リストに変換する抽象メソッド。
+        ローカルスナップショットとウォーターマークを用いて生データを差分取得する。
+
+        スナップショットがない(または全件取得の期限切れの)場合は全件を取得する。
+        それ以外はウォーターマーク以降に last_edited_time が更新されたページのみを取得し、
+        スナップショットにマージしてから保存する。
+
+        Returns:
+            list: マージ後の生のデータリスト（全件）。
+        """
+        snapshot = self.snapshot_store.load(self.db_id)
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        property_ids = self._get_property_ids()
+
+        if snapshot is None or self.snapshot_store.needs_full_refresh(snapshot, property_ids):
+            pages = {item["id"]: item for item in self._query_all_pages()}
+            full_synced_at = now
+        else:
+            # Notionの last_edited_time は分単位に丸められるため、境界を含む on_or_after で取得する
+            watermark_filter = {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": snapshot["watermark"]},
+            }
+            pages = snapshot["pages"]
+            changed_items = self._query_all_pages({"filter": watermark_filter})
+            for item in changed_items:
+                if item.get("archived") or item.get("in_trash"):
+                    pages.pop(item["id"], None)
+                else:
+                    pages[item["id"]] = item
+            full_synced_at = snapshot["full_synced_at"]
+            logging.info(f"Merged {len(changed_items)} changed items into snapshot of DB {self.db_id}")
+
+        self.snapshot_store.save(self.db_id, pages, full_synced_at, property_ids)
+        return list(pages.values())
+
+    def _process_raw_item(self, raw_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        生データ1件をシンプルな辞書に変換する抽象メソッド。
 
         Note:
             子クラスでDBのプロパティ構造に合わせて実装必須。
 
         Args:
-            raw_items: APIから取得した生のデータリスト。
+            raw_item: APIから取得した生のページデータ。
+
+        Returns:
+            Optional[Dict[str, Any]]: 整形された辞書。変換できない場合はNone。
 
         Raises:
             NotImplementedError: 子クラスでの実装がない場合。
         """
-        raise NotImplementedError("Subclasses must implement _process_raw_to_dict()")
+        raise NotImplementedError("Subclasses must implement _process_raw_item()")
+
+    def _process_raw_item_columnar(self, raw_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        カラムバッファに追記するための変換。デフォルトでは _process_raw_item と同じ。
+
+        DATE 種別のカラムはDataFrame構築時にまとめてパースされるため、
+        子クラスはここで日付をISO 8601文字列のまま返すことができる。
+
+        Args:
+            raw_item: APIから取得した生のページデータ。
+
+        Returns:
+            Optional[Dict[str, Any]]: 整形された辞書。変換できない場合はNone。
+        """
+        return self._process_raw_item(raw_item)
+
+    def _process_raw_to_dict(self, raw_items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        生データをシンプルな辞書リストに変換する。
+
+        raw_items はジェネレーターでもよく、1件ずつ _process_raw_item で変換するため
+        変換済みの生データはすぐに解放される。
+
+        Args:
+            raw_items: APIから取得した生のデータ (リストまたはイテレーター)。
+
+        Returns:
+            List[Dict[str, Any]]: 整形された辞書リスト。変換できなかった要素は含まない。
+        """
+        items = []
+        pending_items = []
+        for raw_item in raw_items:
+            item = self._process_raw_item(raw_item)
+            if item is not None:
+                items.append(item)
+                if PENDING_KEY in item:
+                    pending_items.append(item)
+
+        if pending_items:
+            self._resolve_pending(pending_items)
+        return items
+
+    def _resolve_pending(self, items: List[Dict[str, Any]]) -> None:
+        """
+        整形時に解決できなかった項目 (PENDING_KEY) を、全件の整形が終わった後でまとめて解決する。
+
+        デフォルトでは何もせず、PENDING_KEY を取り除くだけ。子クラスは辞書をインプレースで更新する。
+
+        Args:
+            items: PENDING_KEY を持つ整形済みの辞書のリスト。
+        """
+        for item in items:
+            item.pop(PENDING_KEY, None)
+
+    def _load_and_process_data(self, raw_items: Optional[list] = None) -> None:
+        """
+        生データを取得し、整形メソッドを呼び出してpd_items (backend="records" の場合は records) に格納する。
+
+        Args:
+            raw_items: 取得済みの生データ。Noneの場合はAPIから逐次取得しながら整形する。
+
+        Raises:
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
+        """
+        if raw_items is None and self._load_from_frame_cache():
+            return
 
-    def _load_and_process_data(self) -> None:
-        """生データを取得し、整形メソッドを呼び出してpd_itemsに格納する。"""
+        self._loaded = True
         try:
-            raw_items = self._get_raw_data()
-            items_dict = self._process_raw_to_dict(raw_items)
-            self.pd_items = pd.json_normalize(items_dict)
+            if raw_items is None:
+                raw_items = self.iter_raw_items()
+            if self.backend == RECORDS_BACKEND:
+                self._records = [self._make_record(item) for item in self._process_raw_to_dict(raw_items)]
+                self._invalidate_indexes()
+            elif self.COLUMNS:
+                self.pd_items = self._build_columnar(raw_items)
+            else:
+                import pandas as pd
+
+                items_dict = self._process_raw_to_dict(raw_items)
+                self.pd_items = pd.json_normalize(items_dict)
+            self._save_to_frame_cache()
         except Exception as e:
+            # 取得に失敗したDBを「0件」と区別できるよう、記録した上で呼び出し元に送出する
             logging.error(f"Failed to load or process data for DB {self.db_id}: {e}")
+            raise
+
+    def _frame_cache_conditions(self) -> Dict[str, Any]:
+        """pd_items の内容を左右する取得条件を返す。フレームキャッシュのキーの作成に使用する。"""
+        return {
+            "db_class": type(self).__name__,
+            "filter": self.filter_payload,
+            "properties": list(self.REQUIRED_PROPERTIES),
+            "columns": self.COLUMNS,
+        }
+
+    def _frame_cache_key(self) -> str:
+        """pd_items の内容を左右する取得条件から、フレームキャッシュのキーを作成する。"""
+        return FrameCache.make_key(**self._frame_cache_conditions())
+
+    def _frame_cache_watermark(self) -> str:
+        """
+        フレームキャッシュのウォーターマークとして、ローカルのスナップショットの版を返す (ネットワークにはアクセスしない)。
+
+        他のエントリーポイントが差分取得でスナップショットを更新した場合は値が変わり、キャッシュは古いと判定される。
+        スナップショットを使用しない場合は空文字 (有効性は FrameCache の max_age のみで判定する)。
+        """
+        return self.snapshot_store.stamp(self.db_id) if self.snapshot_store is not None else ""
+
+    def _frame_cache_stamp(self) -> Optional[str]:
+        """有効なフレームキャッシュの保存日時を返す。キャッシュを使用しない、または有効でない場合はNone。"""
+        if self.frame_cache is None or self.backend != PANDAS_BACKEND:
+            return None
+        return self.frame_cache.stamp(self.db_id, self._frame_cache_key(), self._frame_cache_watermark())
+
+    def _load_from_frame_cache(self) -> bool:
+        """
+        フレームキャッシュが有効であれば pd_items をキャッシュから読み込む。
+
+        Returns:
+            bool: キャッシュから読み込んだ場合はTrue。
+        """
+        if self.frame_cache is None or self.backend != PANDAS_BACKEND:
+            return False
+        frame = self.frame_cache.load(self.db_id, self._frame_cache_key(), self._frame_cache_watermark())
+        if frame is None:
+            return False
+        # Parquetから読み込んだ文字列カラムは str 型 (欠損は NaN) になるため、構築時と同じ object 型 (欠損は None) に戻す
+        for name, kind in self.COLUMNS.items():
+            if kind == STRING and name in frame.columns:
+                values = frame[name].astype(object)
+                frame[name] = values.where(values.notna(), None)
+        self._loaded = True
+        self.pd_items = frame
+        return True
+
+    def _save_to_frame_cache(self) -> None:
+        """pd_items をフレームキャッシュに保存する。"""
+        if self.frame_cache is None or self.backend != PANDAS_BACKEND or self._pd_items is None:
+            return
+        self.frame_cache.save(
+            self.db_id, self._frame_cache_key(), self._pd_items, watermark=self._frame_cache_watermark()
+        )
+
+    def _build_columnar(self, raw_items: Iterable[Dict[str, Any]]) -> "pd.DataFrame":
+        """
+        生データを1件ずつ整形し、COLUMNS の定義に従った型付きのカラムバッファに追記してDataFrameを構築する。
+
+        Args:
+            raw_items: APIから取得した生のデータ (リストまたはイテレーター)。
+
+        Returns:
+            pd.DataFrame: 整形済みデータのDataFrame。
+        """
+        builder = ColumnarBuilder(self.COLUMNS)
+        pending_rows = []  # (行番号, 辞書)
+        for raw_item in raw_items:
+            item = self._process_raw_item_columnar(raw_item)
+            if item is not None:
+                if PENDING_KEY in item:
+                    pending_rows.append((len(builder), item))
+                builder.append(item)
+
+        # 解決できなかった項目はまとめて解決し、追記済みの行を上書きする
+        if pending_rows:
+            self._resolve_pending([item for _, item in pending_rows])
+            for position, item in pending_rows:
+                builder.update(position, item)
+        return builder.build(self._category_sets())
+
+    def _make_record(self, item: Dict[str, Any]) -> Any:
+        """
+        整形済みの辞書を records に格納するレコードに変換する。デフォルトでは辞書のまま返す。
+
+        Args:
+            item: _process_raw_item で整形された辞書。
+
+        Returns:
+            Any: records に格納するレコード。
+        """
+        return item
+
+    def _category_sets(self) -> Dict[str, List[str]]:
+        """
+        CATEGORY カラムのカテゴリ候補を返す。子クラスでスキーマや関連DBから固定のカテゴリ集合を与える場合に実装する。
+
+        Returns:
+            Dict[str, List[str]]: カラム名をキーとするカテゴリ候補の辞書。
+        """
+        return {}
+
+    def _schema_option_names(self, property_name: str) -> List[str]:
+        """
+        select / multi_select / status プロパティの選択肢名をスキーマから取得する。
+
+        Args:
+            property_name: プロパティ名。
+
+        Returns:
+            List[str]: 選択肢名のリスト。スキーマが取得できない場合やプロパティがない場合は空リスト。
+        """
+        try:
+            prop = self._get_schema().get(property_name, {})
+        except Exception as e:
+            logging.warning(f"Failed to get schema of DB {self.db_id}: {e}")
+            return []
+        options = prop.get(prop.get("type", ""), {})
+        if not isinstance(options, dict):
+            return []
+        return [option["name"] for option in options.get("options", [])]
+
+    @property
+    def pd_items(self) -> "pd.DataFrame":
+        """
+        整形済みデータを格納したDataFrame。
+
+        autoload=False で初期化され未取得の場合は、最初のアクセス時にデータを取得する。
+        backend="records" の場合は空のDataFrameを返す。
+
+        Raises:
+            NotionAPIError: 未取得の状態でアクセスし、データの取得に失敗した場合。
+        """
+        if not self._loaded:
+            self.load()
+        if self._pd_items is None:
+            import pandas as pd
+
+            self._pd_items = pd.DataFrame()
+        return self._pd_items
+
+    @pd_items.setter
+    def pd_items(self, value: Optional["pd.DataFrame"]) -> None:
+        # DataFrameが差し替えられたら検索用インデックスを破棄する
+        self._pd_items = value
+        self._invalidate_indexes()
+
+    @property
+    def records(self) -> List[Any]:
+        """
+        backend="records" の場合の整形済みデータ (レコードのリスト)。
+
+        autoload=False で初期化され未取得の場合は、最初のアクセス時にデータを取得する。
+        """
+        if not self._loaded:
+            self.load()
+        return self._records
+
+    def _invalidate_indexes(self) -> None:
+        """
+        検索用インデックスを破棄する。
+
+        Note:
+            pd_items をインプレースで変更した場合は、このメソッドを明示的に呼び出すこと。
+        """
+        self._indexes: Dict[str, Dict[Any, int]] = {}  # カラム名 -> {値: 行番号}
+        self._column_values: Dict[str, List[Any]] = {}  # カラム名 -> 値のリスト
+
+    def _get_index(self, column: str) -> Dict[Any, int]:
+        """
+        指定カラムの {値: 行番号} インデックスを返す。未構築の場合はここで構築する。
+
+        値が重複する場合は、get_item_from_pd の従来の挙動に合わせて最初の行を採用する。
+        """
+        index = self._indexes.get(column)
+        if index is None:
+            values = self._get_column_values(column)
+            index = {}
+            for position, value in enumerate(values):
+                index.setdefault(value, position)
+            self._indexes[column] = index
+        return index
+
+    def _get_column_values(self, column: str) -> List[Any]:
+        """指定カラムの値のリストを返す。未取得の場合はここでDataFrame (またはレコード) から取り出す。"""
+        values = self._column_values.get(column)
+        if values is None:
+            if self.backend == RECORDS_BACKEND:
+                values = [
+                    record.get(column) if isinstance(record, dict) else getattr(record, column, None)
+                    for record in self.records
+                ]
+            else:
+                values = self.pd_items[column].tolist()
+            self._column_values[column] = values
+        return values
+
+    def _get_column_names(self) -> List[str]:
+        """整形済みデータのカラム名のリストを返す。"""
+        if self.backend != RECORDS_BACKEND:
+            return list(self.pd_items.columns.values)
+        if self.COLUMNS:
+            return list(self.COLUMNS)
+        records = self.records
+        return list(records[0]) if records and isinstance(records[0], dict) else []
+
+    def _check_columns(self, in_cul: str, out_cul: str) -> None:
+        """
+        指定されたカラムがDataFrameに存在するか確認する。
+
+        Raises:
+            ValueError: 指定されたカラムがDataFrameに存在しない場合。
+        """
+        columns = self._get_column_names()
+        if in_cul not in columns or out_cul not in columns:
+            logging.error(f"Error: Columns missing: {in_cul} or {out_cul}")
+            raise ValueError("指定されたカラムがDataFrameに存在しません。")
 
     def get_item_from_pd(self, in_cul: str, in_value: str, out_cul: str) -> str:
         """
         DataFrameから指定条件で単一アイテムの値を取得する。
 
+        in_cul ごとに辞書インデックスを遅延構築するため、2回目以降の検索は O(1) で行える。
+
         Args:
             in_cul: フィルタリングに使用するカラム名。
             in_value: in_culで探す値。
@@ -107,17 +710,108 @@ class BaseNotionDB:
             ValueError: 指定されたカラムがDataFrameに存在しない場合。
             LookupError: 指定されたin_valueを持つ行が見つからない場合。
         """
-        if in_cul not in self.pd_items.columns.values or out_cul not in self.pd_items.columns.values:
-            logging.error(f"Error: Columns missing: {in_cul} or {out_cul}")
-            raise ValueError("指定されたカラムがDataFrameに存在しません。")
-        try:
-            return self.pd_items[self.pd_items[in_cul] == in_value][out_cul].iat[0]
-        except IndexError:
+        self._check_columns(in_cul, out_cul)
+        position = self._get_index(in_cul).get(in_value)
+        if position is None:
             logging.error(f"Error: Value not found for {in_cul}='{in_value}' in DB {self.db_id}")
             raise LookupError(f"値が見つかりません: {in_value}")
+        return self._get_column_values(out_cul)[position]
+
+    def lookup_many(self, in_cul: str, in_values: List[Any], out_cul: str, default: Any = None) -> List[Any]:
+        """
+        複数の値をまとめて検索し、対応する out_cul の値のリストを返す。
+
+        Args:
+            in_cul: フィルタリングに使用するカラム名。
+            in_values: in_culで探す値のリスト。
+            out_cul: 取得したい値が格納されているカラム名。
+            default: 見つからなかった値の代わりに返す値。デフォルトは None。
+
+        Returns:
+            List[Any]: in_values と同じ順序の検索結果のリスト。
+
+        Raises:
+            ValueError: 指定されたカラムがDataFrameに存在しない場合。
+        """
+        self._check_columns(in_cul, out_cul)
+        index = self._get_index(in_cul)
+        out_values = self._get_column_values(out_cul)
+        results = []
+        for value in in_values:
+            position = index.get(value)
+            results.append(default if position is None else out_values[position])
+        return results
+
+    def retrieve_pages(self, page_ids: Iterable[str], max_workers: int = 4) -> Dict[str, Dict[str, Any]]:
+        """
+        複数のページを並列に取得する (GET /v1/pages/{page_id})。
+
+        リクエストは共有の NotionClient (レートリミッター) を経由するため、
+        max_workers を増やしてもAPIの制限を超えることはない。
+
+        Args:
+            page_ids: 取得するページIDのリスト。
+            max_workers: 同時に送信するリクエスト数の上限。
+
+        Returns:
+            Dict[str, Dict[str, Any]]: ページIDをキーとする生のページデータ。取得できなかったページは含まない。
+        """
+        page_ids = list(dict.fromkeys(page_ids))
+        if not page_ids:
+            return {}
+
+        def _retrieve(page_id: str) -> Optional[Dict[str, Any]]:
+            url = f"https://api.notion.com/v1/pages/{page_id}"
+            try:
+                res = self.client.get(url, headers=self.headers)
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Failed to retrieve page {page_id}: {e}")
+                return None
+            if res.status_code != 200:
+                logging.error(f"Failed to retrieve page {page_id}: {res.status_code}, message: {res.reason}")
+                return None
+            return res.json()
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(page_ids)), thread_name_prefix="notion-page"
+        ) as executor:
+            pages = list(executor.map(_retrieve, page_ids))
+        logging.info(f"Retrieved {sum(page is not None for page in pages)}/{len(page_ids)} pages")
+        return {page_id: page for page_id, page in zip(page_ids, pages) if page is not None}
+
+    def backfill(self, raw_items: Iterable[Dict[str, Any]]) -> int:
+        """
+        取得済みのデータに後からページを追加する。
+
+        全件を取得し直さずに、読み込み後に見つかったページ (新規作成された関連先など) を
+        pd_items (backend="records" の場合は records) と検索用インデックスに反映する。
+
+        Args:
+            raw_items: 追加する生のページデータ。
+
+        Returns:
+            int: 追加した件数。
+        """
+        items = [item for item in (self._process_raw_item(raw_item) for raw_item in raw_items) if item is not None]
+        if not items:
+            return 0
+
+        if self.backend == RECORDS_BACKEND:
+            self.records.extend(self._make_record(item) for item in items)
+            self._invalidate_indexes()
+        else:
+            import pandas as pd
+
+            current = self.pd_items
+            columns = list(self.COLUMNS) if self.COLUMNS else None
+            added = pd.DataFrame(items, columns=columns)
+            self.pd_items = added if current.empty else pd.concat([current, added], ignore_index=True)
+            self._save_to_frame_cache()
+        logging.info(f"Backfilled {len(items)} items into DB {self.db_id}")
+        return len(items)
 
     # Notionページを更新
-    def update_page(self, page_id: str, properties: Dict[str, Any]) -> None:
+    def update_page(self, page_id: str, properties: Dict[str, Any]) -> Dict[str, Any]:
         """
         指定したページのプロパティを更新する。
 
@@ -125,42 +819,85 @@ class BaseNotionDB:
             page_id (str): 更新対象のNotionページID。
             properties (Dict[str, Any]): 更新するプロパティの内容 (API仕様に基づく辞書構造)。
 
+        Returns:
+            Dict[str, Any]: 更新後のページデータ (last_edited_time を含む)。
+
         Raises:
-            Exception: 更新リクエストが失敗した場合。
+            NotionAPIError: 再試行しても更新リクエストが失敗した場合。
         """
         update_url = f"https://api.notion.com/v1/pages/{page_id}"
         payload = {"properties": properties}
 
-        res = requests.patch(update_url, headers=self.headers, json=payload)
+        res = self.client.patch(update_url, headers=self.headers, json=payload)
         if res.status_code != 200:
             logging.error(f"Failed to update page {page_id}: {res.status_code} {res.text}")
-            raise Exception(f"Notion Update Error: {res.status_code}")
+            raise NotionAPIError(f"Notion Update Error: {res.status_code}", res.status_code)
         logging.info(f"Updated Notion Page: {page_id}")
+        return res.json()
 
-    def query(self, filter_payload: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """条件を指定してデータベースを検索し、結果を取得します。
+    def query(
+        self,
+        filter_payload: Optional[Dict[str, Any]],
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        page_size: int = 100,
+        properties: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """条件を指定してデータベースを検索し、結果を全件取得します。
 
-        requestsライブラリを使用して直接APIを叩きます。
+        next_cursor をたどって100件を超える結果もすべて取得します。
+        大量の結果を逐次処理したい場合は iter_query() を使用してください。
 
         Args:
-            filter_payload (Dict[str, Any]): Notion APIのフィルターオブジェクト。
+            filter_payload (Optional[Dict[str, Any]]): Notion APIのフィルターオブジェクト。
                 例: {"property": "Status", "status": {"equals": "Done"}}
+            sorts (Optional[List[Dict[str, Any]]]): Notion APIのソート条件のリスト。
+            page_size (int): 1リクエストあたりの取得件数 (最大100)。
+            properties (Optional[Iterable[str]]): 取得するプロパティ名。Noneの場合は全プロパティ。
 
         Returns:
             List[Dict[str, Any]]: 取得したページのリスト（辞書形式）。
             エラー時は空リストを返し、ログにエラーを出力します。
         """
-        url = f"https://api.notion.com/v1/databases/{self.db_id}/query"
-        payload = {"filter": filter_payload} if filter_payload else {}
-
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json().get("results", [])
-        except requests.exceptions.RequestException as e:
+            return list(self.iter_query(filter_payload, sorts=sorts, page_size=page_size, properties=properties))
+        except (NotionAPIError, requests.exceptions.RequestException) as e:
             logging.error(f"Notion API query error: {e}")
             return []
 
+    def iter_query(
+        self,
+        filter_payload: Optional[Dict[str, Any]],
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        page_size: int = 100,
+        properties: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """条件を指定してデータベースを検索し、結果を1件ずつ返すジェネレーターです。
+
+        全件ロードと同じく、共有の NotionClient (接続プール・レート制限) と
+        次ページの先読みを使用してページネーションをたどります。
+
+        Args:
+            filter_payload (Optional[Dict[str, Any]]): Notion APIのフィルターオブジェクト。
+            sorts (Optional[List[Dict[str, Any]]]): Notion APIのソート条件のリスト。
+            page_size (int): 1リクエストあたりの取得件数 (最大100)。
+            properties (Optional[Iterable[str]]): 取得するプロパティ名。Noneの場合は全プロパティ。
+
+        Yields:
+            Dict[str, Any]: 取得したページ（辞書形式）。
+
+        Raises:
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
+        """
+        payload: Dict[str, Any] = {}
+        if filter_payload:
+            payload["filter"] = filter_payload
+        if sorts:
+            payload["sorts"] = sorts
+        property_ids = self._resolve_property_ids(properties) if properties is not None else []
+
+        for batch in self._iter_query_batches(payload, property_ids=property_ids, page_size=page_size):
+            yield from batch
+
     def create_page(
         self, properties: Dict[str, Any], children: Optional[List[Dict[str, Any]]] = None
     ) -> Optional[Dict[str, Any]]:
@@ -180,7 +917,8 @@ class BaseNotionDB:
             body["children"] = children
 
         try:
-            response = requests.post(url, headers=self.headers, json=body)
+            # 再送するとページが重複して作成されるため、Notionに届いた可能性のあるエラーでは再試行しない
+            response = self.client.post(url, headers=self.headers, json=body, idempotent=False)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -215,7 +953,8 @@ class BaseNotionDB:
                 # Notion APIでは既存ブロックへの子ブロック追加は
                 # /v1/blocks/{block_id}/children に対する PATCH で行う
                 # （新規ページ作成は /v1/pages への POST を使用）
-                response = requests.patch(url, headers=self.headers, json=payload)
+                # 再送するとブロックが重複して追加されるため、Notionに届いた可能性のあるエラーでは再試行しない
+                response = self.client.patch(url, headers=self.headers, json=payload, idempotent=False)
                 response.raise_for_status()
                 last_response = response.json()
                 logging.info(f"Appended blocks batch {i//batch_size + 1}")
@@ -231,61 +970,149 @@ class RelatedDB(BaseNotionDB):
     プロジェクトやスプリントなど、シンプルな構造の関連DBクラス。
     """
 
-    def _process_raw_to_dict(self, raw_items: list) -> List[Dict[str, Any]]:
+    REQUIRED_PROPERTIES = ("プロジェクト名", "スプリント名", "ステータス")
+    COLUMNS = {"title": STRING, "id": STRING, "status": STRING}
+
+    # タイトルプロパティ名の判定結果 (未判定の場合は None、見つからなかった場合は空文字)
+    _title_property: Optional[str] = None
+
+    def _process_raw_item(self, raw_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
-        生のAPIデータをシンプルな辞書形式に変換する（関連DB特化）。
+        生のAPIデータ1件をシンプルな辞書形式に変換する（関連DB特化）。
 
         Args:
-            raw_items: APIから取得した生のデータリスト。
+            raw_item: APIから取得した生のページデータ。
 
         Returns:
-            list: 整形された辞書リスト (title, id, statusを含む)。
+            Optional[Dict[str, Any]]: 整形された辞書 (title, id, statusを含む)。変換できない場合はNone。
         """
-        items = []
-        if not raw_items:
-            return []
-
-        # DBの種別に応じて要素名を動的に判定
-        prop_keys = raw_items[0]["properties"].keys()
-        elem_name = None
-        if "プロジェクト名" in prop_keys:
-            elem_name = "プロジェクト名"
-        elif "スプリント名" in prop_keys:
-            elem_name = "スプリント名"
-
-        if elem_name is None:
-            logging.warning(f"関連DB {self.db_id} のタイトルプロパティが見つかりませんでした。")
-            return []
+        if self._title_property is None:
+            # DBの種別に応じて要素名を動的に判定 (最初の1件で判定する)
+            prop_keys = raw_item["properties"].keys()
+            self._title_property = ""
+            if "プロジェクト名" in prop_keys:
+                self._title_property = "プロジェクト名"
+            elif "スプリント名" in prop_keys:
+                self._title_property = "スプリント名"
+            else:
+                logging.warning(f"関連DB {self.db_id} のタイトルプロパティが見つかりませんでした。")
+
+        if not self._title_property:
+            return None
 
-        for raw_item in raw_items:
-            try:
-                item = {
-                    "title": raw_item["properties"][elem_name]["title"][0]["plain_text"],
-                    "id": raw_item["id"],
-                    "status": raw_item["properties"]["ステータス"]["status"]["id"],
-                }
-                items.append(item)
-            except Exception as e:
-                logging.error(f"関連DBデータ変換エラー for item {raw_item.get('id', 'N/A')}: {e}")
-        return items
+        try:
+            return {
+                "title": raw_item["properties"][self._title_property]["title"][0]["plain_text"],
+                "id": raw_item["id"],
+                "status": raw_item["properties"]["ステータス"]["status"]["id"],
+            }
+        except Exception as e:
+            logging.error(f"関連DBデータ変換エラー for item {raw_item.get('id', 'N/A')}: {e}")
+            return None
 
 
 class TaskDB(BaseNotionDB):
     """
     タスクDBに特化したクラス。リレーションシップの解決も行う。
 
+    rollup_properties を指定した場合は、プロジェクト名・スプリント名・スプリントのステータスを
+    タスクDB自身のロールアップ (または数式) プロパティから取得するため、関連DBを取得する必要がない。
+
     Args:
         db_id: NotionデータベースID。
         token: Notionインテグレーションの認証トークン。
-        related_dbs: 関連する RelatedDB インスタンスをキーにDB名を持つ辞書。
+        related_dbs: 関連する RelatedDB インスタンスをキーにDB名を持つ辞書。rollup_properties 指定時は空でよい。
         version: Notion APIのバージョン。
+        client: HTTP通信に使用する NotionClient。Noneの場合は共有クライアント。
+        autoload: Falseの場合、初期化時にはデータを取得せず、pd_items への最初のアクセス時に取得する。
+        snapshot_store: 生データの差分取得に使用するスナップショットストア。
+        filter_payload: データ取得時にサーバー側で適用するNotion APIのフィルター。
+        backend: 整形済みデータの保持形式。"records" の場合は records に Task のリストを格納する。
+        rollup_properties: カラム名 ("project", "sprint", "sprint_status") をキー、
+            値を取得するタスクDBのプロパティ名を値とする辞書。Noneの場合はリレーションを関連DBで解決する。
+        frame_cache: 整形済みの pd_items を保存・再利用するフレームキャッシュ。
     """
 
+    REQUIRED_PROPERTIES = (
+        "タスク名",
+        "プロジェクト",
+        "スプリント",
+        "期限",
+        "ステータス",
+        "タグ",
+        "作業日",
+        "GCal_Event_ID",
+    )
+    # 日付は datetime64、ステータス・タグ・プロジェクト・スプリントは categorical として保持する
+    COLUMNS = {
+        "title": STRING,
+        "status": CATEGORY,
+        "project": CATEGORY,
+        "start": DATE,
+        "end": DATE,
+        "work_date": DATE,
+        "sprint": CATEGORY,
+        "tag": CATEGORY,
+        "id": STRING,
+        "gcal_event_id": STRING,
+        "last_edited_time": STRING,
+        "sprint_status": STRING,
+    }
+    # 日付として扱うカラム
+    DATE_FIELDS = ("start", "end", "work_date")
+    # 関連DBを使わない場合に参照するロールアップのプロパティ名 (カラム名 -> タスクDBのプロパティ名)
+    # スプリントのステータスは RelatedDB の status と同じく、ステータスのIDを格納する
+    DEFAULT_ROLLUP_PROPERTIES = {
+        "project": "プロジェクト名",
+        "sprint": "スプリント名",
+        "sprint_status": "スプリントステータス",
+    }
+
     def __init__(
-        self, db_id: str, token: str, related_dbs: Dict[str, "RelatedDB"], version: str = "2022-06-28"
+        self,
+        db_id: str,
+        token: str,
+        related_dbs: Dict[str, "RelatedDB"],
+        version: str = "2022-06-28",
+        client: Optional[NotionClient] = None,
+        autoload: bool = True,
+        snapshot_store: Optional[RawSnapshotStore] = None,
+        filter_payload: Optional[Dict[str, Any]] = None,
+        backend: str = PANDAS_BACKEND,
+        rollup_properties: Optional[Dict[str, str]] = None,
+        frame_cache: Optional[FrameCache] = None,
     ) -> None:
         self.related_dbs = related_dbs
-        super().__init__(db_id, token, version)
+        self.rollup_properties = rollup_properties
+        if rollup_properties:
+            # ロールアップのプロパティも filter_properties で取得する
+            self.REQUIRED_PROPERTIES = self.REQUIRED_PROPERTIES + tuple(rollup_properties.values())
+        super().__init__(
+            db_id,
+            token,
+            version,
+            client=client,
+            autoload=autoload,
+            snapshot_store=snapshot_store,
+            filter_payload=filter_payload,
+            backend=backend,
+            frame_cache=frame_cache,
+        )
+
+    def _frame_cache_conditions(self) -> Dict[str, Any]:
+        """
+        pd_items の内容を左右する取得条件を返す。
+
+        関連DBで解決したプロジェクト名・スプリント名を含むため、関連DBのフレームキャッシュの保存日時も条件に含める。
+        関連DBが取得し直された (名前の変更が反映された可能性がある) 場合や、関連DBのキャッシュが有効でない場合は
+        タスクDBのキャッシュも使用しない。
+        """
+        conditions = super()._frame_cache_conditions()
+        conditions["related"] = {
+            name: db._frame_cache_stamp() if isinstance(db, BaseNotionDB) else None
+            for name, db in self.related_dbs.items()
+        }
+        return conditions
 
     def _date_string_to_date(self, date_string: str) -> datetime.date:
         """
@@ -300,148 +1127,321 @@ class TaskDB(BaseNotionDB):
         # タイムスタンプ部分を無視し、日付部分のみを取得してパース
         return datetime.datetime.strptime(date_string.split("T")[0], "%Y-%m-%d").date()
 
-    def _parse_date_property(
-        self, date_prop: Optional[Dict[str, Any]], field: str = "start", return_range: bool = False
-    ) -> Union[Optional[datetime.date], Tuple[Optional[datetime.date], Optional[datetime.date]]]:
+    @staticmethod
+    def _date_range_strings(date_prop: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str]]:
         """
-        Notionの日付プロパティを解析し、指定されたフィールドまたは日付範囲を返す汎用関数。
+        Notionの日付プロパティから、開始日と終了日のISO 8601文字列をそのまま取り出す。
 
         Args:
             date_prop: Notionのdateプロパティの辞書 ({"start": ..., "end": ...})。
-            field: 取得したい日付フィールド ("start" または "end")。
-            return_range: Trueの場合、(開始日, 終了日) のタプルを返す。Falseの場合、fieldで指定された単一の日付を返す。
 
         Returns:
-            datetime.date or tuple:
-                - return_range=False: 指定されたフィールドの日付 (Optional[datetime.date])
-                - return_range=True: (開始日, 終了日) のタプル (tuple[Optional[datetime.date], Optional[datetime.date]])
+            Tuple[Optional[str], Optional[str]]: (開始日, 終了日) の文字列のタプル。未設定の場合はNone。
         """
         if date_prop is None:
-            if return_range:
-                return None, None
-            return None
+            return None, None
+        return date_prop.get("start"), date_prop.get("end")
 
-        start_date = None
-        end_date = None
+    def _process_raw_item(self, raw_task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        生のAPIタスクデータ1件を整形された辞書形式に変換する（タスクDB特化）。
 
-        if date_prop.get("start") is not None:
-            start_date = self._date_string_to_date(date_prop["start"])
+        日付 (start, end, work_date) は datetime.date に変換する。
 
-        if return_range:
-            # 日付範囲が必要な場合
-            if date_prop.get("end") is not None:
-                end_date = self._date_string_to_date(date_prop["end"])
-            return start_date, end_date
+        Args:
+            raw_task: APIから取得した生のタスクページデータ。
 
-        else:
-            # 単一の日付が必要な場合
-            if field == "start":
-                return start_date
-            elif field == "end" and date_prop.get("end") is not None:
-                return self._date_string_to_date(date_prop["end"])
+        Returns:
+            Optional[Dict[str, Any]]: 整形されたタスクの辞書。変換できない場合はNone。
+        """
+        task = self._extract_task(raw_task)
+        if task is None:
+            return None
+        for field in self.DATE_FIELDS:
+            if task[field] is not None:
+                task[field] = self._date_string_to_date(task[field])
+        return task
+
+    def _make_record(self, item: Dict[str, Any]) -> Task:
+        """整形済みの辞書を Task レコードに変換する。"""
+        return Task.from_dict(item)
 
-            return None  # 指定されたフィールドがない、またはendでendが空の場合
+    def _category_sets(self) -> Dict[str, List[str]]:
+        """
+        カテゴリ候補を、ステータス・タグはNotionのスキーマ、プロジェクト・スプリントは関連DBのタイトルから作成する。
 
-    def _process_raw_to_dict(self, raw_tasks: list) -> List[Dict[str, Any]]:
+        Returns:
+            Dict[str, List[str]]: カラム名をキーとするカテゴリ候補の辞書。
         """
-        生のAPIタスクデータを整形された辞書形式に変換する（タスクDB特化）。
+        categories = {
+            "status": self._schema_option_names("ステータス"),
+            "tag": self._schema_option_names("タグ") + ["その他"],
+        }
+        for column, db_name in (("project", "Projects"), ("sprint", "Sprints")):
+            related_db = self.related_dbs.get(db_name)
+            related_items = getattr(related_db, "pd_items", None)
+            if related_items is not None and "title" in getattr(related_items, "columns", ()):
+                categories[column] = related_items["title"].dropna().tolist()
+        return categories
+
+    def _process_raw_item_columnar(self, raw_task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
-        tasks = []
-        Projects: "RelatedDB" = self.related_dbs["Projects"]
-        Sprints: "RelatedDB" = self.related_dbs["Sprints"]
+        カラムバッファ用の変換。日付は文字列のまま返し、DataFrame構築時にまとめてパースする。
 
-        for raw_task in raw_tasks:
-            task_name = "N/A"
-            try:
-                task_name = raw_task["properties"]["タスク名"]["title"][0]["plain_text"]
+        Args:
+            raw_task: APIから取得した生のタスクページデータ。
+
+        Returns:
+            Optional[Dict[str, Any]]: 整形されたタスクの辞書 (日付はISO 8601文字列)。変換できない場合はNone。
+        """
+        return self._extract_task(raw_task)
 
+    def _extract_task(self, raw_task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        生のAPIタスクデータ1件から各項目を取り出す。日付はISO 8601文字列のまま返す。
+
+        Args:
+            raw_task: APIから取得した生のタスクページデータ。
+
+        Returns:
+            Optional[Dict[str, Any]]: タスクの辞書。変換できない場合はNone。
+        """
+        task_name = "N/A"
+        pending: List[Tuple[str, str, str]] = []  # 関連DBに見つからなかったリレーション
+        try:
+            task_name = raw_task["properties"]["タスク名"]["title"][0]["plain_text"]
+
+            sprint_status = None
+            if self.rollup_properties:
+                # プロジェクト名・スプリント名・スプリントのステータスをロールアップから取得
+                pj_name = self._rollup_value(raw_task, "project") or ""
+                sprint_name = self._rollup_value(raw_task, "sprint")
+                sprint_status = self._rollup_value(raw_task, "sprint_status", option_key="id")
+                if sprint_name is None:
+                    logging.warning(f"{task_name}: Sprint is missing.")
+            else:
                 # プロジェクト名
                 pj_relation = raw_task["properties"]["プロジェクト"]["relation"]
                 pj_name = ""
                 if len(pj_relation) > 0:
                     pj_id = pj_relation[0]["id"]
-                    pj_name = Projects.get_item_from_pd("id", pj_id, "title")
+                    pj_name = self._lookup_relation("Projects", pj_id, "project", pending, default="")
 
                 # スプリント名解決
                 sprint_relation = raw_task["properties"]["スプリント"]["relation"]
                 sprint_name = None
                 if len(sprint_relation) > 0:
                     sprint_id = sprint_relation[0]["id"]
-                    sprint_name = Sprints.get_item_from_pd("id", sprint_id, "title")
+                    sprint_name = self._lookup_relation("Sprints", sprint_id, "sprint", pending)
                 else:
                     logging.warning(f"{task_name}: Sprint is missing.")
 
-                # 期限日の処理 (日付範囲として取得)
-                start_date, end_date = self._parse_date_property(
-                    raw_task["properties"]["期限"]["date"], return_range=True
-                )
-
-                # ステータス
-                status = raw_task["properties"]["ステータス"]["status"]["name"]
-
-                # タグ
-                tag_select = raw_task["properties"]["タグ"]["multi_select"]
-                tag = tag_select[0]["name"] if len(tag_select) > 0 else "その他"
-                if len(tag_select) == 0:
-                    logging.warning(f"{task_name}: Tag is missing. Defaulting to 'その他'.")
-
-                # IDと最終更新日時
-                task_id = raw_task["id"]
-                last_edited = raw_task["last_edited_time"]
-
-                # 作業日の処理 (開始日のみ取得)
-                work_date = self._parse_date_property(
-                    raw_task["properties"]["作業日"]["date"], field="start", return_range=False
-                )
-
-                # GCal Event ID
-                gcal_id_prop = raw_task["properties"].get("GCal_Event_ID", {}).get("rich_text", [])
-                gcal_event_id = gcal_id_prop[0]["plain_text"] if gcal_id_prop else None
-
-                task = {
-                    "title": task_name,
-                    "status": status,
-                    "project": pj_name,
-                    "start": start_date,
-                    "end": end_date,
-                    "work_date": work_date,
-                    "sprint": sprint_name,
-                    "tag": tag,
-                    "id": task_id,
-                    "gcal_event_id": gcal_event_id,
-                    "last_edited_time": last_edited,
-                }
-                tasks.append(task)
-            except Exception as e:
-                logging.error(f"タスク変換エラー ({raw_task.get('id', 'N/A')}, Name: {task_name}): {e}")
-                continue
-        return tasks
+            # 期限日の処理 (日付範囲として取得)
+            start_date, end_date = self._date_range_strings(raw_task["properties"]["期限"]["date"])
+
+            # ステータス
+            status = raw_task["properties"]["ステータス"]["status"]["name"]
+
+            # タグ
+            tag_select = raw_task["properties"]["タグ"]["multi_select"]
+            tag = tag_select[0]["name"] if len(tag_select) > 0 else "その他"
+            if len(tag_select) == 0:
+                logging.warning(f"{task_name}: Tag is missing. Defaulting to 'その他'.")
+
+            # IDと最終更新日時
+            task_id = raw_task["id"]
+            last_edited = raw_task["last_edited_time"]
+
+            # 作業日の処理 (開始日のみ取得)
+            work_date, _ = self._date_range_strings(raw_task["properties"]["作業日"]["date"])
+
+            # GCal Event ID
+            gcal_id_prop = raw_task["properties"].get("GCal_Event_ID", {}).get("rich_text", [])
+            gcal_event_id = gcal_id_prop[0]["plain_text"] if gcal_id_prop else None
+
+            task = {
+                "title": task_name,
+                "status": status,
+                "project": pj_name,
+                "start": start_date,
+                "end": end_date,
+                "work_date": work_date,
+                "sprint": sprint_name,
+                "tag": tag,
+                "id": task_id,
+                "gcal_event_id": gcal_event_id,
+                "last_edited_time": last_edited,
+                "sprint_status": sprint_status,
+            }
+            if pending:
+                task[PENDING_KEY] = pending
+            return task
+        except Exception as e:
+            logging.error(f"タスク変換エラー ({raw_task.get('id', 'N/A')}, Name: {task_name}): {e}")
+            return None
+
+    def _rollup_value(self, raw_task: Dict[str, Any], column: str, option_key: str = "name") -> Optional[str]:
+        """
+        rollup_properties で指定されたプロパティから文字列の値を取り出す。
+
+        Args:
+            raw_task: APIから取得した生のタスクページデータ。
+            column: rollup_properties のキー ("project", "sprint", "sprint_status")。
+            option_key: select / status の値から取り出すキー ("name" または "id")。
+
+        Returns:
+            Optional[str]: プロパティの値。プロパティがない、または値が空の場合はNone。
+        """
+        prop = raw_task["properties"].get(self.rollup_properties.get(column, ""))
+        if prop is None:
+            return None
+        return self._property_text(prop, option_key)
+
+    @classmethod
+    def _property_text(cls, prop: Dict[str, Any], option_key: str = "name") -> Optional[str]:
+        """
+        ロールアップ・数式・テキストなどのプロパティ値を文字列に変換する。
 
-    def get_done_tasks(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        ロールアップ (配列) の場合は、値が空でない最初の要素を変換する。
+
+        Args:
+            prop: プロパティ値の辞書 ({"type": ..., <type>: ...})。
+            option_key: select / status の値から取り出すキー ("name" または "id")。
+
+        Returns:
+            Optional[str]: 変換した文字列。値が空、または未対応の種類の場合はNone。
+        """
+        kind = prop.get("type")
+        value = prop.get(kind)
+        if value is None:
+            return None
+        if kind in ("title", "rich_text"):
+            return "".join(text.get("plain_text", "") for text in value) or None
+        if kind in ("select", "status"):
+            return value.get(option_key)
+        if kind == "formula":
+            result = value.get(value.get("type"))
+            return str(result) if result not in (None, "") else None
+        if kind == "rollup":
+            for element in value.get("array", []):
+                text = cls._property_text(element, option_key)
+                if text is not None:
+                    return text
+        return None
+
+    def _lookup_relation(
+        self, db_name: str, page_id: str, column: str, pending: List[Tuple[str, str, str]], default: Any = None
+    ) -> Any:
+        """
+        リレーション先のページIDを関連DBのタイトルに変換する。
+
+        関連DBに見つからない場合は pending に (カラム名, 関連DB名, ページID) を追加して default を返す。
+        見つからなかったリレーションは全件の整形後に _resolve_pending でまとめて取得する。
+
+        Args:
+            db_name: related_dbs のキー ("Projects" または "Sprints")。
+            page_id: リレーション先のページID。
+            column: 変換結果を格納するカラム名。
+            pending: 見つからなかったリレーションの追加先。
+            default: 見つからなかった場合に仮に返す値。
+
+        Returns:
+            Any: 関連DBのタイトル。見つからない場合は default。
+        """
+        try:
+            title = self.related_dbs[db_name].lookup_many("id", [page_id], "title")[0]
+        except ValueError:
+            # 関連DBの取得に失敗している場合も、見つからなかったものとしてまとめて取得する
+            title = None
+        if title is None:
+            pending.append((column, db_name, page_id))
+            return default
+        return title
+
+    def _resolve_pending(self, items: List[Dict[str, Any]]) -> None:
+        """
+        関連DBに見つからなかったリレーション先のページを1回の並列取得でまとめて取得し、
+        関連DBに追加 (backfill) してからタスクのプロジェクト名・スプリント名を埋める。
+
+        取得できなかったリレーションは未設定 (プロジェクトは空文字、スプリントはNone) のまま残す。
+
+        Args:
+            items: PENDING_KEY を持つ整形済みのタスクの辞書のリスト。
+        """
+        page_db_names: Dict[str, str] = {}
+        for item in items:
+            for _, db_name, page_id in item[PENDING_KEY]:
+                page_db_names[page_id] = db_name
+        logging.info(f"Resolving {len(page_db_names)} relation(s) missing from related DBs")
+
+        raw_pages = self.retrieve_pages(page_db_names)
+        for db_name in set(page_db_names.values()):
+            related_db = self.related_dbs[db_name]
+            pages = [page for page_id, page in raw_pages.items() if page_db_names[page_id] == db_name]
+            if pages and hasattr(related_db, "backfill"):
+                related_db.backfill(pages)
+
+        for item in items:
+            for column, db_name, page_id in item.pop(PENDING_KEY):
+                try:
+                    title = self.related_dbs[db_name].lookup_many("id", [page_id], "title")[0]
+                except ValueError:
+                    title = None
+                if title is None:
+                    logging.warning(f"{item['title']}: Relation {page_id} not found in {db_name}.")
+                else:
+                    item[column] = title
+
+    def get_done_tasks(
+        self, start_date: str, end_date: str, properties: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
         """指定期間内に完了したタスクを取得します。
 
         Args:
             start_date (str): 期間開始日 (ISO 8601形式: YYYY-MM-DD)。
             end_date (str): 期間終了日 (ISO 8601形式: YYYY-MM-DD)。
+            properties (Optional[Iterable[str]]): 取得するプロパティ名。Noneの場合は全プロパティ。
 
         Returns:
-            List[Dict[str, Any]]: 検索条件に合致したタスクページのリスト。
+            List[Dict[str, Any]]: 検索条件に合致したタスクページのリスト（全件）。
+        """
+        return self.query(self._done_tasks_filter(start_date, end_date), properties=properties)
+
+    def iter_done_tasks(
+        self, start_date: str, end_date: str, properties: Optional[Iterable[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """指定期間内に完了したタスクを1件ずつ返すジェネレーターです。
+
+        Args:
+            start_date (str): 期間開始日 (ISO 8601形式: YYYY-MM-DD)。
+            end_date (str): 期間終了日 (ISO 8601形式: YYYY-MM-DD)。
+            properties (Optional[Iterable[str]]): 取得するプロパティ名。Noneの場合は全プロパティ。
+
+        Yields:
+            Dict[str, Any]: 検索条件に合致したタスクページ。
+
+        Raises:
+            NotionAPIError: 再試行してもAPIリクエストが失敗した場合。
         """
+        return self.iter_query(self._done_tasks_filter(start_date, end_date), properties=properties)
+
+    @staticmethod
+    def _done_tasks_filter(start_date: str, end_date: str) -> Dict[str, Any]:
+        """完了タスク検索用のフィルターを作成します。"""
         # ※プロパティ名は既存のCSV設定に合わせて「ステータス」「作業日」としています
-        filter_condition = {
+        return {
             "and": [
                 {"property": "ステータス", "status": {"equals": "完了"}},
                 {"property": "作業日", "date": {"on_or_after": start_date}},
                 {"property": "作業日", "date": {"on_or_before": end_date}},
             ]
         }
-        return self.query(filter_condition)
 
 
 class ReviewDB(BaseNotionDB):
     """振り返りページ保存用のデータベースクラス。BaseNotionDBを継承。"""
 
-    def _load_and_process_data(self) -> None:
+    def _load_and_process_data(self, raw_items: Optional[list] = None) -> None:
         """データロード処理のオーバーライド。
 
         書き込み専用のため、初期化時の全件取得処理（重い処理）をスキップします。
@@ -472,3 +1472,108 @@ class ReviewDB(BaseNotionDB):
         ]
 
         return self.create_page(properties, children)
+
+
+def load_task_databases(
+    token: str,
+    task_db_id: str,
+    project_db_id: str,
+    sprint_db_id: str,
+    client: Optional[NotionClient] = None,
+    snapshot_store: Optional[RawSnapshotStore] = None,
+    task_filter: Optional[Dict[str, Any]] = None,
+    load_tasks: bool = True,
+    backend: str = PANDAS_BACKEND,
+    rollup_properties: Optional[Dict[str, str]] = None,
+    frame_cache: Optional[FrameCache] = None,
+) -> Tuple[Optional[RelatedDB], Optional[RelatedDB], TaskDB]:
+    """
+    プロジェクト・スプリント・タスクの3つのDBを並列に取得して初期化する。
+
+    3つのDBの生データ取得 (ページネーション) をスレッドで同時に実行し、
+    タスクDBの整形 (_process_raw_to_dict) は関連DBの整形完了後に行う。
+    起動時間は3回の取得時間の合計ではなく、最も遅い取得時間程度になる。
+
+    Note:
+        並列取得中はタスクDBの生データを全件メモリに保持する。メモリを抑えたい場合は
+        load_tasks=False とし、返された TaskDB の iter_items() で逐次処理する。
+
+    Args:
+        token: Notionインテグレーションの認証トークン。
+        task_db_id: タスクDBのID。
+        project_db_id: プロジェクトDBのID。
+        sprint_db_id: スプリントDBのID。
+        client: HTTP通信に使用する NotionClient。Noneの場合は共有クライアント。
+        snapshot_store: 指定した場合、3つのDBすべてで生データの差分取得を行う。
+        task_filter: タスクDBの取得時にサーバー側で適用するNotion APIのフィルター。
+        load_tasks: Falseの場合、関連DBのみを並列に取得し、タスクDBはデータを取得せずに返す。
+        backend: 3つのDBの整形済みデータの保持形式 ("pandas" または "records")。
+        rollup_properties: 指定した場合、プロジェクト名・スプリント名をタスクDBのロールアップから取得し、
+            プロジェクトDB・スプリントDBは取得しない (TaskDB の rollup_properties を参照)。
+        frame_cache: 指定した場合、3つのDBで整形済みの pd_items を保存し、有効期間内であれば再利用する。
+            キャッシュから読み込んだDBについては Notion API にアクセスしない。
+
+    Returns:
+        Tuple[Optional[RelatedDB], Optional[RelatedDB], TaskDB]: (Projects, Sprints, Tasks) のタプル。
+        rollup_properties 指定時の Projects, Sprints は None。
+
+    Raises:
+        NotionAPIError: いずれかのDBの取得に失敗した場合。
+    """
+    # 3つのDBに共通の設定 (データは後でまとめて取得する)
+    options: Dict[str, Any] = {
+        "client": client,
+        "autoload": False,
+        "snapshot_store": snapshot_store,
+        "backend": backend,
+        "frame_cache": frame_cache,
+    }
+
+    if rollup_properties:
+        # 関連DBを取得しないため、タスクDBのみを取得する
+        tasks = TaskDB(
+            task_db_id,
+            token,
+            related_dbs={},
+            filter_payload=task_filter,
+            rollup_properties=rollup_properties,
+            **options,
+        )
+        if load_tasks:
+            tasks.load()
+        return None, None, tasks
+
+    projects = RelatedDB(project_db_id, token, **options)
+    sprints = RelatedDB(sprint_db_id, token, **options)
+    tasks = TaskDB(
+        task_db_id,
+        token,
+        related_dbs={"Projects": projects, "Sprints": sprints},
+        filter_payload=task_filter,
+        **options,
+    )
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="notion-load") as executor:
+        # 関連DBは取得から整形まで、タスクDBは生データ取得のみを並列に実行する
+        related_futures = [executor.submit(db._load_and_process_data) for db in (projects, sprints)]
+        # タスクDBのキャッシュキーは関連DBのキャッシュの保存日時を含むため、関連DBを取得し直している場合は
+        # (取得の完了前後にかかわらず) キーが一致せず、タスクDBも取得し直す
+        if not load_tasks or tasks._load_from_frame_cache():
+            for future in related_futures:
+                future.result()
+            return projects, sprints, tasks
+        raw_tasks_future = executor.submit(tasks._get_raw_data)
+
+        for future in related_futures:
+            future.result()
+
+        try:
+            raw_tasks = raw_tasks_future.result()
+        except Exception as e:
+            logging.error(f"Failed to load or process data for DB {tasks.db_id}: {e}")
+            # pd_items へのアクセス時に再取得しない
+            tasks._loaded = True
+            raise
+
+    tasks._load_and_process_data(raw_tasks)
+    return projects, sprints, tasks
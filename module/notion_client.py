@@ -0,0 +1,331 @@
+# module/notion_client.py
+
+import time
+import queue
+import random
+import logging
+import threading
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+
+# 再試行の対象とするHTTPステータスコード (429: レート制限, 5xx: サーバー側の一時的なエラー)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class NotionAPIError(Exception):
+    """
+    Notion APIがエラーを返した場合に送出される例外。
+
+    Args:
+        message (str): エラーメッセージ。
+        status_code (int, optional): HTTPステータスコード。
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    スレッドセーフなトークンバケット方式のレートリミッター。
+
+    平均 `rate` 回/秒、最大 `capacity` 回までのバーストを許可する。
+    429 を受け取った場合は pause() によって全スレッドのリクエストを一時停止できる。
+
+    Args:
+        rate (float): 1秒あたりに補充されるトークン数 (平均リクエスト数)。
+        capacity (float): バケットの容量 (許容するバースト数)。
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得する。取得できるまでブロックする。
+
+        Returns:
+            float: 待機した秒数。
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        指定秒数のあいだ、トークンの払い出しを停止する (Retry-After の反映用)。
+
+        Args:
+            seconds (float): 停止する秒数。
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+# Notion APIの制限 (平均3リクエスト/秒) に合わせたプロセス共有のレートリミッター
+NOTION_RATE_LIMITER = TokenBucket(rate=3.0, capacity=3.0)
+
+
+class NotionClient:
+    """
+    Notion APIへのHTTP通信を担う、コネクションプール付きのクライアントクラス。
+
+    requests.Session を内部に保持し、Keep-Alive によって同一ホスト
+    (api.notion.com) へのTCP/TLS接続を使い回す。複数の BaseNotionDB インスタンスで
+    1つのクライアントを共有することで、実行全体でのハンドシェイク回数を抑える。
+
+    すべてのリクエストはレートリミッターを経由して送信され、429 (Retry-After に従う) や
+    5xx、通信エラーの場合はジッター付きの指数バックオフで再試行する。
+    ページ作成やブロック追加のように冪等でないリクエスト (idempotent=False) は、
+    Notionに届いていないことが確実な 429 と接続確立前のエラーのみを再試行する。
+
+    Args:
+        pool_connections (int, optional): プールするホスト数。デフォルトは 4。
+        pool_maxsize (int, optional): ホストあたりの最大保持接続数。デフォルトは 10。
+        timeout (float | Tuple[float, float], optional): (接続, 読み込み) タイムアウト秒。デフォルトは (5.0, 30.0)。
+        keep_alive (bool, optional): Falseの場合は毎回接続を閉じる。デフォルトは True。
+        rate_limiter (TokenBucket, optional): 使用するレートリミッター。Noneの場合はプロセス共有のものを使用する。
+        max_retries (int, optional): 再試行の最大回数。デフォルトは 5。
+        backoff_base (float, optional): バックオフの基準秒数。デフォルトは 1.0。
+        backoff_max (float, optional): バックオフの最大秒数。デフォルトは 30.0。
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 10,
+        timeout: Union[float, Tuple[float, float]] = (5.0, 30.0),
+        keep_alive: bool = True,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ) -> None:
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else NOTION_RATE_LIMITER
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+        self._metrics_lock = threading.Lock()
+        self.metrics: Dict[str, float] = {
+            "requests": 0,  # 実際に送信したリクエスト数 (再試行を含む)
+            "retries": 0,  # 再試行の回数
+            "throttled": 0,  # 429 を受け取った回数
+            "server_errors": 0,  # 5xx を受け取った回数
+            "connection_errors": 0,  # 通信エラー・タイムアウトの回数
+            "rate_limit_wait": 0.0,  # レートリミッターで待機した合計秒数
+            "backoff_wait": 0.0,  # 再試行前に待機した合計秒数
+        }
+
+    def _count(self, key: str, value: float = 1) -> None:
+        """メトリクスを加算する。"""
+        with self._metrics_lock:
+            self.metrics[key] += value
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        """attempt 回目の再試行前に待機する秒数を返す (Full Jitter 方式)。"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2**attempt)))
+
+    def _retry_after_seconds(self, res: requests.Response, attempt: int) -> float:
+        """429 レスポンスの Retry-After ヘッダーから待機秒数を求める。ヘッダーがなければバックオフ値を使う。"""
+        retry_after = res.headers.get("Retry-After")
+        try:
+            return float(retry_after) + random.uniform(0, self.backoff_base)
+        except (TypeError, ValueError):
+            return self._backoff_seconds(attempt)
+
+    @staticmethod
+    def _is_connect_error(e: requests.exceptions.RequestException) -> bool:
+        """接続の確立前に失敗した (リクエストがサーバーに届いていない) 通信エラーかを判定する。"""
+        if isinstance(e, requests.exceptions.ConnectTimeout):
+            return True
+        # 接続拒否・名前解決の失敗は MaxRetryError(reason=NewConnectionError) として包まれる
+        reason = getattr(e.args[0], "reason", None) if e.args else None
+        return isinstance(reason, urllib3.exceptions.ConnectTimeoutError)
+
+    def request(self, method: str, url: str, idempotent: bool = True, **kwargs: Any) -> requests.Response:
+        """
+        レートリミッターを経由してHTTPリクエストを送信し、一時的なエラーの場合は再試行する。
+
+        再試行回数を超えた場合は最後のレスポンスをそのまま返すため、
+        ステータスコードの判定は呼び出し側で行う。
+
+        Args:
+            method (str): HTTPメソッド ("GET", "POST", "PATCH" など)。
+            url (str): リクエスト先URL。
+            idempotent (bool, optional): Falseの場合、読み込みタイムアウトや接続切断、5xx では再試行しない
+                (Notionが処理済みの可能性があり、再送すると重複して作成されるため)。
+                429 と接続確立前のエラーは常に再試行する。デフォルトは True。
+            **kwargs: requests.Session.request にそのまま渡す引数 (headers, json など)。
+
+        Returns:
+            requests.Response: レスポンスオブジェクト。
+
+        Raises:
+            requests.exceptions.RequestException: 再試行しても通信エラーが解消しなかった場合。
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            self._count("rate_limit_wait", self.rate_limiter.acquire())
+            self._count("requests")
+            try:
+                res = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._count("connection_errors")
+                if attempt >= self.max_retries or not (idempotent or self._is_connect_error(e)):
+                    raise
+                wait = self._backoff_seconds(attempt)
+                logging.warning(f"Notion request error ({method} {url}): {e}. Retrying in {wait:.1f}s")
+            else:
+                if res.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    return res
+                if res.status_code != 429 and not idempotent:
+                    return res
+                if res.status_code == 429:
+                    self._count("throttled")
+                    wait = self._retry_after_seconds(res, attempt)
+                    # 他のスレッドのリクエストも含めて一時停止する
+                    self.rate_limiter.pause(wait)
+                else:
+                    self._count("server_errors")
+                    wait = self._backoff_seconds(attempt)
+                logging.warning(f"Notion API {res.status_code} ({method} {url}). Retrying in {wait:.1f}s")
+
+            self._count("retries")
+            self._count("backoff_wait", wait)
+            time.sleep(wait)
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """GETリクエストを送信する。"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, idempotent: bool = True, **kwargs: Any) -> requests.Response:
+        """POSTリクエストを送信する。ページ作成など冪等でない場合は idempotent=False を指定する。"""
+        return self.request("POST", url, idempotent=idempotent, **kwargs)
+
+    def patch(self, url: str, idempotent: bool = True, **kwargs: Any) -> requests.Response:
+        """PATCHリクエストを送信する。ブロック追加など冪等でない場合は idempotent=False を指定する。"""
+        return self.request("PATCH", url, idempotent=idempotent, **kwargs)
+
+    def log_metrics(self) -> None:
+        """送信・再試行・待機時間などのメトリクスをログに出力する。"""
+        with self._metrics_lock:
+            m = dict(self.metrics)
+        logging.info(
+            f"Notion API metrics: requests={m['requests']:.0f}, retries={m['retries']:.0f}, "
+            f"throttled={m['throttled']:.0f}, server_errors={m['server_errors']:.0f}, "
+            f"connection_errors={m['connection_errors']:.0f}, rate_limit_wait={m['rate_limit_wait']:.1f}s, "
+            f"backoff_wait={m['backoff_wait']:.1f}s"
+        )
+
+    def close(self) -> None:
+        """プール中の接続をすべて閉じる。"""
+        self.session.close()
+
+
+def prefetch_iter(iterable: Iterable[T], depth: int = 1) -> Iterator[T]:
+    """
+    イテラブルをバックグラウンドスレッドで先読みしながら返すジェネレーター。
+
+    カーソル方式のページネーションのように、次の要素の取得 (通信・JSONデコード) と
+    現在の要素の処理 (整形) を重ねて実行するために使用する。先読みは最大 depth 件までに制限されるため、
+    メモリ使用量は有界に保たれる。元のイテラブルで発生した例外は呼び出し側に再送出される。
+
+    Args:
+        iterable (Iterable[T]): 先読みするイテラブル (ジェネレーターなど)。
+        depth (int, optional): 先読みする最大要素数。デフォルトは 1。
+
+    Yields:
+        T: 元のイテラブルの要素。
+    """
+    buffer: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def _put(entry: Tuple[str, Any]) -> bool:
+        # 呼び出し側が途中で反復をやめた場合に備え、停止要求を確認しながら待機する
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        iterator = iter(iterable)
+        try:
+            for element in iterator:
+                if not _put(("item", element)):
+                    return
+            _put(("done", None))
+        except BaseException as e:
+            _put(("error", e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=_produce, name="notion-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, value = buffer.get()
+            if kind == "item":
+                yield value
+            elif kind == "error":
+                raise value
+            else:
+                return
+    finally:
+        stop.set()
+
+
+_default_client: Optional[NotionClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> NotionClient:
+    """
+    プロセス内で共有されるデフォルトの NotionClient を返す。
+
+    クライアントが明示的に渡されなかった BaseNotionDB はこのインスタンスを使用するため、
+    同一プロセス内のDBクラス間で接続プールが共有される。
+
+    Returns:
+        NotionClient: 共有クライアント。
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = NotionClient()
+            logging.debug("Created default NotionClient.")
+        return _default_client
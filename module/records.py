@@ -0,0 +1,222 @@
+# module/records.py
+
+import logging
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .notion_api import RelatedDB
+
+# 通知対象とするステータス
+ACTIVE_STATUSES = ["未着手", "進行中", "反応待ち"]
+# 現在のスプリントを表すスプリントのステータス (ID)
+CURRENT_SPRINT_STATUS = "current"
+
+
+class Task:
+    """
+    1件のタスクを表す軽量なレコードクラス。
+
+    __slots__ によりインスタンス辞書を持たないため、少数のタスクを扱う場合に
+    DataFrame を構築するよりも起動時間・メモリ使用量を抑えられる。
+    属性名は TaskDB.pd_items のカラム名と同じ。
+    """
+
+    __slots__ = (
+        "title",
+        "status",
+        "project",
+        "start",
+        "end",
+        "work_date",
+        "sprint",
+        "tag",
+        "id",
+        "gcal_event_id",
+        "last_edited_time",
+        "sprint_status",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        status: str,
+        project: str,
+        start: Optional[datetime.date],
+        end: Optional[datetime.date],
+        work_date: Optional[datetime.date],
+        sprint: Optional[str],
+        tag: str,
+        id: str,
+        gcal_event_id: Optional[str],
+        last_edited_time: str,
+        sprint_status: Optional[str] = None,
+    ) -> None:
+        self.title = title
+        self.status = status
+        self.project = project
+        self.start = start
+        self.end = end
+        self.work_date = work_date
+        self.sprint = sprint
+        self.tag = tag
+        self.id = id
+        self.gcal_event_id = gcal_event_id
+        self.last_edited_time = last_edited_time
+        self.sprint_status = sprint_status
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "Task":
+        """
+        TaskDB の整形済み辞書から Task を作成する。
+
+        Args:
+            item (Dict[str, Any]): TaskDB._process_raw_item が返す辞書。
+
+        Returns:
+            Task: 作成されたレコード。
+        """
+        return cls(**{name: item.get(name) for name in cls.__slots__})
+
+    def __repr__(self) -> str:
+        return f"Task(title={self.title!r}, status={self.status!r}, project={self.project!r}, sprint={self.sprint!r})"
+
+
+def _is_set(value: Any) -> bool:
+    """値が設定されているか判定する (None と NaN/NaT を未設定として扱う)。"""
+    return value is not None and value == value
+
+
+def filter_hot_tasks(
+    tasks: Iterable[Task], Projects: Optional["RelatedDB"], Sprints: Optional["RelatedDB"]
+) -> List[Task]:
+    """
+    通知前にタスクをフィルタリング・ソートする。util.sort_filter の pandas を使わない版。
+
+    フィルタリング条件・ソート順は util.sort_filter と同じ。
+
+    Args:
+        tasks: Task のイテラブル。
+        Projects: プロジェクトDBの RelatedDB インスタンス。
+        Sprints: スプリントDBの RelatedDB インスタンス。Noneの場合は現在のスプリントをタスクの sprint_status から求める。
+
+    Returns:
+        List[Task]: フィルタリングおよび (プロジェクト名, タグ) 順にソートされたタスクのリスト。
+    """
+    tasks = list(tasks)
+
+    # 現在のスプリント名を取得
+    try:
+        if Sprints is None:
+            current_sprint = find_current_sprint((task.sprint, task.sprint_status) for task in tasks)
+        else:
+            current_sprint = Sprints.get_item_from_pd("status", CURRENT_SPRINT_STATUS, "title")
+    except LookupError:
+        logging.warning("現在のスプリント(status='current')が見つかりませんでした。タスク通知を行いません。")
+        return []
+
+    today = datetime.date.today()
+    tomorrow = today + datetime.timedelta(days=1)
+
+    hot_tasks = []
+    for task in tasks:
+        # 必須条件: 現在のスプリント、かつ「期限(start) または 作業日」が設定されていること
+        if task.sprint != current_sprint or task.status not in ACTIVE_STATUSES:
+            continue
+        if task.start is None and task.work_date is None:
+            continue
+
+        # Hot判定: 期限(終了日)が明日まで / 開始日が今日以前 / 作業日が今日
+        is_due_soon = task.end is not None and task.end <= tomorrow
+        is_overdue = task.start is not None and task.start <= today
+        is_work_today = task.work_date is not None and task.work_date == today
+        if is_due_soon or is_overdue or is_work_today:
+            hot_tasks.append(task)
+
+    # Sort: プロジェクト名 -> タグの順でソート (安定ソート)
+    hot_tasks.sort(key=lambda task: (task.project, task.tag))
+    return hot_tasks
+
+
+def find_current_sprint(sprints: Iterable[Tuple[Any, Any]]) -> str:
+    """
+    (スプリント名, スプリントのステータス) の組から現在のスプリント名を求める。
+
+    スプリントDBを取得せず、タスクDBのロールアップからスプリントのステータスを得る場合に使用する。
+
+    Args:
+        sprints: (スプリント名, スプリントのステータス) のイテラブル。
+
+    Returns:
+        str: ステータスが CURRENT_SPRINT_STATUS である最初のスプリント名。
+
+    Raises:
+        LookupError: 現在のスプリントが見つからない場合。
+    """
+    for sprint, status in sprints:
+        if status == CURRENT_SPRINT_STATUS and _is_set(sprint):
+            return sprint
+    raise LookupError(f"値が見つかりません: {CURRENT_SPRINT_STATUS}")
+
+
+def render_sentences(rows: Iterable[Any]) -> List[str]:
+    """
+    通知する文章を作成する。
+
+    タスクのタグごとにメッセージを区切り、プロジェクトごとにグループ化する。
+    rows は title, status, project, tag, start, end, work_date の属性を持つオブジェクトであればよく、
+    Task のほか DataFrame.itertuples() の行も受け付ける。
+
+    Args:
+        rows: フィルタリングおよびソートされたタスク行のイテラブル。
+
+    Returns:
+        List[str]: 通知用の文章（タグごとに分割されたリスト）。
+    """
+    sentence_list = []
+
+    # 最初の行に日付を含める
+    sentence = datetime.date.today().strftime("%Y-%m-%d") + "\n"
+    saved_tag = ""
+    saved_pj = ""
+    has_rows = False
+
+    # タグとプロジェクトを基準に文章を作成
+    for row in rows:
+        has_rows = True
+        if saved_tag != row.tag:
+            # タグが変わった場合、前の文章をリストに追加
+            if saved_tag != "":
+                sentence_list.append(sentence)
+
+            # 新しいタグで文章をリセット
+            sentence = "■■" + row.tag + "■■\n"
+            saved_tag = row.tag
+            saved_pj = ""
+
+        if saved_pj != row.project:
+            saved_pj = row.project
+            sentence += f"【{row.project}】\n"
+
+        # 日付情報の表示ロジック
+        # 1. 終了日(end)があればそれを表示
+        # 2. なければ開始日(start)を表示
+        # 3. それもなければ作業日(work_date)を表示
+        if _is_set(row.end):
+            date_info = f"期限: {row.end.strftime('%Y-%m-%d')}"
+        elif _is_set(row.start):
+            date_info = f"期限: {row.start.strftime('%Y-%m-%d')}"
+        elif _is_set(row.work_date):
+            date_info = f"作業日: {row.work_date.strftime('%Y-%m-%d')}"
+        else:
+            date_info = "日付未定"
+
+        sentence += f" - [{row.status}] {row.title} ({date_info})\n"
+
+    if not has_rows:
+        return [f"{datetime.date.today().strftime('%Y-%m-%d')}\n通知対象のタスクはありませんでした。"]
+
+    # 最後に残った文章をリストに追加
+    sentence_list.append(sentence)
+
+    return sentence_list
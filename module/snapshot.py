@@ -0,0 +1,138 @@
+# module/snapshot.py
+
+import os
+import json
+import logging
+import datetime
+import tempfile
+from typing import Dict, Any, List, Optional
+
+
+class RawSnapshotStore:
+    """
+    NotionデータベースごとにAPIの生データ(ページ)をローカルに保存するスナップショットストア。
+
+    各DBのスナップショットは `{cache_dir}/{db_id}.json` に保存され、取得済みページと
+    ウォーターマーク (取得済みページ中の最大 last_edited_time) を保持する。
+    次回以降はウォーターマーク以降に更新されたページだけを取得してマージすればよい。
+
+    Note:
+        差分取得ではゴミ箱に移動・削除されたページを検知できないため、
+        `full_refresh_interval` を過ぎたスナップショットは全件取得で作り直す。
+
+    Args:
+        cache_dir (str): スナップショットの保存先ディレクトリ。
+        full_refresh_interval (datetime.timedelta, optional): 全件取得をやり直す間隔。デフォルトは1日。
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: str, full_refresh_interval: datetime.timedelta = datetime.timedelta(days=1)) -> None:
+        self.cache_dir = cache_dir
+        self.full_refresh_interval = full_refresh_interval
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, db_id: str) -> str:
+        """DB IDに対応するスナップショットファイルのパスを返す。"""
+        return os.path.join(self.cache_dir, f"{db_id}.json")
+
+    def load(self, db_id: str) -> Optional[Dict[str, Any]]:
+        """
+        スナップショットを読み込む。
+
+        Args:
+            db_id (str): NotionデータベースID。
+
+        Returns:
+            Optional[Dict[str, Any]]: {"watermark", "full_synced_at", "pages"} を持つ辞書。
+            存在しない、壊れている、またはバージョンが異なる場合はNone。
+        """
+        path = self._path(db_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Failed to read snapshot {path}: {e}")
+            return None
+        if snapshot.get("version") != self.VERSION:
+            return None
+        return snapshot
+
+    def save(
+        self,
+        db_id: str,
+        pages: Dict[str, Dict[str, Any]],
+        full_synced_at: str,
+        property_ids: Optional[List[str]] = None,
+    ) -> None:
+        """
+        スナップショットを保存する。ウォーターマークはページの最大 last_edited_time から算出する。
+
+        Args:
+            db_id (str): NotionデータベースID。
+            pages (Dict[str, Dict[str, Any]]): ページIDをキーとする生データの辞書。
+            full_synced_at (str): 最後に全件取得を行った日時 (ISO 8601形式)。
+            property_ids (Optional[List[str]]): 取得時に指定したプロパティID (filter_properties)。
+        """
+        watermark = max((page.get("last_edited_time", "") for page in pages.values()), default="")
+        snapshot = {
+            "version": self.VERSION,
+            "watermark": watermark,
+            "full_synced_at": full_synced_at,
+            "property_ids": property_ids or [],
+            "pages": pages,
+        }
+        path = self._path(db_id)
+        # 書き込み途中で落ちても既存のスナップショットを壊さないよう、一時ファイル経由で置き換える
+        # (同じディレクトリを使う他のエントリーポイントと衝突しないよう、一時ファイル名は毎回異なるものにする)
+        f = tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.cache_dir, prefix=f"{db_id}.", suffix=".tmp", delete=False
+        )
+        try:
+            with f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(f.name, path)
+        except BaseException:
+            if os.path.exists(f.name):
+                os.remove(f.name)
+            raise
+
+    def stamp(self, db_id: str) -> str:
+        """
+        スナップショットファイルの版を表す文字列を返す。ファイルの内容は読み込まない。
+
+        スナップショットから作成したデータのキャッシュ (FrameCache) が、他のエントリーポイントによる
+        スナップショットの更新で古くなったかを、ネットワークにアクセスせずに判定するために使用する。
+
+        Args:
+            db_id (str): NotionデータベースID。
+
+        Returns:
+            str: ファイルの (inode, 更新日時, サイズ) から作成した文字列。スナップショットがない場合は空文字。
+        """
+        try:
+            stat = os.stat(self._path(db_id))
+        except OSError:
+            return ""
+        return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+    def needs_full_refresh(self, snapshot: Dict[str, Any], property_ids: Optional[List[str]] = None) -> bool:
+        """
+        スナップショットが全件取得のやり直しを必要とするか判定する。
+
+        Args:
+            snapshot (Dict[str, Any]): load() で読み込んだスナップショット。
+            property_ids (Optional[List[str]]): 今回の取得で指定するプロパティID。
+
+        Returns:
+            bool: ウォーターマークがない、取得するプロパティが変わった、
+            または前回の全件取得から full_refresh_interval を過ぎていればTrue。
+        """
+        if not snapshot.get("watermark") or not snapshot.get("full_synced_at"):
+            return True
+        if snapshot.get("property_ids", []) != (property_ids or []):
+            return True
+        full_synced_at = datetime.datetime.fromisoformat(snapshot["full_synced_at"])
+        return datetime.datetime.now(datetime.timezone.utc) - full_synced_at > self.full_refresh_interval
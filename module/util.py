@@ -1,13 +1,15 @@
 # module/util.py
 
 import logging
-import pandas as pd
 import datetime
-from typing import List, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from .records import ACTIVE_STATUSES, CURRENT_SPRINT_STATUS, find_current_sprint, render_sentences
 
 # RelatedDB クラスを型ヒントとしてのみインポートするための記述
 # 実行時の循環参照を防ぎ、静的解析ツールでの型チェックを可能にする
 if TYPE_CHECKING:
+    import pandas as pd
     from .notion_api import RelatedDB
 else:
     # 実行時に参照する際はダミーまたは実行可能オブジェクトを定義
@@ -18,7 +20,46 @@ else:
             raise NotImplementedError("This is a placeholder class.")
 
 
-def sort_filter(pd_tasks: pd.DataFrame, Projects: "RelatedDB", Sprints: "RelatedDB") -> pd.DataFrame:
+def build_hot_task_filter(today: Optional[datetime.date] = None) -> Dict[str, Any]:
+    """
+    sort_filter の抽出条件に相当する、タスクDB取得用のNotion APIフィルターを作成する。
+
+    サーバー側で候補を絞り込むためのフィルターであり、結果は sort_filter の抽出結果を必ず包含する
+    (上位集合となる) ように条件を緩めている。最終的な判定は従来通り sort_filter で行う。
+
+    条件:
+        - スプリントが設定されていること (現在のスプリントかどうかは sort_filter で判定)
+        - ステータスが「未着手」「進行中」「反応待ち」のいずれか
+        - 「期限」の開始日が明後日以前、または「作業日」が明後日以前
+          (Notionは日付範囲を開始日で比較し、時刻付きの日付はUTCで比較するため1日の余裕を持たせる)
+
+    Args:
+        today: 基準日。Noneの場合は実行日。
+
+    Returns:
+        Dict[str, Any]: Notion APIのフィルターオブジェクト。
+    """
+    if today is None:
+        today = datetime.date.today()
+    date_limit = (today + datetime.timedelta(days=2)).isoformat()
+
+    return {
+        "and": [
+            {"property": "スプリント", "relation": {"is_not_empty": True}},
+            {"or": [{"property": "ステータス", "status": {"equals": status}} for status in ACTIVE_STATUSES]},
+            {
+                "or": [
+                    {"property": "期限", "date": {"on_or_before": date_limit}},
+                    {"property": "作業日", "date": {"on_or_before": date_limit}},
+                ]
+            },
+        ]
+    }
+
+
+def sort_filter(
+    pd_tasks: "pd.DataFrame", Projects: Optional["RelatedDB"], Sprints: Optional["RelatedDB"]
+) -> "pd.DataFrame":
     """
     通知前にタスクをフィルタリング・ソートする。
 
@@ -38,53 +79,58 @@ def sort_filter(pd_tasks: pd.DataFrame, Projects: "RelatedDB", Sprints: "Related
         pd_tasks: タスクの全データを含むDataFrame。
         Projects: プロジェクトDBの RelatedDB インスタンス。
         Sprints: スプリントDBの RelatedDB インスタンス。
+            Noneの場合は現在のスプリントをタスクの sprint_status (ロールアップ) から求める。
 
     Returns:
         pd.DataFrame: フィルタリングおよびソートされたタスクのDataFrame。
     """
-    # 1. Pre-Filter: スプリントがあり、かつ「期限(start) または 作業日」が設定されているタスクのみ残す
-    # 修正: end ではなく start の有無を確認するように変更
-    active_tasks = pd_tasks[
-        (pd_tasks["sprint"].notnull()) & ((pd_tasks["start"].notnull()) | (pd_tasks["work_date"].notnull()))
-    ]
+    # pandas / numpy は読み込みが重いため、DataFrameを扱う場合のみインポートする
+    import numpy as np
+    import pandas as pd
 
     # 現在のスプリント名を取得
     try:
-        current_sprint = Sprints.get_item_from_pd("status", "current", "title")
+        if Sprints is None:
+            if "sprint_status" not in pd_tasks.columns:
+                raise LookupError("sprint_status column is missing")
+            current_sprint = find_current_sprint(zip(pd_tasks["sprint"].tolist(), pd_tasks["sprint_status"].tolist()))
+        else:
+            current_sprint = Sprints.get_item_from_pd("status", CURRENT_SPRINT_STATUS, "title")
     except LookupError:
         logging.warning("現在のスプリント(status='current')が見つかりませんでした。タスク通知を行いません。")
         return pd.DataFrame()
 
-    today = datetime.date.today()
-    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    # 日付カラムは datetime64 のため、比較対象も日単位の datetime64 にする
+    # (NaT との比較は常に False になるため、未設定チェックを別途行う必要はない)
+    today = np.datetime64(datetime.date.today(), "D")
+    tomorrow = today + np.timedelta64(1, "D")
 
-    # 2. Filtering Logic (Hot判定)
+    start = pd_tasks["start"].to_numpy()
+    end = pd_tasks["end"].to_numpy()
+    work_date = pd_tasks["work_date"].to_numpy()
 
-    # A: 期限(終了日)があり、明日まで
-    is_due_soon = (active_tasks["end"].notnull()) & (active_tasks["end"] <= tomorrow)
+    # 1. Pre-Filter: 「期限(start) または 作業日」が設定されているタスクのみ残す
+    # (スプリントの有無は現在のスプリントとの一致判定に含まれる)
+    has_date = ~np.isnat(start) | ~np.isnat(work_date)
 
-    # B: 開始日があり、今日以前 (単一日付の期限切れもここで拾う)
-    is_overdue = (active_tasks["start"].notnull()) & (active_tasks["start"] <= today)
+    # 2. Filtering Logic (Hot判定)
+    # A: 期限(終了日)が明日まで / B: 開始日が今日以前 (単一日付の期限切れもここで拾う) / C: 作業日が今日
+    is_due_soon = end <= tomorrow
+    is_overdue = start <= today
+    is_work_today = work_date == today
 
-    # C: 作業日があり、今日
-    is_work_today = (active_tasks["work_date"].notnull()) & (active_tasks["work_date"] == today)
+    # 3. スプリント・ステータス条件 (categorical の場合はカテゴリコードでの比較になる)
+    is_current_sprint = (pd_tasks["sprint"] == current_sprint).to_numpy()
+    is_active = pd_tasks["status"].isin(ACTIVE_STATUSES).to_numpy()
 
     # フィルタ適用
-    hot_tasks = active_tasks[
-        (is_due_soon | is_overdue | is_work_today)  # A or B or C
-        & (active_tasks["sprint"] == current_sprint)
-        & (
-            (active_tasks["status"] == "未着手")
-            | (active_tasks["status"] == "進行中")
-            | (active_tasks["status"] == "反応待ち")
-        )
-    ]
+    hot_tasks = pd_tasks[has_date & (is_due_soon | is_overdue | is_work_today) & is_current_sprint & is_active]
 
     # Sort: プロジェクト名 -> タグの順でソート
     return hot_tasks.sort_values(["project", "tag"])
 
 
-def make_sentence(pd_tasks: pd.DataFrame) -> List[str]:
+def make_sentence(pd_tasks: "pd.DataFrame") -> List[str]:
     """
     通知する文章を作成する関数。
 
@@ -96,49 +142,5 @@ def make_sentence(pd_tasks: pd.DataFrame) -> List[str]:
     Returns:
         List[str]: 通知用の文章（タグごとに分割されたリスト）。
     """
-    sentence_list = []
-
-    if pd_tasks.empty:
-        sentence_list.append(f"{datetime.date.today().strftime('%Y-%m-%d')}\n通知対象のタスクはありませんでした。")
-        return sentence_list
-
-    # 最初の行に日付を含める
-    sentence = datetime.date.today().strftime("%Y-%m-%d") + "\n"
-    saved_tag = ""
-    saved_pj = ""
-
-    # タグとプロジェクトを基準に文章を作成
-    for row in pd_tasks.itertuples():
-        if saved_tag != row.tag:
-            # タグが変わった場合、前の文章をリストに追加
-            if saved_tag != "":
-                sentence_list.append(sentence)
-
-            # 新しいタグで文章をリセット
-            sentence = "■■" + row.tag + "■■\n"
-            saved_tag = row.tag
-            saved_pj = ""
-
-        if saved_pj != row.project:
-            saved_pj = row.project
-            sentence += f"【{row.project}】\n"
-
-        # 日付情報の表示ロジック
-        # 1. 終了日(end)があればそれを表示
-        # 2. なければ開始日(start)を表示
-        # 3. それもなければ作業日(work_date)を表示
-        if pd.notna(row.end):
-            date_info = f"期限: {row.end.strftime('%Y-%m-%d')}"
-        elif pd.notna(row.start):
-            date_info = f"期限: {row.start.strftime('%Y-%m-%d')}"
-        elif pd.notna(row.work_date):
-            date_info = f"作業日: {row.work_date.strftime('%Y-%m-%d')}"
-        else:
-            date_info = "日付未定"
-
-        sentence += f" - [{row.status}] {row.title} ({date_info})\n"
-
-    # 最後に残った文章をリストに追加
-    sentence_list.append(sentence)
-
-    return sentence_list
+    # 文章の組み立ては pandas を使わない経路 (records.render_sentences) と共通
+    return render_sentences(pd_tasks.itertuples())
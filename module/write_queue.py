@@ -0,0 +1,228 @@
+# module/write_queue.py
+
+import os
+import json
+import logging
+import zlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .notion_api import BaseNotionDB
+
+
+class NotionWriteQueue:
+    """
+    Notionページの更新 (PATCH /v1/pages/{page_id}) をバックグラウンドで送信するライトビハインドキュー。
+
+    submit() は更新をワーカースレッドに渡してすぐに戻るため、呼び出し側は書き込みの完了を待たずに処理を続けられる。
+    ページIDごとに送信するワーカーを固定するため、同じページへの更新は submit() した順に1件ずつ反映される。
+    リクエストは DB の NotionClient (レートリミッター) を経由するため、max_workers を増やしても
+    APIの制限を超えることはない。未完了の更新が max_pending 件に達すると、submit() は空きができるまで待つ。
+
+    失敗した更新は、更新の判断に使ったページの last_edited_time とともに close() 時に failure_path (JSON) に
+    記録される。次回の実行で retry_failed() を呼ぶと、ページがその後更新されていない場合のみ再送する。
+
+    Args:
+        db (BaseNotionDB): 更新対象のページを含むデータベース (update_page / retrieve_pages を使用する)。
+        failure_path (Optional[str], optional): 失敗した更新を記録するファイルのパス。Noneの場合は記録しない。
+        max_workers (int, optional): 同時に送信するリクエスト数の上限。デフォルトは4。
+        max_pending (int, optional): 未完了の更新の上限。デフォルトは max_workers の4倍。
+        fill_properties (Iterable[str], optional): ページが更新されていても、Notion側の値が空のままであれば
+            再送するプロパティ名 (作成したイベントのIDなど、他に書き込む人がいないもの)。
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        db: "BaseNotionDB",
+        failure_path: Optional[str] = None,
+        max_workers: int = 4,
+        max_pending: Optional[int] = None,
+        fill_properties: Iterable[str] = (),
+    ) -> None:
+        self.db = db
+        self.failure_path = failure_path
+        self.fill_properties = tuple(fill_properties)
+        # 1スレッドのワーカーを max_workers 個用意し、ページIDのハッシュで振り分ける
+        self._workers = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"notion-write-{i}") for i in range(max_workers)
+        ]
+        self._slots = threading.BoundedSemaphore(max_pending or max_workers * 4)
+        self._lock = threading.Lock()
+        # ページID -> {"last_edited_time": 更新の判断に使った日時, "properties": 失敗したプロパティ}
+        self._failures: Dict[str, Dict[str, Any]] = {}
+        # ページID -> このキューで成功した最後の更新後の last_edited_time
+        self._edited: Dict[str, str] = {}
+        self._succeeded = 0
+
+    def __enter__(self) -> "NotionWriteQueue":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def submit(self, page_id: str, properties: Dict[str, Any], last_edited_time: str = "") -> Future:
+        """
+        ページの更新をキューに追加する。
+
+        Args:
+            page_id (str): 更新対象のNotionページID。
+            properties (Dict[str, Any]): 更新するプロパティの内容 (update_page と同じ形式)。
+            last_edited_time (str, optional): 更新の判断に使ったページの last_edited_time。
+                失敗した場合に記録し、次回の再送前にページが更新されていないかの確認に使用する。
+
+        Returns:
+            Future: 更新の完了を表すFuture。失敗しても例外は送出せず、失敗として記録する。
+        """
+        worker = self._workers[zlib.crc32(page_id.encode("utf-8")) % len(self._workers)]
+        self._slots.acquire()
+        future = worker.submit(self._write, page_id, properties, last_edited_time)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _write(self, page_id: str, properties: Dict[str, Any], last_edited_time: str) -> None:
+        """ページを更新し、結果を記録する (ワーカースレッドで実行)。"""
+        try:
+            page = self.db.update_page(page_id, properties)
+        except Exception as e:
+            logging.error(f"Failed to update Notion page {page_id} (will retry on next run): {e}")
+            with self._lock:
+                failure = self._failures.setdefault(page_id, {"last_edited_time": "", "properties": {}})
+                # このキューで先に成功した更新があれば、その後の日時を基準にする
+                failure["last_edited_time"] = self._edited.get(page_id, last_edited_time)
+                # 同じページへの更新が複数失敗した場合は、後の更新でプロパティを上書きする
+                failure["properties"].update(properties)
+            return
+        with self._lock:
+            self._succeeded += 1
+            edited = (page or {}).get("last_edited_time")
+            if edited:
+                self._edited[page_id] = edited
+            # 以前の失敗を再送して成功した場合など、記録済みの失敗は取り消す
+            failure = self._failures.get(page_id)
+            if failure is not None:
+                for name in properties:
+                    failure["properties"].pop(name, None)
+                if not failure["properties"]:
+                    del self._failures[page_id]
+                elif edited:
+                    # 自分の更新でページの last_edited_time が進んだため、残りの失敗の基準も進める
+                    failure["last_edited_time"] = edited
+
+    def load_failures(self) -> Dict[str, Dict[str, Any]]:
+        """
+        前回の実行で記録された失敗した更新を読み込む。
+
+        Returns:
+            Dict[str, Dict[str, Any]]: ページIDをキー、{"last_edited_time", "properties"} を値とする辞書。
+            記録がない、または読み込めない場合は空の辞書。
+        """
+        if not self.failure_path or not os.path.exists(self.failure_path):
+            return {}
+        try:
+            with open(self.failure_path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Failed to read Notion write failures {self.failure_path}: {e}")
+            return {}
+        if record.get("db_id") != self.db.db_id:
+            return {}
+        if record.get("version") != self.VERSION:
+            return {}
+        return record.get("failures", {})
+
+    def retry_failed(self) -> Dict[str, Dict[str, Any]]:
+        """
+        前回の実行で失敗した更新のうち、まだ有効なものをキューに追加する。
+
+        各ページを取得し、last_edited_time が記録時から変わっていなければすべてのプロパティを再送する。
+        変わっている場合は、その後の編集を古い値で上書きしないよう、fill_properties のうちNotion側が
+        空のままのものだけを再送する。取得できなかったページの記録は次回に持ち越す。
+        再送が再び失敗した場合は、close() 時に改めて記録される。
+
+        Returns:
+            Dict[str, Dict[str, Any]]: まだNotionに反映されていない可能性のある更新 (ページIDをキー、
+            プロパティを値とする辞書)。再送した更新に加え、取得できずに持ち越したページの fill_properties を含む。
+            呼び出し側はこれを使って、Notion側で空になっている値を補える (作成済みのイベントを重複して作成しないなど)。
+        """
+        failures = self.load_failures()
+        if not failures:
+            return {}
+        pages = self.db.retrieve_pages(failures)
+        pending = {}
+        retried = 0
+        for page_id, failure in failures.items():
+            page = pages.get(page_id)
+            if page is None:
+                with self._lock:
+                    self._failures.setdefault(page_id, failure)
+                # 再送はしないが、Notion側が空のままの可能性がある値は呼び出し側で補えるように返す
+                deferred = {
+                    name: value for name, value in failure.get("properties", {}).items() if name in self.fill_properties
+                }
+                if deferred:
+                    pending[page_id] = deferred
+                continue
+            properties = self._retryable_properties(failure, page)
+            if properties:
+                self.submit(page_id, properties, page.get("last_edited_time", ""))
+                pending[page_id] = properties
+                retried += 1
+        logging.info(f"Retrying {retried}/{len(failures)} failed Notion page update(s) from the previous run.")
+        return pending
+
+    def _retryable_properties(self, failure: Dict[str, Any], page: Dict[str, Any]) -> Dict[str, Any]:
+        """記録した失敗のうち、現在のページに対して再送してよいプロパティを返す。"""
+        properties = failure.get("properties", {})
+        if page.get("archived") or page.get("in_trash"):
+            return {}
+        recorded = failure.get("last_edited_time")
+        if recorded and page.get("last_edited_time") == recorded:
+            return properties
+        current = page.get("properties", {})
+        return {
+            name: value
+            for name, value in properties.items()
+            if name in self.fill_properties and self._is_empty(current.get(name))
+        }
+
+    @staticmethod
+    def _is_empty(prop: Optional[Dict[str, Any]]) -> bool:
+        """Notionのプロパティ値 (ページの properties の要素) が空かどうかを返す。"""
+        if not prop:
+            return True
+        return not prop.get(prop.get("type", ""))
+
+    def close(self) -> None:
+        """
+        キューのすべての更新が完了するまで待ち、失敗した更新を failure_path に記録する。
+        """
+        for worker in self._workers:
+            worker.shutdown(wait=True)
+        with self._lock:
+            failures = dict(self._failures)
+            succeeded = self._succeeded
+        logging.info(f"Notion write queue finished: {succeeded} succeeded, {len(failures)} failed")
+        if self.failure_path:
+            self._save_failures(failures)
+
+    def _save_failures(self, failures: Dict[str, Dict[str, Any]]) -> None:
+        """失敗した更新をファイルに保存する。失敗がなければファイルを削除する。"""
+        try:
+            if not failures:
+                if os.path.exists(self.failure_path):
+                    os.remove(self.failure_path)
+                return
+            if os.path.dirname(self.failure_path):
+                os.makedirs(os.path.dirname(self.failure_path), exist_ok=True)
+            record = {"version": self.VERSION, "db_id": self.db.db_id, "failures": failures}
+            tmp_path = f"{self.failure_path}.tmp"
+            # 書き込み途中で落ちても既存の記録を壊さないよう、一時ファイル経由で置き換える
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, self.failure_path)
+        except OSError as e:
+            logging.error(f"Failed to record Notion write failures to {self.failure_path}: {e}")
@@ -1,12 +1,13 @@
 import os
+import sys
 import datetime
 from collections import defaultdict
-from dateutil.relativedelta import relativedelta
-from google import genai
+from typing import Iterable
 from dotenv import load_dotenv
 
 # 既存モジュールのインポート
 from module.notion_api import TaskDB, ReviewDB
+from module.notion_client import NotionClient
 from module.google_cal_api import GoogleCalendarAPI
 
 load_dotenv()
@@ -20,6 +21,8 @@ NOTION_REVIEW_DB_ID = os.getenv("NOTION_REVIEW_DATABASE_ID")
 CALENDAR_IDS = os.getenv("GOOGLE_CALENDAR_IDS", "primary").split(",")
 # サービスアカウントキーパス
 SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE", "service_account.json")
+# 完了タスクの取得時に要求するプロパティ (タイトルとプロジェクトのみを使用する)
+DONE_TASK_PROPERTIES = ("Name", "タスク名", "Project", "プロジェクト")
 
 
 # --- ダミークラス定義 ---
@@ -51,9 +54,8 @@ def get_target_quarter_range() -> tuple[datetime.date, datetime.date]:
 
     # 前の四半期の終了日 = 今期の開始日の前日
     end_date = current_quarter_start - datetime.timedelta(days=1)
-    # 前の四半期の開始日 = 終了日の2ヶ月前
-    start_date = end_date - relativedelta(months=2)
-    start_date = start_date.replace(day=1)
+    # 前の四半期の開始日 = 終了日の2ヶ月前の月初 (終了月は3, 6, 9, 12月のいずれかのため年はまたがない)
+    start_date = datetime.date(end_date.year, end_date.month - 2, 1)
 
     return start_date, end_date
 
@@ -141,13 +143,44 @@ def format_calendar_blocks(events_by_cal: dict) -> list:
     return blocks
 
 
-def format_task_blocks(tasks: list) -> list:
+def summarize_task(task: dict) -> tuple[str, str]:
+    """Notionタスクオブジェクトからタイトルとプロジェクト名を取り出します。
+
+    Args:
+        task (dict): Notionから取得したタスクオブジェクト(辞書)。
+
+    Returns:
+        tuple[str, str]: (タイトル, プロジェクト名)。未設定の場合は「無題」「未分類」。
+    """
+    props = task.get("properties", {})
+    title_list = props.get("Name", {}).get("title", []) or props.get("タスク名", {}).get("title", [])
+    title = title_list[0]["plain_text"] if title_list else "無題"
+    project_obj = props.get("Project", {}).get("select") or props.get("プロジェクト", {}).get("select")
+    project = project_obj["name"] if project_obj else "未分類"
+    return title, project
+
+
+def summarize_tasks(tasks: Iterable[dict]) -> list[tuple[str, str]]:
+    """タスクを1回の走査で (タイトル, プロジェクト名) のリストにまとめます。
+
+    ページの生データは保持しないため、完了タスクをジェネレーターから逐次受け取って集計できます。
+
+    Args:
+        tasks (Iterable[dict]): Notionタスクオブジェクトのイテラブル。
+
+    Returns:
+        list[tuple[str, str]]: (タイトル, プロジェクト名) のリスト (取得順)。
+    """
+    return [summarize_task(task) for task in tasks]
+
+
+def format_task_blocks(tasks: list[tuple[str, str]]) -> list:
     """プロジェクトごとの完了タスクリストブロックを作成します。
 
     Notionのボードビューの代わりに、プロジェクト名を見出しとしたリスト形式で表現します。
 
     Args:
-        tasks (list): Notionタスクオブジェクトのリスト。
+        tasks (list[tuple[str, str]]): summarize_tasks() で集計した完了タスク。
 
     Returns:
         list: Notionブロックオブジェクトのリスト。
@@ -156,18 +189,12 @@ def format_task_blocks(tasks: list) -> list:
 
     # プロジェクトごとに分類
     tasks_by_project = defaultdict(list)
-    for task in tasks:
-        props = task.get("properties", {})
-        project_obj = props.get("Project", {}).get("select") or props.get("プロジェクト", {}).get("select")
-        project_name = project_obj["name"] if project_obj else "未分類"
-        tasks_by_project[project_name].append(task)
+    for title, project_name in tasks:
+        tasks_by_project[project_name].append(title)
 
-    for project_name, task_list in tasks_by_project.items():
+    for project_name, titles in tasks_by_project.items():
         blocks.append(create_heading_3(f"Project: {project_name}"))
-        for task in task_list:
-            props = task.get("properties", {})
-            title_list = props.get("Name", {}).get("title", []) or props.get("タスク名", {}).get("title", [])
-            title = title_list[0]["plain_text"] if title_list else "無題"
+        for title in titles:
             blocks.append(create_bullet(title))
 
     return blocks
@@ -201,27 +228,18 @@ def format_ai_content_blocks(markdown_text: str) -> list:
 # --- Gemini関連処理 ---
 
 
-def format_data_for_ai(tasks: list, events_by_cal: dict) -> str:
+def format_data_for_ai(tasks: list[tuple[str, str]], events_by_cal: dict) -> str:
     """収集したタスクとイベントデータを、AIへのプロンプト用にテキスト整形します。
 
     Args:
-        tasks (list): Notionから取得したタスクオブジェクト(辞書)のリスト。
+        tasks (list[tuple[str, str]]): summarize_tasks() で集計した完了タスク。
         events_by_cal (dict): カレンダーごとのイベントリスト辞書。
 
     Returns:
         str: AIへの入力として利用する整形済みテキスト文字列。
     """
     text = "【完了タスク】\n"
-    for task in tasks:
-        props = task.get("properties", {})
-        # タイトルの取得
-        title_list = props.get("Name", {}).get("title", []) or props.get("タスク名", {}).get("title", [])
-        title = title_list[0]["plain_text"] if title_list else "無題"
-
-        # プロジェクトの取得
-        project_obj = props.get("Project", {}).get("select") or props.get("プロジェクト", {}).get("select")
-        project = project_obj["name"] if project_obj else "未分類"
-
+    for title, project in tasks:
         text += f"- {title} (Project: {project})\n"
 
     text += "\n【カレンダー予定】\n"
@@ -248,6 +266,9 @@ def generate_review(text_data: str, period_str: str) -> str:
         print("Gemini API Key is missing.")
         return None
 
+    # google-genai は読み込みが重いため、実際に生成する場合のみインポートする
+    from google import genai
+
     client = genai.Client(api_key=GOOGLE_API_KEY)
 
     prompt = f"""
@@ -281,20 +302,34 @@ def main():
     period_str = f"{start_date.strftime('%Y-%m-%d')} 〜 {end_date.strftime('%Y-%m-%d')}"
     print(f"対象期間: {period_str}")
 
+    # Notion通信は接続プールを共有する1つのクライアントで行う
+    client = NotionClient()
+
     # 1. Notion完了タスク取得
-    done_tasks = []
     try:
         # TaskDBは初期化時にrelated_dbsを要求するため、ダミーを渡してエラーを回避
+        # 検索APIのみを使用するため、autoload=False で初期化時の全件取得をスキップする
         dummy_db = DummyRelatedDB()
         tasks_db = TaskDB(
-            db_id=NOTION_TASK_ID, token=NOTION_TOKEN, related_dbs={"Projects": dummy_db, "Sprints": dummy_db}
+            db_id=NOTION_TASK_ID,
+            token=NOTION_TOKEN,
+            related_dbs={"Projects": dummy_db, "Sprints": dummy_db},
+            client=client,
+            autoload=False,
         )
 
         # DataFrameを使わず、直接APIを叩くメソッドを使用
-        done_tasks = tasks_db.get_done_tasks(start_date.isoformat(), end_date.isoformat())
+        # 必要なプロパティのみを、ページネーションをたどりながら逐次取得し、タイトルとプロジェクト名だけを保持する
+        # (100件を超えても切り捨てず、ページの生データは保持しない)
+        done_tasks = summarize_tasks(
+            tasks_db.iter_done_tasks(start_date.isoformat(), end_date.isoformat(), properties=DONE_TASK_PROPERTIES)
+        )
         print(f"Notion完了タスク: {len(done_tasks)}件取得")
     except Exception as e:
+        # 途中までの結果で振り返りを作成すると実績が欠けるため、取得に失敗した場合は終了する
         print(f"TaskDB Init/Fetch Error: {e}")
+        print("完了タスクを取得できなかったため終了します。")
+        sys.exit(1)
 
     # 2. Googleカレンダーイベント取得
     events_by_cal = {}
@@ -328,7 +363,7 @@ def main():
     # 4. Notionページ作成とブロック追加
     if NOTION_REVIEW_DB_ID:
         try:
-            review_db = ReviewDB(db_id=NOTION_REVIEW_DB_ID, token=NOTION_TOKEN)
+            review_db = ReviewDB(db_id=NOTION_REVIEW_DB_ID, token=NOTION_TOKEN, client=client)
 
             # 4-1. まず空のページを作成 (タイトルのみ)
             new_page = review_db.create_review_page(title=f"{period_str} 振り返りレポート", content="")
@@ -2,12 +2,21 @@
 
 import logging
 import os
+import sys
 import datetime
-import dateutil.parser
+import functools
+import itertools
+import types
+from typing import Any, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
-from module.notion_api import RelatedDB, TaskDB
-from module.google_cal_api import GoogleCalendarAPI
+from module.notion_api import TaskDB, load_task_databases
+from module.notion_client import NotionClient
+from module.snapshot import RawSnapshotStore
+from module.frame_cache import FrameCache
+from module.gcal_snapshot import EventSnapshotStore
+from module.google_cal_api import EventWriteBatch, GoogleCalendarAPI
+from module.write_queue import NotionWriteQueue
 
 load_dotenv()
 
@@ -16,6 +25,18 @@ NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 G_CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID")
 # 環境変数からキーファイルパスを取得（デフォルトは同階層のservice_account.json）
 G_SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE", "service_account.json")
+# Notion生データのスナップショット保存先（未設定の場合は毎回全件取得）
+NOTION_CACHE_DIR = os.getenv("NOTION_CACHE_DIR")
+# 設定されている場合、プロジェクト名はタスクDBのロールアップから取得する（プロジェクト・スプリントDBを取得しない）
+NOTION_USE_ROLLUPS = os.getenv("NOTION_USE_ROLLUPS")
+# 整形済みDataFrameのキャッシュ保存先（task_notifier.py と共有。未設定の場合は使用しない）
+NOTION_FRAME_CACHE_DIR = os.getenv("NOTION_FRAME_CACHE_DIR")
+# GCalイベント一覧と syncToken の保存先（設定すると前回以降に変更されたイベントのみを取得する）
+GCAL_SNAPSHOT_PATH = os.getenv("GCAL_SNAPSHOT_PATH")
+# Notionへの書き込みに失敗した更新の記録先（次回の実行で再送する）
+NOTION_WRITE_FAILURES_PATH = os.getenv("NOTION_WRITE_FAILURES_PATH", ".cache/notion_write_failures.json")
+# GCalイベントをまとめて取得する単位（この件数のタスクごとに作業日の範囲のイベントを一括取得する）
+GCAL_PREFETCH_CHUNK = 500
 
 
 def main() -> None:
@@ -36,29 +57,171 @@ def main() -> None:
         logging.error(f"Error: Service account key file not found at: {G_SERVICE_ACCOUNT_FILE}")
         return
 
+    # 全DBで接続プールを共有するクライアント (GCal_Event_IDの書き戻しでも接続を使い回す)
+    client = NotionClient()
+    snapshot_store = RawSnapshotStore(NOTION_CACHE_DIR) if NOTION_CACHE_DIR else None
+    frame_cache = FrameCache(NOTION_FRAME_CACHE_DIR) if NOTION_FRAME_CACHE_DIR else None
+    batch = None
+    write_queue = None
+
     try:
         # 1. APIクライアントの初期化
         gcal = GoogleCalendarAPI(G_SERVICE_ACCOUNT_FILE, G_CALENDAR_ID)
-
-        projects_db = RelatedDB(os.getenv("NOTION_PJ_ID"), NOTION_TOKEN)
-        sprints_db = RelatedDB(os.getenv("NOTION_SPRINT_ID"), NOTION_TOKEN)
-
-        tasks_db = TaskDB(os.getenv("NOTION_TASK_ID"), NOTION_TOKEN, {"Projects": projects_db, "Sprints": sprints_db})
-
-        # 2. 同期処理の実行
-        if not tasks_db.pd_items.empty:
-            for row in tasks_db.pd_items.itertuples():
-                process_sync_row(row, tasks_db, gcal)
-        else:
+        # GCalへの作成・更新はキューに溜め、バッチリクエストでまとめて送信する
+        batch = gcal.batch()
+
+        _, _, tasks_db = load_task_databases(
+            token=NOTION_TOKEN,
+            task_db_id=os.getenv("NOTION_TASK_ID"),
+            project_db_id=os.getenv("NOTION_PJ_ID"),
+            sprint_db_id=os.getenv("NOTION_SPRINT_ID"),
+            client=client,
+            snapshot_store=snapshot_store,
+            # タスクDBはDataFrameを構築せず、取得しながら1件ずつ同期する (メモリ使用量の抑制)
+            load_tasks=False,
+            rollup_properties=TaskDB.DEFAULT_ROLLUP_PROPERTIES if NOTION_USE_ROLLUPS else None,
+            frame_cache=frame_cache,
+        )
+
+        # Notionへの書き戻しはバックグラウンドで送信し、前回失敗した書き戻しを再送する
+        # 作成したイベントのIDは他に書き込む人がいないため、ページが更新されていても空のままなら再送する
+        write_queue = NotionWriteQueue(
+            tasks_db, failure_path=NOTION_WRITE_FAILURES_PATH, fill_properties=("GCal_Event_ID",)
+        )
+        pending_writes = write_queue.retry_failed()
+
+        # 2. GCal_Event_ID と照合するGCalイベント一覧を差分取得で最新にする
+        all_gcal_events = load_gcal_events(gcal) if GCAL_SNAPSHOT_PATH else None
+
+        # 3. 同期処理の実行
+        # タスクを GCAL_PREFETCH_CHUNK 件ずつ取り出し、対応するGCalイベントを一括取得してから同期する
+        # (差分取得したイベント一覧がある場合はそれを使用する)
+        # (差分取得したイベント一覧がない場合、一括取得済みの日付範囲はチャンクをまたいで再取得しない)
+        task_count = 0
+        prefetcher = GCalEventPrefetcher(gcal)
+        tasks = (types.SimpleNamespace(**task) for task in tasks_db.iter_items())
+        while rows := list(itertools.islice(tasks, GCAL_PREFETCH_CHUNK)):
+            gcal_events = all_gcal_events if all_gcal_events is not None else prefetcher.prefetch(rows)
+            for row in rows:
+                _apply_pending_event_id(row, pending_writes)
+                process_sync_row(row, tasks_db, gcal, gcal_events, batch, write_queue)
+            task_count += len(rows)
+
+        if task_count == 0:
             logging.info("No tasks found in Notion DB.")
 
     except Exception as e:
         logging.error(f"Sync execution failed: {e}", exc_info=True)
+        # DBの取得失敗などを「同期対象なし」と区別できるよう、異常終了する
+        sys.exit(1)
+    finally:
+        # 途中で失敗した場合も、キューに溜まった書き込みは送信する
+        if batch is not None:
+            batch.flush()
+        # バッチの送信後に追加された書き戻しも含め、Notionへの書き込みの完了を待つ
+        if write_queue is not None:
+            write_queue.close()
+        client.log_metrics()
+        client.close()
 
     logging.info("#=== Finish Synchronization ===#")
 
 
-def process_sync_row(row: object, tasks_db: TaskDB, gcal: GoogleCalendarAPI) -> None:
+def load_gcal_events(gcal: GoogleCalendarAPI) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    GCAL_SNAPSHOT_PATH のスナップショットを syncToken で差分更新し、カレンダーの全イベントを返す。
+
+    Args:
+        gcal (GoogleCalendarAPI): Googleカレンダー操作用インスタンス。
+
+    Returns:
+        Optional[Dict[str, Dict[str, Any]]]: イベントIDをキーとするイベント情報の辞書。
+            取得に失敗した場合はNone (作業日の範囲ごとの一括取得を使用する)。
+    """
+    try:
+        events = gcal.sync_events(EventSnapshotStore(GCAL_SNAPSHOT_PATH))
+    except Exception as e:
+        logging.warning(f"Failed to sync GCal events incrementally. Falling back to prefetch by work date: {e}")
+        return None
+    return events
+
+
+class GCalEventPrefetcher:
+    """
+    タスクの作業日の範囲にあるGCalイベントを一括取得し、取得済みの日付範囲とイベントを保持する。
+
+    タスクは作業日順に並んでいないため、チャンクごとの作業日の範囲は互いに重なる。
+    取得済みの範囲を記録し、各チャンクでは未取得の範囲のみを取得することで、
+    同じ日付のイベントを複数回一覧取得しない (全チャンクの取得範囲の合計は、作業日の全範囲を1回取得する場合と同じ)。
+
+    Args:
+        gcal (GoogleCalendarAPI): Googleカレンダー操作用インスタンス。
+    """
+
+    def __init__(self, gcal: GoogleCalendarAPI) -> None:
+        self.gcal = gcal
+        self.events: Dict[str, Dict[str, Any]] = {}  # これまでに取得したイベント (イベントIDがキー)
+        self.covered: List[Tuple[datetime.date, datetime.date]] = []  # 取得済みの日付範囲 (両端を含む、昇順)
+
+    def prefetch(self, rows: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        GCal_Event_ID を持つタスクの作業日の範囲のうち、未取得の範囲にあるGCalイベントを一括取得する。
+
+        Args:
+            rows (List[Any]): process_sync_row に渡す行オブジェクトのリスト。
+
+        Returns:
+            Dict[str, Dict[str, Any]]: これまでに取得したイベントの辞書 (イベントIDがキー)。
+                取得に失敗した範囲のイベントは含まない (各行で get_event を使用する)。
+        """
+        work_dates = [row.work_date for row in rows if row.gcal_event_id and row.work_date]
+        if not work_dates:
+            return self.events
+        for start, end in self._uncovered(min(work_dates), max(work_dates)):
+            try:
+                self.events.update(self.gcal.get_events_by_id(start, end))
+            except Exception as e:
+                logging.warning(f"Failed to prefetch GCal events. Falling back to per-event requests: {e}")
+                continue
+            self._cover(start, end)
+        return self.events
+
+    def _uncovered(self, start: datetime.date, end: datetime.date) -> List[Tuple[datetime.date, datetime.date]]:
+        """start から end まで (両端を含む) のうち、未取得の日付範囲のリストを返す。"""
+        one_day = datetime.timedelta(days=1)
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self.covered:
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - one_day))
+            cursor = covered_end + one_day
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _cover(self, start: datetime.date, end: datetime.date) -> None:
+        """取得済みの日付範囲に start から end まで (両端を含む) を追加し、重なる・隣接する範囲を結合する。"""
+        merged: List[Tuple[datetime.date, datetime.date]] = []
+        for covered_start, covered_end in sorted(self.covered + [(start, end)]):
+            if merged and covered_start <= merged[-1][1] + datetime.timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], covered_end))
+            else:
+                merged.append((covered_start, covered_end))
+        self.covered = merged
+
+
+def process_sync_row(
+    row: object,
+    tasks_db: TaskDB,
+    gcal: GoogleCalendarAPI,
+    gcal_events: Optional[Dict[str, Dict[str, Any]]] = None,
+    batch: Optional[EventWriteBatch] = None,
+    write_queue: Optional[NotionWriteQueue] = None,
+) -> None:
     """
     単一のタスク行に対して同期ロジックを適用する。
 
@@ -70,20 +233,31 @@ def process_sync_row(row: object, tasks_db: TaskDB, gcal: GoogleCalendarAPI) ->
         - 最終更新日時(Last Edited)を比較し、新しい方の情報を他方に上書きする。
 
     Args:
-        row (object): Pandasのitertuples()で取得したタスク行オブジェクト。
+        row (object): 属性としてタスクの各項目を持つ行オブジェクト
+            (TaskDB.iter_items() の辞書を SimpleNamespace 化したもの、または pd_items.itertuples() の行)。
+            itertuples() の行の Timestamp / NaT / NaN は、先頭で datetime.date / None に変換してから比較する。
         tasks_db (TaskDB): NotionタスクDB操作用インスタンス。
         gcal (GoogleCalendarAPI): Googleカレンダー操作用インスタンス。
+        gcal_events (Optional[Dict[str, Dict[str, Any]]], optional): GCalEventPrefetcher.prefetch / load_gcal_events で
+            一括取得したイベントの辞書。含まれないイベント (作業日の範囲外に移動されたものなど) は get_event で取得する。
+        batch (Optional[EventWriteBatch], optional): GCalへの作成・更新を追加するバッチ。
+            Noneの場合はその場で1件ずつ送信する。作成したイベントのIDはバッチの送信後にNotionへ書き戻す。
+        write_queue (Optional[NotionWriteQueue], optional): Notionへの書き込みを追加するキュー。
+            Noneの場合はその場で tasks_db.update_page を呼び出す。
     """
+    import dateutil.parser  # 同期処理を行う場合のみ読み込む (main の早期終了時には不要)
+
     # 必要な情報の取り出し
     task_id = row.id
     task_title = row.title
-    work_date: datetime.date = row.work_date
-    status = row.status
-    gcal_event_id = row.gcal_event_id
+    work_date = _as_date(row.work_date)
+    status = _missing_to_none(row.status)
+    gcal_event_id = _missing_to_none(row.gcal_event_id)
+    project = _missing_to_none(row.project)
     notion_last_edited = dateutil.parser.isoparse(row.last_edited_time)
 
     # プロジェクト名をタイトルに付与する場合
-    display_title = f"{task_title}【{row.project}】" if row.project else task_title
+    display_title = f"{task_title}【{project}】" if project else task_title
 
     # --- Case A: 中止/保留の判定 ---
     is_canceled = (work_date is None) or (status == "保留中")
@@ -98,16 +272,23 @@ def process_sync_row(row: object, tasks_db: TaskDB, gcal: GoogleCalendarAPI) ->
         if is_canceled:
             return  # 作業日がない、または保留中の新規タスクはGCalに作らない
 
+        if batch is not None:
+            callback = functools.partial(
+                _on_event_created, tasks_db, write_queue, task_id, task_title, row.last_edited_time
+            )
+            batch.create_event(target_title, work_date, callback=callback)
+            return
+
         try:
             new_event_id = gcal.create_event(target_title, work_date)
             # NotionにIDを書き戻す
-            tasks_db.update_page(task_id, {"GCal_Event_ID": {"rich_text": [{"text": {"content": new_event_id}}]}})
+            _update_page(tasks_db, write_queue, task_id, _event_id_property(new_event_id), row.last_edited_time)
         except Exception as e:
             logging.error(f"Failed to create event for {task_title}: {e}")
         return
 
     # --- Case C: GCal IDがある場合 (同期チェック) ---
-    gcal_event = gcal.get_event(gcal_event_id)
+    gcal_event = (gcal_events or {}).get(gcal_event_id) or gcal.get_event(gcal_event_id)
 
     if not gcal_event:
         logging.warning(f"Event not found in GCal (ID: {gcal_event_id}). Skipping.")
@@ -142,22 +323,107 @@ def process_sync_row(row: object, tasks_db: TaskDB, gcal: GoogleCalendarAPI) ->
         update_date = gcal_date if gcal_date else datetime.date.today()
 
         if not gcal_title.startswith("【中止】") or gcal_title != target_title:
-            gcal.update_event(gcal_event_id, target_title, update_date)
+            _update_event(gcal, batch, gcal_event_id, target_title, update_date)
         return
 
     # 3. 通常更新 (更新日時比較)
     # Notionの方が新しい -> GCalを更新
     if notion_last_edited > gcal_updated:
-        gcal.update_event(gcal_event_id, target_title, work_date)
+        _update_event(gcal, batch, gcal_event_id, target_title, work_date)
 
     # GCalの方が新しい -> Notionを更新
     elif gcal_updated > notion_last_edited:
         # GCalで日付が変更されていた場合、Notionに反映
         if gcal_date and gcal_date != work_date:
-            tasks_db.update_page(task_id, {"作業日": {"date": {"start": gcal_date.isoformat()}}})
+            properties = {"作業日": {"date": {"start": gcal_date.isoformat()}}}
+            _update_page(tasks_db, write_queue, task_id, properties, row.last_edited_time)
         else:
             logging.info("GCal is newer but date is same. Updating title only in GCal (prefer Notion title structure).")
-            gcal.update_event(gcal_event_id, target_title, work_date)
+            _update_event(gcal, batch, gcal_event_id, target_title, work_date)
+
+
+def _missing_to_none(value: Any) -> Any:
+    """欠損値 (None / NaN / NaT) をNoneにそろえる。NaN と NaT は自身と等しくならないことを利用する。"""
+    if value is None or value != value:
+        return None
+    return value
+
+
+def _as_date(value: Any) -> Optional[datetime.date]:
+    """日付の値を datetime.date にそろえる (pd.Timestamp は datetime.datetime のサブクラス)。"""
+    value = _missing_to_none(value)
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def _update_event(
+    gcal: GoogleCalendarAPI,
+    batch: Optional[EventWriteBatch],
+    event_id: str,
+    title: str,
+    start_date: Optional[datetime.date],
+) -> None:
+    """バッチがあればイベントの更新をバッチに追加し、なければその場で更新する。"""
+    if batch is not None:
+        batch.update_event(event_id, title, start_date)
+    else:
+        gcal.update_event(event_id, title, start_date)
+
+
+def _update_page(
+    tasks_db: TaskDB,
+    write_queue: Optional[NotionWriteQueue],
+    page_id: str,
+    properties: Dict[str, Any],
+    last_edited_time: str = "",
+) -> None:
+    """
+    キューがあればNotionページの更新をキューに追加し、なければその場で更新する。
+
+    last_edited_time には更新の判断に使った行の last_edited_time を渡す (失敗時の再送の判定に使用する)。
+    """
+    if write_queue is not None:
+        write_queue.submit(page_id, properties, last_edited_time)
+    else:
+        tasks_db.update_page(page_id, properties)
+
+
+def _event_id_property(event_id: str) -> Dict[str, Any]:
+    """GCal_Event_ID プロパティを更新する内容を作成する。"""
+    return {"GCal_Event_ID": {"rich_text": [{"text": {"content": event_id}}]}}
+
+
+def _apply_pending_event_id(row: Any, pending_writes: Dict[str, Dict[str, Any]]) -> None:
+    """
+    前回の実行で書き戻しに失敗した GCal_Event_ID を行に反映する。
+
+    Notionにまだ反映されていないIDを補うことで、同じタスクのイベントを重複して作成しないようにする。
+    """
+    if row.gcal_event_id or row.id not in pending_writes:
+        return
+    rich_text = pending_writes[row.id].get("GCal_Event_ID", {}).get("rich_text", [])
+    if rich_text:
+        row.gcal_event_id = rich_text[0]["text"]["content"]
+
+
+def _on_event_created(
+    tasks_db: TaskDB,
+    write_queue: Optional[NotionWriteQueue],
+    task_id: str,
+    task_title: str,
+    last_edited_time: str,
+    event: Optional[Dict[str, Any]],
+    error: Optional[Exception],
+) -> None:
+    """バッチで作成したイベントのIDをNotionに書き戻す (EventWriteBatch のコールバック)。"""
+    if error is not None:
+        logging.error(f"Failed to create event for {task_title}: {error}")
+        return
+    try:
+        _update_page(tasks_db, write_queue, task_id, _event_id_property(event["id"]), last_edited_time)
+    except Exception as e:
+        logging.error(f"Failed to write back event ID for {task_title}: {e}")
 
 
 if __name__ == "__main__":
@@ -2,11 +2,16 @@
 
 import logging
 import os
+import sys
 from dotenv import load_dotenv
 
-from module.notion_api import RelatedDB, TaskDB
+from module.notion_api import RECORDS_BACKEND, TaskDB, load_task_databases
+from module.notion_client import NotionClient
+from module.snapshot import RawSnapshotStore
+from module.frame_cache import FrameCache
 from module.line_notifier import send_line_messageapi
-from module.util import sort_filter, make_sentence
+from module.records import filter_hot_tasks, render_sentences
+from module.util import build_hot_task_filter, sort_filter, make_sentence
 
 load_dotenv()
 
@@ -20,41 +25,75 @@ def main() -> None:
     Notionのタスク、プロジェクト、スプリントDBからデータを取得し、
     期限が近いまたは過ぎたアクティブなタスクをフィルタリング・整形して、
     LINEに通知する。
+
+    環境変数 NOTIFIER_BACKEND に "records" を指定した場合は、DataFrameを構築せずに
+    Task レコードのリストで同じフィルタリング・整形を行う。
+    環境変数 NOTION_USE_ROLLUPS を設定した場合は、プロジェクトDB・スプリントDBを取得せず、
+    タスクDBのロールアップからプロジェクト名・スプリント名・現在のスプリントを求める。
     """
     # Logging
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     logging.info("#=== Start program ===#")
 
+    # 全DBで接続プールを共有するクライアント
+    client = NotionClient()
+    # NOTION_CACHE_DIR が設定されていれば、前回以降に更新されたページのみを取得する
+    cache_dir = os.getenv("NOTION_CACHE_DIR")
+    snapshot_store = RawSnapshotStore(cache_dir) if cache_dir else None
+    # NOTION_FRAME_CACHE_DIR が設定されていれば、直前の実行で整形したDataFrameを再利用する
+    frame_cache_dir = os.getenv("NOTION_FRAME_CACHE_DIR")
+    frame_cache = FrameCache(frame_cache_dir) if frame_cache_dir else None
+    # データの保持形式 ("pandas" または "records")
+    backend = os.getenv("NOTIFIER_BACKEND", "pandas")
+    # 関連DBの代わりにタスクDBのロールアップを使用するか
+    rollup_properties = TaskDB.DEFAULT_ROLLUP_PROPERTIES if os.getenv("NOTION_USE_ROLLUPS") else None
+
     try:
-        # 1. 関連DBのインスタンス化とデータ取得 (初期化時にAPIアクセスとDataFrame生成を行う)
-        logging.info("Initializing Related Databases (Projects & Sprints)...")
+        # 1. プロジェクト・スプリント・タスクDBを並列に取得 (APIアクセスとDataFrame生成を行う)
+        logging.info("Initializing Databases (Projects, Sprints & Tasks)...")
         token = os.getenv("NOTION_TOKEN")
 
-        Projects = RelatedDB(os.getenv("NOTION_PJ_ID"), token)
-        Sprints = RelatedDB(os.getenv("NOTION_SPRINT_ID"), token)
-
-        # 2. タスクDBのインスタンス化とデータ取得
-        logging.info("Initializing Task Database...")
-        Tasks = TaskDB(
-            db_id=os.getenv("NOTION_TASK_ID"), token=token, related_dbs={"Projects": Projects, "Sprints": Sprints}
+        Projects, Sprints, Tasks = load_task_databases(
+            token=token,
+            task_db_id=os.getenv("NOTION_TASK_ID"),
+            project_db_id=os.getenv("NOTION_PJ_ID"),
+            sprint_db_id=os.getenv("NOTION_SPRINT_ID"),
+            client=client,
+            snapshot_store=snapshot_store,
+            # 通知候補となり得るタスクのみをAPI側で絞り込んで取得する
+            task_filter=build_hot_task_filter(),
+            backend=backend,
+            rollup_properties=rollup_properties,
+            frame_cache=frame_cache,
         )
 
-        # 3. フィルタリングとソート
-        pd_hot_tasks = sort_filter(Tasks.pd_items, Projects, Sprints)
+        # 2. フィルタリングとソート
+        if backend == RECORDS_BACKEND:
+            hot_tasks = filter_hot_tasks(Tasks.records, Projects, Sprints)
+        else:
+            hot_tasks = sort_filter(Tasks.pd_items, Projects, Sprints)
 
-        if pd_hot_tasks.empty:
+        if len(hot_tasks) == 0:
             logging.info("No hot tasks found for notification.")
         else:
-            # 4. 通知文章の作成
-            sentence_list = make_sentence(pd_hot_tasks)
+            # 3. 通知文章の作成
+            if backend == RECORDS_BACKEND:
+                sentence_list = render_sentences(hot_tasks)
+            else:
+                sentence_list = make_sentence(hot_tasks)
 
-            # 5. LINEに通知
+            # 4. LINEに通知
             logging.info(f"Sending {len(sentence_list)} notification message(s) to LINE.")
             for sentence in sentence_list:
                 send_line_messageapi(sentence)
 
     except Exception as e:
         logging.error(f"An unexpected error occurred in main execution: {e}", exc_info=True)
+        # DBの取得失敗などを「通知対象なし」と区別できるよう、異常終了する
+        sys.exit(1)
+    finally:
+        client.log_metrics()
+        client.close()
 
     logging.info("#=== Finish program ===#")
 
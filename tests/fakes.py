@@ -0,0 +1,206 @@
+# tests/fakes.py
+
+import datetime
+import itertools
+import json
+import re
+
+
+class FakeResponse:
+    """ステータスコード・ヘッダー・JSONボディを持つ requests.Response の代用品。"""
+
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.reason = "OK" if status_code == 200 else "Error"
+        self._data = data if data is not None else {}
+        self.text = json.dumps(self._data, ensure_ascii=False)
+
+    def json(self):
+        return self._data
+
+
+class FakeNotionClient:
+    """
+    Notion API のうちデータベース検索・スキーマ取得・ページ取得/更新に応答する NotionClient の代用品。
+
+    databases にはDB IDをキーとして生のページデータのリストを渡す。検索では last_edited_time の
+    フィルター (on_or_after)・ソート・page_size / start_cursor によるページネーションのみを再現し、
+    それ以外のフィルターは queries に記録するだけで適用しない。databases にないDBへのアクセスは404を返す。
+    """
+
+    def __init__(self, databases=None):
+        self.databases = databases or {}
+        self.requests = []  # (メソッド, URL) のリスト
+        self.queries = []  # (DB ID, 検索のリクエストボディ) のリスト
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        match = re.search(r"/databases/([^/]+)/query$", url)
+        if match:
+            return self._query(match.group(1), kwargs.get("json") or {})
+        match = re.search(r"/databases/([^/]+)$", url)
+        if match:
+            return self._schema(match.group(1))
+        match = re.search(r"/pages/([^/]+)$", url)
+        if match:
+            page = self.find_page(match.group(1))
+            if page is None:
+                return FakeResponse(404)
+            if method == "PATCH":
+                page["properties"] = {**page.get("properties", {}), **kwargs["json"]["properties"]}
+            return FakeResponse(200, page)
+        return FakeResponse(404)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, idempotent=True, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, idempotent=True, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def find_page(self, page_id):
+        for pages in self.databases.values():
+            for page in pages:
+                if page["id"] == page_id:
+                    return page
+        return None
+
+    def _query(self, db_id, payload):
+        self.queries.append((db_id, payload))
+        if db_id not in self.databases:
+            return FakeResponse(404)
+        pages = list(self.databases[db_id])
+        condition = payload.get("filter", {}).get("last_edited_time")
+        if condition:
+            pages = [page for page in pages if page["last_edited_time"] >= condition["on_or_after"]]
+        for sort in reversed(payload.get("sorts", [])):
+            if sort.get("timestamp") == "last_edited_time":
+                pages.sort(key=lambda page: page["last_edited_time"], reverse=sort["direction"] == "descending")
+        start = int(payload.get("start_cursor") or 0)
+        end = start + payload.get("page_size", 100)
+        has_more = end < len(pages)
+        return FakeResponse(
+            200, {"results": pages[start:end], "has_more": has_more, "next_cursor": str(end) if has_more else None}
+        )
+
+    def _schema(self, db_id):
+        pages = self.databases.get(db_id)
+        if pages is None:
+            return FakeResponse(404)
+        properties = {}
+        for page in pages:
+            for name, prop in page.get("properties", {}).items():
+                properties.setdefault(name, {"id": prop.get("id", name), "name": name, "type": prop.get("type")})
+        return FakeResponse(200, {"id": db_id, "properties": properties})
+
+
+def make_page(page_id, last_edited_time="2025-01-01T00:00:00.000Z", properties=None, **extra):
+    """生のページデータを作成する。"""
+    return {"id": page_id, "last_edited_time": last_edited_time, "properties": properties or {}, **extra}
+
+
+def title_property(text):
+    return {"id": "title", "type": "title", "title": [{"plain_text": text}] if text else []}
+
+
+def status_property(name, option_id=None):
+    return {"id": "status", "type": "status", "status": {"id": option_id or name, "name": name}}
+
+
+def make_related_page(page_id, title, title_name="プロジェクト名", status="進行中", option_id=None, **extra):
+    """プロジェクトDB・スプリントDB (RelatedDB) の生のページデータを作成する。"""
+    properties = {title_name: title_property(title), "ステータス": status_property(status, option_id)}
+    return make_page(page_id, properties=properties, **extra)
+
+
+def date_property(start=None, end=None):
+    return {"id": "date", "type": "date", "date": {"start": start, "end": end} if start else None}
+
+
+def make_task_page(
+    page_id,
+    title="task",
+    project=None,
+    sprint=None,
+    start=None,
+    end=None,
+    work_date=None,
+    status="未着手",
+    tag="作業",
+    gcal_event_id=None,
+    last_edited_time="2025-01-01T00:00:00.000Z",
+    extra_properties=None,
+):
+    """
+    タスクDB (TaskDB) の生のページデータを作成する。
+
+    project / sprint はリレーション先のページID、日付は ISO 8601 文字列 (または datetime.date) で指定する。
+    """
+
+    def iso(value):
+        return value.isoformat() if hasattr(value, "isoformat") else value
+
+    properties = {
+        "タスク名": title_property(title),
+        "プロジェクト": {"id": "pj", "type": "relation", "relation": [{"id": project}] if project else []},
+        "スプリント": {"id": "sp", "type": "relation", "relation": [{"id": sprint}] if sprint else []},
+        "期限": dict(date_property(iso(start), iso(end)), id="due"),
+        "ステータス": status_property(status),
+        "タグ": {"id": "tag", "type": "multi_select", "multi_select": [{"name": tag}] if tag else []},
+        "作業日": dict(date_property(iso(work_date)), id="work"),
+        "GCal_Event_ID": {
+            "id": "gcal",
+            "type": "rich_text",
+            "rich_text": [{"plain_text": gcal_event_id}] if gcal_event_id else [],
+        },
+        **(extra_properties or {}),
+    }
+    return make_page(page_id, last_edited_time, properties)
+
+
+def make_hot_task_candidates(today):
+    """
+    通知対象の判定 (sort_filter / filter_hot_tasks) の境界を網羅するタスクDBを作成する。
+
+    Returns:
+        dict: FakeNotionClient に渡すDB IDをキーとするページの辞書 ("projects", "sprints", "tasks")。
+    """
+
+    def day(offset):
+        return None if offset is None else today + datetime.timedelta(days=offset)
+
+    projects = [make_related_page("pj-b", "B"), make_related_page("pj-a", "A")]
+    sprints = [
+        make_related_page("sp-now", "今スプリント", title_name="スプリント名", status="進行中", option_id="current"),
+        make_related_page("sp-old", "前スプリント", title_name="スプリント名", status="完了", option_id="done"),
+    ]
+    tasks = []
+    combinations = itertools.product(
+        (None, -1, 0, 1, 2, 3),  # 期限の開始日
+        (None, 0, 2),  # 期限の終了日 (開始日からの日数)
+        (None, -1, 0, 1, 3),  # 作業日
+        ("未着手", "反応待ち", "完了"),
+        ("sp-now", "sp-old", None),
+    )
+    for i, (start, length, work, status, sprint) in enumerate(combinations):
+        if start is None and length is not None:
+            continue
+        end = None if length is None else start + length
+        tasks.append(
+            make_task_page(
+                f"t{i}",
+                title=f"task{i}",
+                # プロジェクト・タグがスプリント・ステータスと連動しないよう、組み合わせの番号から散らす
+                project=("pj-a", "pj-b", None)[(i // 3 + i // 9) % 3],
+                sprint=sprint,
+                start=day(start),
+                end=day(end),
+                work_date=day(work),
+                status=status,
+                tag=("作業", "連絡", None)[(i // 3 + i // 45) % 3],
+            )
+        )
+    return {"projects": projects, "sprints": sprints, "tasks": tasks}
@@ -0,0 +1,119 @@
+# tests/test_frame_cache.py
+
+import datetime
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+
+from module.frame_cache import FrameCache
+from module.notion_api import load_task_databases
+from module.snapshot import RawSnapshotStore
+from module.util import sort_filter
+from tests.fakes import FakeNotionClient, make_hot_task_candidates
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class FrameCacheMetaTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = FrameCache(self.tmp.name)
+        self.cache.enabled = True  # pyarrow がなくても、Parquetを読む前の判定は確認できる
+        data_path, self.meta_path = self.cache._paths("db")
+        open(data_path, "wb").close()
+
+    def write_meta(self, age=datetime.timedelta(0), **overrides):
+        written_at = datetime.datetime.now(datetime.timezone.utc) - age
+        meta = {"version": FrameCache.VERSION, "key": "key", "watermark": "w1", "written_at": written_at.isoformat()}
+        meta.update(overrides)
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return meta
+
+    def test_stamp_is_the_write_time_of_a_valid_cache(self):
+        meta = self.write_meta()
+        self.assertEqual(self.cache.stamp("db", "key", "w1"), meta["written_at"])
+
+    def test_cache_is_invalid_when_key_version_or_watermark_differ_or_expired(self):
+        self.write_meta()
+        self.assertIsNone(self.cache.stamp("db", "other", "w1"))
+        with self.assertLogs(level="INFO"):
+            self.assertIsNone(self.cache.stamp("db", "key", "w2"))
+        self.write_meta(version=FrameCache.VERSION + 1)
+        self.assertIsNone(self.cache.stamp("db", "key", "w1"))
+        self.write_meta(age=self.cache.max_age + datetime.timedelta(seconds=1))
+        self.assertIsNone(self.cache.stamp("db", "key", "w1"))
+        self.assertIsNone(self.cache.load("db", "key", "w1"))
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class FrameCacheLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.frame_cache = FrameCache(os.path.join(self.tmp.name, "frames"))
+        self.databases = make_hot_task_candidates(datetime.date.today())
+
+    def load(self, **kwargs):
+        client = FakeNotionClient(self.databases)
+        projects, sprints, tasks = load_task_databases(
+            "token", "tasks", "projects", "sprints", client=client, frame_cache=self.frame_cache, **kwargs
+        )
+        return client, sort_filter(tasks.pd_items, projects, sprints)
+
+    def expire(self, db_id):
+        _, meta_path = self.frame_cache._paths(db_id)
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["written_at"] = "2000-01-01T00:00:00+00:00"
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def test_warm_run_does_not_touch_the_network(self):
+        _, cold = self.load()
+        client, warm = self.load()
+        self.assertEqual(client.requests, [])
+        self.assertEqual(warm["id"].tolist(), cold["id"].tolist())
+        self.assertEqual(warm["start"].dtype, cold["start"].dtype)
+        self.assertEqual(warm["project"].dtype.name, "category")
+
+    def test_task_cache_is_rebuilt_when_a_related_db_is_refetched(self):
+        self.load()
+        self.databases["projects"][1]["properties"]["プロジェクト名"]["title"][0]["plain_text"] = "A2"
+        self.expire("projects")
+
+        client, warm = self.load()
+        self.assertEqual({db_id for db_id, _ in client.queries}, {"projects", "tasks"})
+        self.assertIn("A2", set(warm["project"]))
+        self.assertNotIn("A", set(warm["project"]))
+
+    def test_cache_is_invalidated_when_the_local_snapshot_changes(self):
+        store = RawSnapshotStore(os.path.join(self.tmp.name, "snapshots"))
+        self.load(snapshot_store=store)
+        client, _ = self.load(snapshot_store=store)
+        self.assertEqual(client.requests, [])
+
+        # 他のエントリーポイントがプロジェクトDBのスナップショットを更新した
+        snapshot = store.load("projects")
+        store.save("projects", snapshot["pages"], snapshot["full_synced_at"], snapshot["property_ids"])
+
+        client, _ = self.load(snapshot_store=store)
+        self.assertEqual({db_id for db_id, _ in client.queries}, {"projects", "tasks"})
+
+    def test_save_does_not_touch_temp_files_of_other_writers(self):
+        other = os.path.join(self.frame_cache.cache_dir, "projects.parquet.tmp")
+        os.makedirs(self.frame_cache.cache_dir, exist_ok=True)
+        with open(other, "w") as f:
+            f.write("partial")
+        self.load()
+        with open(other) as f:
+            self.assertEqual(f.read(), "partial")
+        leftovers = [name for name in os.listdir(self.frame_cache.cache_dir) if name.endswith(".tmp")]
+        self.assertEqual(leftovers, ["projects.parquet.tmp"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+# tests/test_google_cal_api.py
+
+import datetime
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from module.gcal_snapshot import EventSnapshotStore
+from module.google_cal_api import EventWriteBatch, GoogleCalendarAPI
+
+
+class FakeHttpError(Exception):
+    """googleapiclient.errors.HttpError の代用品 (resp.status のみを持つ)。"""
+
+    def __init__(self, status):
+        super().__init__(status)
+        self.resp = types.SimpleNamespace(status=status)
+
+
+class FakeRequest:
+    def __init__(self, execute):
+        self.execute = execute
+
+
+class FakeEvents:
+    """syncToken ごとにあらかじめ指定したレスポンス (または例外) を返す events リソースの代用品。"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def list(self, **params):
+        self.calls.append(params)
+        result = self.responses[params.get("syncToken")]
+
+        def execute():
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return FakeRequest(execute)
+
+
+def make_gcal(responses):
+    gcal = object.__new__(GoogleCalendarAPI)
+    gcal.calendar_id = "calendar"
+    events = FakeEvents(responses)
+    gcal.service = types.SimpleNamespace(events=lambda: events)
+    return gcal, events
+
+
+def event(event_id, status="confirmed"):
+    return {"id": event_id, "status": status, "start": {"date": "2025-01-01"}}
+
+
+class SyncEventsTest(unittest.TestCase):
+    def setUp(self):
+        # googleapiclient がインストールされていない環境でも list_changes の HttpError の判定を確認できるようにする
+        errors = types.ModuleType("googleapiclient.errors")
+        errors.HttpError = FakeHttpError
+        modules = {"googleapiclient": types.ModuleType("googleapiclient"), "googleapiclient.errors": errors}
+        patcher = mock.patch.dict(sys.modules, modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = EventSnapshotStore(os.path.join(self.tmp.name, "gcal.json"))
+
+    def test_full_sync_does_not_expand_recurring_events(self):
+        gcal, events = make_gcal({None: {"items": [event("a"), event("b")], "nextSyncToken": "t1"}})
+        self.assertEqual(sorted(gcal.sync_events(self.store)), ["a", "b"])
+        self.assertNotIn("singleEvents", events.calls[0])
+        self.assertEqual(self.store.load("calendar")["sync_token"], "t1")
+
+    def test_incremental_sync_applies_changes_and_deletions(self):
+        self.store.save("calendar", "t1", {"a": event("a"), "b": event("b")})
+        gcal, events = make_gcal({"t1": {"items": [event("a", "cancelled"), event("c")], "nextSyncToken": "t2"}})
+        self.assertEqual(sorted(gcal.sync_events(self.store)), ["b", "c"])
+        self.assertEqual(
+            events.calls[0], {"calendarId": "calendar", "syncToken": "t1", "maxResults": 2500, "pageToken": None}
+        )
+        self.assertEqual(self.store.load("calendar")["sync_token"], "t2")
+
+    def test_expired_sync_token_falls_back_to_full_sync(self):
+        self.store.save("calendar", "t1", {"a": event("a")})
+        gcal, events = make_gcal({"t1": FakeHttpError(410), None: {"items": [event("b")], "nextSyncToken": "t2"}})
+        self.assertEqual(list(gcal.sync_events(self.store)), ["b"])
+        self.assertEqual([call.get("syncToken") for call in events.calls], ["t1", None])
+
+
+class FakeBatchRequest:
+    """追加したリクエストを execute() でまとめて処理する BatchHttpRequest の代用品。"""
+
+    def __init__(self, callback, sent):
+        self.callback = callback
+        self.requests = []
+        self.sent = sent
+
+    def add(self, request, request_id):
+        self.requests.append((request, request_id))
+
+    def execute(self):
+        self.sent.append(len(self.requests))
+        for request, request_id in self.requests:
+            if request["body"]["summary"].startswith("bad"):
+                self.callback(request_id, None, RuntimeError("400"))
+            else:
+                self.callback(request_id, {"id": request.get("eventId", "new-" + request["body"]["summary"])}, None)
+
+
+class FakeWriteEvents:
+    """insert / patch でリクエストの内容 (辞書) を返す events リソースの代用品。"""
+
+    def insert(self, calendarId, body):
+        return {"body": body}
+
+    def patch(self, calendarId, eventId, body):
+        return {"eventId": eventId, "body": body}
+
+
+def make_batch():
+    gcal = object.__new__(GoogleCalendarAPI)
+    gcal.calendar_id = "calendar"
+    sent = []
+    events = FakeWriteEvents()
+    gcal.service = types.SimpleNamespace(
+        events=lambda: events, new_batch_http_request=lambda callback: FakeBatchRequest(callback, sent)
+    )
+    return gcal.batch(), sent
+
+
+class EventWriteBatchTest(unittest.TestCase):
+    def test_sends_every_max_batch_size_requests_and_the_rest_on_flush(self):
+        batch, sent = make_batch()
+        for i in range(EventWriteBatch.MAX_BATCH_SIZE + 1):
+            batch.create_event(f"task{i}", datetime.date(2025, 1, 1))
+        self.assertEqual(sent, [EventWriteBatch.MAX_BATCH_SIZE])
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(batch.flush(), [({"id": f"new-task{EventWriteBatch.MAX_BATCH_SIZE}"}, None)])
+        self.assertEqual(sent, [EventWriteBatch.MAX_BATCH_SIZE, 1])
+        self.assertEqual(batch.flush(), [])
+
+    def test_failure_of_one_request_does_not_affect_the_others(self):
+        batch, _ = make_batch()
+        received = []
+
+        def callback(event, error):
+            received.append((event, error))
+
+        batch.create_event("bad", datetime.date(2025, 1, 1), callback=callback)
+        batch.update_event("e1", "task", datetime.date(2025, 1, 2), callback=callback)
+        batch.flush()
+        self.assertIsNone(received[0][0])
+        self.assertIsInstance(received[0][1], RuntimeError)
+        self.assertEqual(received[1], ({"id": "e1"}, None))
+
+    def test_failed_batch_marks_unanswered_requests_as_failed(self):
+        batch, _ = make_batch()
+        error = ConnectionError("reset")
+        batch.api.service.new_batch_http_request = lambda callback: mock.Mock(execute=mock.Mock(side_effect=error))
+        batch.create_event("task", datetime.date(2025, 1, 1))
+        self.assertEqual(batch.flush(), [(None, error)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+# tests/test_notion_api.py
+
+import copy
+import datetime
+import unittest
+
+from module.notion_api import (
+    PANDAS_BACKEND,
+    RECORDS_BACKEND,
+    NotionAPIError,
+    RelatedDB,
+    TaskDB,
+    load_task_databases,
+)
+from module.records import filter_hot_tasks
+from module.util import sort_filter
+from tests.fakes import FakeNotionClient, make_hot_task_candidates, make_related_page, make_task_page
+
+BACKENDS = (PANDAS_BACKEND, RECORDS_BACKEND)
+
+
+def make_projects(backend=PANDAS_BACKEND):
+    pages = [make_related_page("p1", "A"), make_related_page("p2", "B"), make_related_page("p3", "A")]
+    return RelatedDB("projects", "token", client=FakeNotionClient({"projects": pages}), backend=backend)
+
+
+class LookupTest(unittest.TestCase):
+    def test_lookup_many_keeps_input_order_and_uses_default(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                db = make_projects(backend)
+                self.assertEqual(db.lookup_many("id", ["p2", "missing", "p1"], "title", default=""), ["B", "", "A"])
+
+    def test_duplicate_values_resolve_to_the_first_row(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                db = make_projects(backend)
+                self.assertEqual(db.get_item_from_pd("title", "A", "id"), "p1")
+                self.assertEqual(db.lookup_many("title", ["A"], "id"), ["p1"])
+
+    def test_missing_value_or_column_raises(self):
+        db = make_projects()
+        with self.assertRaises(LookupError):
+            db.get_item_from_pd("id", "missing", "title")
+        with self.assertRaises(ValueError):
+            db.lookup_many("id", ["p1"], "missing")
+
+    def test_index_is_rebuilt_when_frame_is_replaced(self):
+        db = make_projects()
+        self.assertEqual(db.get_item_from_pd("title", "A", "id"), "p1")
+        self.assertIn("title", db._indexes)
+        db.pd_items = db.pd_items.iloc[::-1].reset_index(drop=True)
+        self.assertEqual(db.get_item_from_pd("title", "A", "id"), "p3")
+
+
+class LoadFailureTest(unittest.TestCase):
+    def setUp(self):
+        self.databases = {
+            "projects": [make_related_page("p1", "A")],
+            "sprints": [make_related_page("s1", "S", title_name="スプリント名")],
+            "tasks": [make_task_page("t1", project="p1", sprint="s1")],
+        }
+
+    def load(self, **kwargs):
+        return load_task_databases(
+            "token", "tasks", "projects", "sprints", client=FakeNotionClient(self.databases), **kwargs
+        )
+
+    def test_task_fetch_failure_is_raised_instead_of_returning_no_tasks(self):
+        del self.databases["tasks"]
+        with self.assertLogs(level="ERROR"), self.assertRaises(NotionAPIError):
+            self.load()
+
+    def test_related_db_fetch_failure_is_raised(self):
+        del self.databases["sprints"]
+        for load_tasks in (True, False):
+            with self.subTest(load_tasks=load_tasks), self.assertLogs(level="ERROR"):
+                with self.assertRaises(NotionAPIError):
+                    self.load(load_tasks=load_tasks)
+
+    def test_lazy_load_failure_is_raised_on_access(self):
+        db = RelatedDB("missing", "token", client=FakeNotionClient(self.databases), autoload=False)
+        with self.assertLogs(level="ERROR"), self.assertRaises(NotionAPIError):
+            db.pd_items
+
+    def test_successful_load(self):
+        _, _, tasks = self.load()
+        self.assertEqual(tasks.pd_items["project"].tolist(), ["A"])
+
+
+class RelationBackfillTest(unittest.TestCase):
+    def setUp(self):
+        self.databases = {
+            "projects": [make_related_page("p1", "A")],
+            "sprints": [make_related_page("s1", "S1", title_name="スプリント名")],
+            "tasks": [
+                make_task_page("t1", project="p1", sprint="s1"),
+                make_task_page("t2", project="p-new", sprint="s-new"),
+                make_task_page("t3", project="p-new", sprint="s1"),
+                make_task_page("t4", project="p-gone", sprint="s1"),
+            ],
+            # 関連DBの読み込み後に作成され、ページ単位の取得でのみ見つかるページ
+            "created-later": [
+                make_related_page("p-new", "New"),
+                make_related_page("s-new", "S2", title_name="スプリント名"),
+            ],
+        }
+
+    def test_missing_relations_are_fetched_once_and_backfilled(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                client = FakeNotionClient(self.databases)
+                with self.assertLogs(level="WARNING") as logs:
+                    projects, sprints, tasks = load_task_databases(
+                        "token", "tasks", "projects", "sprints", client=client, backend=backend
+                    )
+                rows = tasks.records if backend == RECORDS_BACKEND else list(tasks.pd_items.itertuples())
+
+                # 関連先が見つからないタスクも落とさず、取得できなかったリレーションのみ未設定のまま残す
+                self.assertEqual([row.id for row in rows], ["t1", "t2", "t3", "t4"])
+                self.assertEqual([row.project for row in rows], ["A", "New", "New", ""])
+                self.assertEqual([row.sprint for row in rows], ["S1", "S2", "S1", "S1"])
+                self.assertTrue(any("p-gone" in message for message in logs.output))
+
+                # 見つからなかったページは重複なく1回ずつ取得する
+                retrieved = sorted(url.rsplit("/", 1)[1] for method, url in client.requests if "/pages/" in url)
+                self.assertEqual(retrieved, ["p-gone", "p-new", "s-new"])
+
+                # 取得したページは関連DBの検索用インデックスにも追加される
+                self.assertEqual(projects.lookup_many("id", ["p-new", "p1"], "title"), ["New", "A"])
+                self.assertEqual(sprints.get_item_from_pd("id", "s-new", "title"), "S2")
+
+    def test_backfill_adds_pages_to_the_index(self):
+        projects = RelatedDB("projects", "token", client=FakeNotionClient(self.databases))
+        self.assertEqual(projects.backfill([make_related_page("p2", "B")]), 1)
+        self.assertEqual(projects.backfill([]), 0)
+        self.assertEqual(projects.lookup_many("id", ["p1", "p2"], "title"), ["A", "B"])
+
+
+def rollup_property(*elements):
+    return {"type": "rollup", "rollup": {"type": "array", "array": list(elements)}}
+
+
+def with_rollups(databases):
+    """タスクDBの各ページに、リレーション先のプロジェクト名・スプリント名・スプリントステータスのロールアップを追加する。"""
+    related = {page["id"]: page for page in databases["projects"] + databases["sprints"]}
+    tasks = copy.deepcopy(databases["tasks"])
+    for task in tasks:
+        props = task["properties"]
+        project = [related[r["id"]] for r in props["プロジェクト"]["relation"]]
+        sprint = [related[r["id"]] for r in props["スプリント"]["relation"]]
+        props["プロジェクト名"] = rollup_property(*(page["properties"]["プロジェクト名"] for page in project))
+        props["スプリント名"] = rollup_property(*(page["properties"]["スプリント名"] for page in sprint))
+        props["スプリントステータス"] = rollup_property(*(page["properties"]["ステータス"] for page in sprint))
+    return tasks
+
+
+class RollupTest(unittest.TestCase):
+    def test_property_text_parses_rollup_elements(self):
+        cases = [
+            (
+                rollup_property(
+                    {"type": "rich_text", "rich_text": []}, {"type": "title", "title": [{"plain_text": "PJ"}]}
+                ),
+                "PJ",
+            ),
+            (rollup_property(), None),
+            ({"type": "rich_text", "rich_text": [{"plain_text": "a"}, {"plain_text": "b"}]}, "ab"),
+            ({"type": "select", "select": {"id": "opt", "name": "A"}}, "A"),
+            ({"type": "select", "select": None}, None),
+            ({"type": "formula", "formula": {"type": "string", "string": "F"}}, "F"),
+            ({"type": "formula", "formula": {"type": "number", "number": 3}}, "3"),
+            ({"type": "formula", "formula": {"type": "string", "string": ""}}, None),
+            ({"type": "number", "number": 1}, None),
+        ]
+        for prop, expected in cases:
+            with self.subTest(prop=prop):
+                self.assertEqual(TaskDB._property_text(prop), expected)
+
+        status = rollup_property({"type": "status", "status": {"id": "current", "name": "進行中"}})
+        self.assertEqual(TaskDB._property_text(status), "進行中")
+        self.assertEqual(TaskDB._property_text(status, option_key="id"), "current")
+
+    def test_rollup_mode_matches_relation_mode_without_related_dbs(self):
+        databases = make_hot_task_candidates(datetime.date.today())
+        projects, sprints, tasks = load_task_databases(
+            "token", "tasks", "projects", "sprints", client=FakeNotionClient(databases)
+        )
+        expected = sort_filter(tasks.pd_items, projects, sprints)["id"].tolist()
+
+        rollup_databases = {"tasks": with_rollups(databases)}
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                client = FakeNotionClient(rollup_databases)
+                projects, sprints, tasks = load_task_databases(
+                    "token",
+                    "tasks",
+                    "projects",
+                    "sprints",
+                    client=client,
+                    backend=backend,
+                    rollup_properties=TaskDB.DEFAULT_ROLLUP_PROPERTIES,
+                )
+                self.assertIsNone(projects)
+                self.assertIsNone(sprints)
+                self.assertEqual({db_id for db_id, _ in client.queries}, {"tasks"})
+
+                if backend == RECORDS_BACKEND:
+                    rows = tasks.records
+                    hot = [task.id for task in filter_hot_tasks(rows, None, None)]
+                else:
+                    rows = list(tasks.pd_items.itertuples())
+                    hot = sort_filter(tasks.pd_items, None, None)["id"].tolist()
+                self.assertEqual(hot, expected)
+                # スプリントのステータスは名前ではなくIDを保持する
+                self.assertEqual({row.sprint_status for row in rows if row.sprint == "今スプリント"}, {"current"})
+
+
+if __name__ == "__main__":
+    unittest.main()
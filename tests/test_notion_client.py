@@ -0,0 +1,126 @@
+# tests/test_notion_client.py
+
+import threading
+import time
+import unittest
+
+import requests
+import urllib3
+
+from module.notion_client import NotionClient, TokenBucket, prefetch_iter
+from tests.fakes import FakeResponse
+
+
+class FakeSession:
+    """あらかじめ指定した結果 (レスポンスまたは例外) を順に返す requests.Session の代用品。"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_client(results, max_retries=2):
+    client = NotionClient(rate_limiter=TokenBucket(rate=1000.0, capacity=1000.0), max_retries=max_retries)
+    client.session = FakeSession(results)
+    client._backoff_seconds = lambda attempt: 0.0
+    return client
+
+
+def connect_error():
+    reason = urllib3.exceptions.NewConnectionError(None, "Connection refused")
+    return requests.exceptions.ConnectionError(urllib3.exceptions.MaxRetryError(None, "/", reason))
+
+
+class NotionClientRetryTest(unittest.TestCase):
+    def test_idempotent_request_retries_read_timeout_and_5xx(self):
+        client = make_client([requests.exceptions.ReadTimeout(), FakeResponse(502), FakeResponse(200)])
+        res = client.post("https://api.notion.com/v1/databases/x/query")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(client.session.calls), 3)
+
+    def test_non_idempotent_request_does_not_retry_read_timeout(self):
+        client = make_client([requests.exceptions.ReadTimeout(), FakeResponse(200)])
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            client.post("https://api.notion.com/v1/pages", idempotent=False)
+        self.assertEqual(len(client.session.calls), 1)
+
+    def test_non_idempotent_request_does_not_retry_5xx(self):
+        client = make_client([FakeResponse(504), FakeResponse(200)])
+        res = client.patch("https://api.notion.com/v1/blocks/b/children", idempotent=False)
+        self.assertEqual(res.status_code, 504)
+        self.assertEqual(len(client.session.calls), 1)
+
+    def test_non_idempotent_request_retries_429_and_connect_errors(self):
+        client = make_client([FakeResponse(429, headers={"Retry-After": "0"}), connect_error(), FakeResponse(200)])
+        client.rate_limiter.pause = lambda seconds: None
+        res = client.post("https://api.notion.com/v1/pages", idempotent=False)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(client.session.calls), 3)
+
+    def test_gives_up_after_max_retries(self):
+        client = make_client([FakeResponse(500)] * 3, max_retries=2)
+        res = client.get("https://api.notion.com/v1/pages/p")
+        self.assertEqual(res.status_code, 500)
+        self.assertEqual(client.metrics["retries"], 2)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_up_to_capacity_then_waits(self):
+        bucket = TokenBucket(rate=20.0, capacity=2.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+        start = time.monotonic()
+        self.assertGreater(bucket.acquire(), 0.0)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_pause_blocks_all_threads(self):
+        bucket = TokenBucket(rate=1000.0, capacity=10.0)
+        bucket.pause(0.1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class PrefetchIterTest(unittest.TestCase):
+    def test_yields_all_items_in_order(self):
+        self.assertEqual(list(prefetch_iter(iter(range(10)), depth=2)), list(range(10)))
+
+    def test_reraises_producer_error(self):
+        def produce():
+            yield 1
+            raise ValueError("boom")
+
+        iterator = prefetch_iter(produce())
+        self.assertEqual(next(iterator), 1)
+        with self.assertRaises(ValueError):
+            next(iterator)
+
+    def test_stops_producer_when_consumer_stops(self):
+        closed = threading.Event()
+
+        def produce():
+            try:
+                for i in range(1000):
+                    yield i
+            finally:
+                closed.set()
+
+        iterator = prefetch_iter(produce())
+        self.assertEqual(next(iterator), 0)
+        iterator.close()
+        self.assertTrue(closed.wait(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
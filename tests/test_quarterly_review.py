@@ -0,0 +1,56 @@
+# tests/test_quarterly_review.py
+
+import unittest
+from unittest import mock
+
+import quarterly_review
+from module.notion_api import NotionAPIError
+
+
+def make_task(title, project=None):
+    return {
+        "properties": {
+            "タスク名": {"title": [{"plain_text": title}]},
+            "プロジェクト": {"select": {"name": project} if project else None},
+        }
+    }
+
+
+class SummarizeTasksTest(unittest.TestCase):
+    def test_keeps_fetch_order_in_a_single_pass(self):
+        tasks = iter([make_task("a", "pj1"), make_task("b"), make_task("c", "pj1")])
+        summarized = quarterly_review.summarize_tasks(tasks)
+        self.assertEqual(summarized, [("a", "pj1"), ("b", "未分類"), ("c", "pj1")])
+
+        text = quarterly_review.format_data_for_ai(summarized, {})
+        self.assertIn("- a (Project: pj1)\n- b (Project: 未分類)\n- c (Project: pj1)\n", text)
+        blocks = quarterly_review.format_task_blocks(summarized)
+        self.assertEqual(
+            [block[block["type"]]["rich_text"][0]["text"]["content"] for block in blocks[1:]],
+            ["Project: pj1", "a", "c", "Project: 未分類", "b"],
+        )
+
+
+class MainTest(unittest.TestCase):
+    def test_aborts_when_done_tasks_fetch_fails_midway(self):
+        def iter_done_tasks(*args, **kwargs):
+            yield make_task("a", "pj1")
+            raise NotionAPIError("Notion API Error: 500", 500)
+
+        tasks_db = mock.Mock(iter_done_tasks=iter_done_tasks)
+        with (
+            mock.patch.object(quarterly_review, "TaskDB", return_value=tasks_db),
+            mock.patch.object(quarterly_review, "NotionClient"),
+            mock.patch.object(quarterly_review, "GoogleCalendarAPI") as gcal,
+            mock.patch.object(quarterly_review, "generate_review") as generate_review,
+            mock.patch("builtins.print"),
+            self.assertRaises(SystemExit) as cm,
+        ):
+            quarterly_review.main()
+        self.assertEqual(cm.exception.code, 1)
+        generate_review.assert_not_called()
+        gcal.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
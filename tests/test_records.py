@@ -0,0 +1,47 @@
+# tests/test_records.py
+
+import datetime
+import unittest
+
+from module.notion_api import PANDAS_BACKEND, RECORDS_BACKEND, load_task_databases
+from module.records import Task, filter_hot_tasks, render_sentences
+from module.util import make_sentence, sort_filter
+from tests.fakes import FakeNotionClient, make_hot_task_candidates, make_related_page
+
+
+class RecordsBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.databases = make_hot_task_candidates(datetime.date.today())
+
+    def load(self, backend):
+        client = FakeNotionClient(self.databases)
+        return load_task_databases("token", "tasks", "projects", "sprints", client=client, backend=backend)
+
+    def test_records_path_matches_pandas_path(self):
+        projects, sprints, tasks = self.load(PANDAS_BACKEND)
+        hot_frame = sort_filter(tasks.pd_items, projects, sprints)
+        projects, sprints, tasks = self.load(RECORDS_BACKEND)
+        hot_records = filter_hot_tasks(tasks.records, projects, sprints)
+
+        self.assertTrue(hot_records)
+        self.assertEqual([task.id for task in hot_records], hot_frame["id"].tolist())
+        self.assertEqual(render_sentences(hot_records), make_sentence(hot_frame))
+
+    def test_records_backend_builds_slotted_tasks_without_pandas_frame(self):
+        _, _, tasks = self.load(RECORDS_BACKEND)
+        self.assertEqual(len(tasks.records), len(self.databases["tasks"]))
+        self.assertIsInstance(tasks.records[0], Task)
+        self.assertFalse(hasattr(tasks.records[0], "__dict__"))
+        self.assertIsNone(tasks._pd_items)
+
+    def test_returns_no_tasks_without_current_sprint(self):
+        self.databases["sprints"] = [
+            make_related_page("sp-old", "前スプリント", title_name="スプリント名", option_id="done")
+        ]
+        projects, sprints, tasks = self.load(RECORDS_BACKEND)
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(filter_hot_tasks(tasks.records, projects, sprints), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# tests/test_snapshot.py
+
+import datetime
+import os
+import tempfile
+import unittest
+
+from module.notion_api import BaseNotionDB
+from module.snapshot import RawSnapshotStore
+from tests.fakes import FakeNotionClient, make_page
+
+
+def page(page_id, edited, **extra):
+    return make_page(page_id, edited, **extra)
+
+
+class IncrementalSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = RawSnapshotStore(self.tmp.name)
+
+    def fetch(self, pages, property_ids=()):
+        db = BaseNotionDB(
+            "db", "token", client=FakeNotionClient({"db": pages}), autoload=False, snapshot_store=self.store
+        )
+        db._property_ids = list(property_ids)
+        items = db._get_raw_data_incremental()
+        return sorted(item["id"] for item in items), [payload for _, payload in db.client.queries]
+
+    def test_first_fetch_queries_all_pages_and_saves_watermark(self):
+        ids, payloads = self.fetch([page("a", "2025-01-01T00:00:00.000Z"), page("b", "2025-01-02T00:00:00.000Z")])
+        self.assertEqual(ids, ["a", "b"])
+        self.assertNotIn("filter", payloads[0])
+        self.assertEqual(self.store.load("db")["watermark"], "2025-01-02T00:00:00.000Z")
+
+    def test_second_fetch_merges_changes_since_watermark(self):
+        self.fetch([page("a", "2025-01-01T00:00:00.000Z"), page("b", "2025-01-02T00:00:00.000Z")])
+        changed = [
+            page("a", "2025-01-01T00:00:00.000Z"),
+            page("b", "2025-01-03T00:00:00.000Z", in_trash=True),
+            page("c", "2025-01-04T00:00:00.000Z"),
+        ]
+        ids, payloads = self.fetch(changed)
+        self.assertEqual(ids, ["a", "c"])
+        self.assertEqual(payloads[0]["filter"]["last_edited_time"], {"on_or_after": "2025-01-02T00:00:00.000Z"})
+        self.assertEqual(self.store.load("db")["watermark"], "2025-01-04T00:00:00.000Z")
+
+    def test_changed_properties_force_full_fetch(self):
+        self.fetch([page("a", "2025-01-01T00:00:00.000Z")], property_ids=["p1"])
+        ids, payloads = self.fetch([page("b", "2024-12-01T00:00:00.000Z")], property_ids=["p1", "p2"])
+        self.assertEqual(ids, ["b"])
+        self.assertNotIn("filter", payloads[0])
+
+    def test_expired_snapshot_forces_full_fetch(self):
+        self.store.full_refresh_interval = datetime.timedelta(0)
+        self.fetch([page("a", "2025-01-01T00:00:00.000Z")])
+        ids, payloads = self.fetch([page("b", "2024-12-01T00:00:00.000Z")])
+        self.assertEqual(ids, ["b"])
+        self.assertNotIn("filter", payloads[0])
+
+
+class RawSnapshotStoreTest(unittest.TestCase):
+    def test_save_does_not_touch_temp_files_of_other_writers(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            store = RawSnapshotStore(cache_dir)
+            # 同じディレクトリを使う他のプロセスが書き込み中の一時ファイル
+            other = os.path.join(cache_dir, "db.json.tmp")
+            with open(other, "w", encoding="utf-8") as f:
+                f.write("other")
+            store.save("db", {"a": page("a", "2025-01-01T00:00:00.000Z")}, "2025-01-01T00:00:00+00:00")
+            with open(other, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "other")
+            self.assertEqual(sorted(os.listdir(cache_dir)), ["db.json", "db.json.tmp"])
+            self.assertEqual(list(store.load("db")["pages"]), ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
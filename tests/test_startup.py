@@ -0,0 +1,45 @@
+# tests/test_startup.py
+
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ("task_notifier", "sync_main", "quarterly_review")
+# エントリーポイントのインポート時に読み込んではいけない重いライブラリ (実際に使用する時点で読み込む)
+HEAVY_MODULES = ("pandas", "numpy", "googleapiclient", "google.genai", "dateutil")
+# エントリーポイントのインポートにかかる累積時間の上限 (マイクロ秒)。開発環境では合計 約120ms
+IMPORT_BUDGET_US = 1_000_000
+
+SCRIPT = f"""
+import sys
+import {", ".join(ENTRY_POINTS)}
+heavy = {HEAVY_MODULES!r}
+print(",".join(sorted(m for m in sys.modules if any(m == h or m.startswith(h + ".") for h in heavy))))
+"""
+
+
+class StartupBudgetTest(unittest.TestCase):
+    def test_entry_points_do_not_import_heavy_libraries(self):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", SCRIPT],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "", "heavy modules imported at startup")
+
+        # -X importtime の出力: "import time: self [us] | cumulative | imported package"
+        cumulative = {
+            match.group(2): int(match.group(1))
+            for match in re.finditer(r"^import time:\s+\d+ \|\s+(\d+) \| (\S+)$", result.stderr, re.MULTILINE)
+        }
+        total = sum(cumulative[name] for name in ENTRY_POINTS)
+        self.assertLess(total, IMPORT_BUDGET_US, f"entry points took {total / 1000:.0f}ms to import")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# tests/test_sync_main.py
+
+import datetime
+import types
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import sync_main
+
+
+def make_frame(rows):
+    """TaskDB.pd_items と同じ dtype (datetime64 / categorical) の DataFrame を作成する。"""
+    frame = pd.DataFrame(rows)
+    frame["work_date"] = pd.to_datetime(frame["work_date"])
+    frame["project"] = frame["project"].astype("category")
+    frame["status"] = frame["status"].astype("category")
+    return frame
+
+
+def make_row(**overrides):
+    row = {
+        "id": "t1",
+        "title": "task",
+        "work_date": "2025-01-10",
+        "status": "未着手",
+        "project": None,
+        "gcal_event_id": "e1",
+        "last_edited_time": "2025-01-01T00:00:00.000Z",
+    }
+    row.update(overrides)
+    return row
+
+
+def make_event(summary, date, updated="2024-12-31T00:00:00Z"):
+    return {"id": "e1", "summary": summary, "start": {"date": date}, "updated": updated}
+
+
+class ProcessSyncRowTest(unittest.TestCase):
+    def test_itertuples_row_in_sync_is_left_alone(self):
+        row = next(make_frame([make_row()]).itertuples())
+        gcal = mock.Mock()
+        sync_main.process_sync_row(row, mock.Mock(), gcal, {"e1": make_event("task", "2025-01-10")})
+        gcal.update_event.assert_not_called()
+        gcal.get_event.assert_not_called()
+
+    def test_itertuples_row_without_work_date_is_canceled(self):
+        row = next(make_frame([make_row(work_date=None)]).itertuples())
+        gcal = mock.Mock()
+        sync_main.process_sync_row(row, mock.Mock(), gcal, {"e1": make_event("task", "2025-01-10")})
+        gcal.update_event.assert_called_once_with("e1", "【中止】task", datetime.date(2025, 1, 10))
+
+    def test_missing_project_and_event_id_are_not_treated_as_values(self):
+        frame = make_frame([make_row(gcal_event_id=None), make_row(id="t2", project="pj")])
+        frame["gcal_event_id"] = frame["gcal_event_id"].astype("str")  # 欠損値が NaN になる文字列列
+        row = next(frame.itertuples())
+        gcal = mock.Mock()
+        gcal.create_event.return_value = "new"
+        tasks_db = mock.Mock()
+        sync_main.process_sync_row(row, tasks_db, gcal)
+        gcal.create_event.assert_called_once_with("task", datetime.date(2025, 1, 10))
+        tasks_db.update_page.assert_called_once_with("t1", sync_main._event_id_property("new"))
+
+    def test_namespace_row_from_iter_items(self):
+        row = types.SimpleNamespace(**make_row(work_date=datetime.date(2025, 1, 11), project="pj"))
+        gcal = mock.Mock()
+        sync_main.process_sync_row(row, mock.Mock(), gcal, {"e1": make_event("task", "2025-01-10")})
+        gcal.update_event.assert_called_once_with("e1", "task【pj】", datetime.date(2025, 1, 11))
+
+    def test_event_created_in_batch_is_written_back_through_the_queue(self):
+        row = types.SimpleNamespace(**make_row(gcal_event_id=None))
+        batch, write_queue = mock.Mock(), mock.Mock()
+        sync_main.process_sync_row(row, mock.Mock(), mock.Mock(), {}, batch, write_queue)
+        batch.create_event.assert_called_once()
+        write_queue.submit.assert_not_called()
+        # バッチの送信後にコールバックが呼ばれ、判断に使った last_edited_time とともにIDを書き戻す
+        batch.create_event.call_args.kwargs["callback"]({"id": "new"}, None)
+        write_queue.submit.assert_called_once_with(
+            "t1", sync_main._event_id_property("new"), "2025-01-01T00:00:00.000Z"
+        )
+
+    def test_pending_event_id_prevents_a_duplicate_event(self):
+        row = types.SimpleNamespace(**make_row(gcal_event_id=None))
+        pending = {"t1": sync_main._event_id_property("e1")}
+        sync_main._apply_pending_event_id(row, pending)
+        self.assertEqual(row.gcal_event_id, "e1")
+        batch, gcal = mock.Mock(), mock.Mock()
+        sync_main.process_sync_row(row, mock.Mock(), gcal, {"e1": make_event("task", "2025-01-10")}, batch)
+        batch.create_event.assert_not_called()
+        gcal.create_event.assert_not_called()
+
+
+def day(n):
+    return datetime.date(2025, 1, 1) + datetime.timedelta(days=n)
+
+
+def rows_between(start, end, gcal_event_id="e"):
+    return [
+        types.SimpleNamespace(work_date=day(start), gcal_event_id=gcal_event_id),
+        types.SimpleNamespace(work_date=day(end), gcal_event_id=gcal_event_id),
+    ]
+
+
+class GCalEventPrefetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.gcal = mock.Mock()
+        self.gcal.get_events_by_id.side_effect = lambda start, end: {f"{start}/{end}": {"id": f"{start}/{end}"}}
+        self.prefetcher = sync_main.GCalEventPrefetcher(self.gcal)
+
+    def listed(self):
+        return [call.args for call in self.gcal.get_events_by_id.call_args_list]
+
+    def test_overlapping_chunks_list_only_uncovered_dates(self):
+        self.prefetcher.prefetch(rows_between(0, 30))
+        self.prefetcher.prefetch(rows_between(5, 40))
+        events = self.prefetcher.prefetch(rows_between(10, 20))
+        self.assertEqual(self.listed(), [(day(0), day(30)), (day(31), day(40))])
+        self.assertEqual(self.prefetcher.covered, [(day(0), day(40))])
+        # 以前のチャンクで取得したイベントも引き続き参照できる
+        self.assertEqual(len(events), 2)
+
+    def test_lists_gaps_between_covered_ranges(self):
+        self.prefetcher.prefetch(rows_between(0, 5))
+        self.prefetcher.prefetch(rows_between(10, 15))
+        self.prefetcher.prefetch(rows_between(3, 20))
+        self.assertEqual(self.listed()[2:], [(day(6), day(9)), (day(16), day(20))])
+        self.assertEqual(self.prefetcher.covered, [(day(0), day(20))])
+
+    def test_failed_range_is_retried_by_the_next_chunk(self):
+        self.gcal.get_events_by_id.side_effect = [RuntimeError("quota"), {"e1": {"id": "e1"}}]
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.prefetcher.prefetch(rows_between(0, 3)), {})
+        self.assertEqual(self.prefetcher.prefetch(rows_between(0, 3)), {"e1": {"id": "e1"}})
+        self.assertEqual(self.listed(), [(day(0), day(3)), (day(0), day(3))])
+
+    def test_rows_without_event_id_or_work_date_are_ignored(self):
+        rows = rows_between(0, 3, gcal_event_id=None) + [types.SimpleNamespace(work_date=None, gcal_event_id="e")]
+        self.assertEqual(self.prefetcher.prefetch(rows), {})
+        self.gcal.get_events_by_id.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+# tests/test_util.py
+
+import datetime
+import unittest
+
+from module.notion_api import load_task_databases
+from module.records import ACTIVE_STATUSES
+from module.util import build_hot_task_filter, sort_filter
+from tests.fakes import FakeNotionClient, make_hot_task_candidates, make_related_page
+
+
+def matches(notion_filter, page):
+    """build_hot_task_filter が使う範囲のNotion APIのフィルターを、生のページデータに対して評価する。"""
+    if "and" in notion_filter:
+        return all(matches(condition, page) for condition in notion_filter["and"])
+    if "or" in notion_filter:
+        return any(matches(condition, page) for condition in notion_filter["or"])
+    prop = page["properties"][notion_filter["property"]]
+    if "relation" in notion_filter:
+        return bool(prop["relation"]) == notion_filter["relation"]["is_not_empty"]
+    if "status" in notion_filter:
+        return prop["status"]["name"] == notion_filter["status"]["equals"]
+    if "date" in notion_filter:
+        # 日付範囲は開始日で比較される
+        value = prop["date"]
+        return value is not None and value["start"][:10] <= notion_filter["date"]["on_or_before"]
+    raise AssertionError(f"Unsupported filter: {notion_filter}")
+
+
+class HotTaskFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.databases = make_hot_task_candidates(self.today)
+
+    def test_filter_keeps_every_task_that_sort_filter_selects(self):
+        hot_filter = build_hot_task_filter(self.today)
+        pushed = {page["id"] for page in self.databases["tasks"] if matches(hot_filter, page)}
+
+        client = FakeNotionClient(self.databases)
+        projects, sprints, tasks = load_task_databases("token", "tasks", "projects", "sprints", client=client)
+        hot = set(sort_filter(tasks.pd_items, projects, sprints)["id"])
+
+        self.assertTrue(hot)
+        self.assertLessEqual(hot, pushed)
+        # サーバー側で候補が実際に絞り込まれていること
+        self.assertLess(len(pushed), len(self.databases["tasks"]) / 2)
+
+    def test_filter_is_sent_only_with_the_task_query(self):
+        hot_filter = build_hot_task_filter(self.today)
+        client = FakeNotionClient(self.databases)
+        load_task_databases("token", "tasks", "projects", "sprints", client=client, task_filter=hot_filter)
+        filters = {db_id: payload.get("filter") for db_id, payload in client.queries}
+        self.assertEqual(filters, {"projects": None, "sprints": None, "tasks": hot_filter})
+
+
+def expected_hot_tasks(databases, today):
+    """sort_filter のdocstringの条件をページの生データに対してそのまま評価し、期待される (id, プロジェクト, タグ) を返す。"""
+    tomorrow = today + datetime.timedelta(days=1)
+    titles = {
+        page["id"]: page["properties"]["プロジェクト名"]["title"][0]["plain_text"] for page in databases["projects"]
+    }
+    hot = []
+    for page in databases["tasks"]:
+        props = page["properties"]
+        due = props["期限"]["date"] or {}
+        start = datetime.date.fromisoformat(due["start"]) if due.get("start") else None
+        end = datetime.date.fromisoformat(due["end"]) if due.get("end") else None
+        work = props["作業日"]["date"]
+        work_date = datetime.date.fromisoformat(work["start"]) if work else None
+        if [r["id"] for r in props["スプリント"]["relation"]] != ["sp-now"]:
+            continue
+        if start is None and work_date is None:
+            continue
+        if props["ステータス"]["status"]["name"] not in ACTIVE_STATUSES:
+            continue
+        is_due_soon = end is not None and end <= tomorrow
+        is_overdue = start is not None and start <= today
+        is_work_today = work_date == today
+        if is_due_soon or is_overdue or is_work_today:
+            project = titles.get((props["プロジェクト"]["relation"] or [{}])[0].get("id"), "")
+            tag = (props["タグ"]["multi_select"] or [{"name": "その他"}])[0]["name"]
+            hot.append((page["id"], project, tag))
+    return hot
+
+
+class SortFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.databases = make_hot_task_candidates(self.today)
+
+    def load(self):
+        return load_task_databases("token", "tasks", "projects", "sprints", client=FakeNotionClient(self.databases))
+
+    def test_filters_native_columns_on_the_documented_boundaries(self):
+        projects, sprints, tasks = self.load()
+        pd_tasks = tasks.pd_items
+        for column in ("start", "end", "work_date"):
+            self.assertEqual(pd_tasks[column].dtype.kind, "M")
+        for column in ("status", "sprint", "project", "tag"):
+            self.assertEqual(pd_tasks[column].dtype.name, "category")
+
+        expected = expected_hot_tasks(self.databases, self.today)
+        hot = sort_filter(pd_tasks, projects, sprints)
+        self.assertTrue(expected)
+        self.assertEqual(sorted(hot["id"]), sorted(task_id for task_id, _, _ in expected))
+
+    def test_sorts_by_project_then_tag(self):
+        projects, sprints, tasks = self.load()
+        hot = sort_filter(tasks.pd_items, projects, sprints)
+
+        # プロジェクト未設定 ("") は先頭。同じプロジェクト・タグの中では取得順を保つ
+        expected = sorted(expected_hot_tasks(self.databases, self.today), key=lambda task: task[1:])
+        self.assertEqual(hot["id"].tolist(), [task_id for task_id, _, _ in expected])
+
+    def test_returns_empty_frame_without_current_sprint(self):
+        self.databases["sprints"] = [
+            make_related_page("sp-old", "前スプリント", title_name="スプリント名", option_id="done")
+        ]
+        projects, sprints, tasks = self.load()
+        with self.assertLogs(level="WARNING"):
+            hot = sort_filter(tasks.pd_items, projects, sprints)
+        self.assertTrue(hot.empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
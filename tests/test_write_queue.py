@@ -0,0 +1,144 @@
+# tests/test_write_queue.py
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from module.write_queue import NotionWriteQueue
+
+WORK_DATE = "作業日"
+
+
+def work_date(value):
+    return {WORK_DATE: {"date": {"start": value}}}
+
+
+def event_id(value):
+    return {"GCal_Event_ID": {"rich_text": [{"text": {"content": value}}]}}
+
+
+class FakeDB:
+    """update_page / retrieve_pages だけを持つ BaseNotionDB の代用品。"""
+
+    db_id = "db"
+
+    def __init__(self, pages=None, fail=()):
+        self.pages = pages or {}
+        self.fail = set(fail)  # 失敗させる (ページID, プロパティ名)
+        self.updates = []
+        self.first_started = threading.Event()
+        self.release_first = threading.Event()
+        self.release_first.set()
+
+    def update_page(self, page_id, properties):
+        if not self.updates and not self.first_started.is_set():
+            self.first_started.set()
+            self.release_first.wait(5)
+        if any((page_id, name) in self.fail for name in properties):
+            self.updates.append((page_id, "failed", properties))
+            raise RuntimeError("503")
+        self.updates.append((page_id, "ok", properties))
+        return {"id": page_id, "last_edited_time": f"edited-{len(self.updates)}"}
+
+    def retrieve_pages(self, page_ids):
+        return {page_id: self.pages[page_id] for page_id in page_ids if page_id in self.pages}
+
+
+class NotionWriteQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "failures.json")
+
+    def saved_failures(self):
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)["failures"]
+
+    def record(self, failures):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": NotionWriteQueue.VERSION, "db_id": "db", "failures": failures}, f)
+
+    def test_writes_to_the_same_page_apply_in_submit_order(self):
+        db = FakeDB()
+        db.release_first.clear()
+        queue = NotionWriteQueue(db)
+        queue.submit("p1", work_date("2025-01-01"))
+        db.first_started.wait(5)
+        # 最初の書き込みが終わるまで、同じページへの後の書き込みは他のワーカーでも送信されない
+        queue.submit("p1", work_date("2025-01-02"))
+        db.release_first.set()
+        queue.close()
+        self.assertEqual([update[2] for update in db.updates], [work_date("2025-01-01"), work_date("2025-01-02")])
+
+    def test_failure_is_cleared_by_a_later_write_to_the_same_property(self):
+        db = FakeDB()
+        queue = NotionWriteQueue(db, failure_path=self.path)
+        db.fail.add(("p1", WORK_DATE))
+        queue.submit("p1", work_date("2025-01-01"), "t0")
+        queue.submit("p1", event_id("e1"), "t0")
+        queue.close()
+        self.assertEqual(
+            self.saved_failures(), {"p1": {"last_edited_time": "edited-2", "properties": work_date("2025-01-01")}}
+        )
+
+    def test_retry_replays_failure_when_page_is_unchanged(self):
+        self.record({"p1": {"last_edited_time": "t1", "properties": work_date("2025-01-01")}})
+        db = FakeDB(pages={"p1": {"id": "p1", "last_edited_time": "t1", "properties": {}}})
+        queue = NotionWriteQueue(db, failure_path=self.path)
+        self.assertEqual(queue.retry_failed(), {"p1": work_date("2025-01-01")})
+        queue.close()
+        self.assertEqual(db.updates, [("p1", "ok", work_date("2025-01-01"))])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_retry_skips_stale_values_when_page_was_edited(self):
+        properties = {**work_date("2025-01-01"), **event_id("e1")}
+        self.record(
+            {
+                "p1": {"last_edited_time": "t1", "properties": properties},
+                "p2": {"last_edited_time": "t1", "properties": properties},
+            }
+        )
+        empty = {"GCal_Event_ID": {"id": "x", "type": "rich_text", "rich_text": []}}
+        filled = {"GCal_Event_ID": {"id": "x", "type": "rich_text", "rich_text": [{"plain_text": "e9"}]}}
+        db = FakeDB(
+            pages={
+                "p1": {"id": "p1", "last_edited_time": "t2", "properties": empty},
+                "p2": {"id": "p2", "last_edited_time": "t2", "properties": filled},
+            }
+        )
+        queue = NotionWriteQueue(db, failure_path=self.path, fill_properties=("GCal_Event_ID",))
+        self.assertEqual(queue.retry_failed(), {"p1": event_id("e1")})
+        queue.close()
+        self.assertEqual(db.updates, [("p1", "ok", event_id("e1"))])
+
+    def test_failure_of_unretrievable_page_is_kept(self):
+        failures = {"p1": {"last_edited_time": "t1", "properties": work_date("2025-01-01")}}
+        self.record(failures)
+        queue = NotionWriteQueue(FakeDB(), failure_path=self.path)
+        self.assertEqual(queue.retry_failed(), {})
+        queue.close()
+        self.assertEqual(self.saved_failures(), failures)
+
+    def test_event_id_of_unretrievable_page_is_still_returned(self):
+        failures = {"p1": {"last_edited_time": "t1", "properties": {**work_date("2025-01-01"), **event_id("e1")}}}
+        self.record(failures)
+        db = FakeDB()
+        queue = NotionWriteQueue(db, failure_path=self.path, fill_properties=("GCal_Event_ID",))
+        # 再送はしないが、重複作成を防ぐためにIDは呼び出し側に返す
+        self.assertEqual(queue.retry_failed(), {"p1": event_id("e1")})
+        queue.close()
+        self.assertEqual(db.updates, [])
+        self.assertEqual(self.saved_failures(), failures)
+
+    def test_record_of_another_version_is_ignored(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": NotionWriteQueue.VERSION + 1, "db_id": "db", "failures": {"p1": {}}}, f)
+        queue = NotionWriteQueue(FakeDB(), failure_path=self.path)
+        self.assertEqual(queue.load_failures(), {})
+        queue.close()
+
+
+if __name__ == "__main__":
+    unittest.main()